@@ -1,18 +1,151 @@
+import json
+import os
+import sqlite3
+import threading
+
+DEFAULT_PATH = os.environ.get(
+    "DATA_ENTRY_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data_entries.db")
+)
+BATCH_SIZE = 10000
+
+
 class DataEntry:
-    def __init__(self):
-        self.entries = []
+    """Entries stored in SQLite, keyed by an integer id (AUTOINCREMENT primary key: ids are never reused).
+
+    The data lives in a file, so it survives Streamlit reruns and restarts. Lookup, update and delete go
+    straight to the primary key; batch adds run in a single transaction.
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries (id INTEGER PRIMARY KEY AUTOINCREMENT, data TEXT NOT NULL)"
+        )
+        self._migrate()
+        self._conn.commit()
+
+    def _migrate(self):
+        """Rebuilds an entries table created without AUTOINCREMENT, keeping its ids."""
+        sql = self._conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'entries'"
+        ).fetchone()[0]
+        if "AUTOINCREMENT" in sql.upper():
+            return
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE entries_new (id INTEGER PRIMARY KEY AUTOINCREMENT, data TEXT NOT NULL)"
+            )
+            self._conn.execute("INSERT INTO entries_new (id, data) SELECT id, data FROM entries")
+            self._conn.execute("DROP TABLE entries")
+            self._conn.execute("ALTER TABLE entries_new RENAME TO entries")
+
+    def close(self):
+        self._conn.close()
 
     def add_entry(self, entry):
-        self.entries.append(entry)
-
-    def update_entry(self, index, updated_entry):
-        if 0 <= index < len(self.entries):
-            self.entries[index] = updated_entry
-        else:
-            raise IndexError("Entry index out of range.")
-
-    def delete_entry(self, index):
-        if 0 <= index < len(self.entries):
-            del self.entries[index]
-        else:
-            raise IndexError("Entry index out of range.")
\ No newline at end of file
+        """Adds one entry and returns its id."""
+        with self._lock, self._conn:
+            cur = self._conn.execute("INSERT INTO entries (data) VALUES (?)", (json.dumps(entry),))
+            return cur.lastrowid
+
+    def add_entries(self, entries, batch_size=BATCH_SIZE):
+        """Adds many entries in one transaction and returns their ids (consecutive)."""
+        with self._lock, self._conn:
+            # the write lock is held from BEGIN IMMEDIATE, so SQLite hands out the ids back to back
+            self._conn.execute("BEGIN IMMEDIATE")
+            added = 0
+            batch = []
+            for entry in entries:
+                batch.append((json.dumps(entry),))
+                if len(batch) >= batch_size:
+                    self._conn.executemany("INSERT INTO entries (data) VALUES (?)", batch)
+                    added += len(batch)
+                    batch = []
+            if batch:
+                self._conn.executemany("INSERT INTO entries (data) VALUES (?)", batch)
+                added += len(batch)
+            last = self._conn.execute(
+                "SELECT COALESCE(MAX(seq), 0) FROM sqlite_sequence WHERE name = 'entries'"
+            ).fetchone()[0]
+        return range(last - added + 1, last + 1)
+
+    def get_entry(self, entry_id):
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM entries WHERE id = ?", (int(entry_id),)).fetchone()
+        if row is None:
+            raise KeyError(f"Entry {entry_id} not found.")
+        return json.loads(row[0])
+
+    def update_entry(self, entry_id, updated_entry):
+        with self._lock, self._conn:
+            cur = self._conn.execute(
+                "UPDATE entries SET data = ? WHERE id = ?", (json.dumps(updated_entry), int(entry_id))
+            )
+        if cur.rowcount == 0:
+            raise KeyError(f"Entry {entry_id} not found.")
+
+    def delete_entry(self, entry_id):
+        with self._lock, self._conn:
+            cur = self._conn.execute("DELETE FROM entries WHERE id = ?", (int(entry_id),))
+        if cur.rowcount == 0:
+            raise KeyError(f"Entry {entry_id} not found.")
+
+    def list_entries(self, after_id=0, limit=100):
+        """Page of (id, entry) ordered by id, starting after `after_id`."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, data FROM entries WHERE id > ? ORDER BY id LIMIT ?", (int(after_id), int(limit))
+            ).fetchall()
+        return [(i, json.loads(data)) for i, data in rows]
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+
+def benchmark(n=1_000_000, lookups=100_000, path=None):
+    """Times batch add, lookups, updates and deletes by id on a scratch database."""
+    import random
+    import tempfile
+    import time
+
+    path = path or os.path.join(tempfile.mkdtemp(), "bench.db")
+    store = DataEntry(path)
+    results = {"entries": n}
+
+    start = time.perf_counter()
+    ids = store.add_entries({"name": f"Name {i}", "value": i} for i in range(n))
+    results["add_entries (s)"] = round(time.perf_counter() - start, 2)
+
+    sample = random.sample(ids, min(lookups, n))
+    start = time.perf_counter()
+    for i in sample:
+        store.get_entry(i)
+    results["get_entry (us)"] = round((time.perf_counter() - start) / len(sample) * 1e6, 1)
+
+    start = time.perf_counter()
+    for i in sample[:10000]:
+        store.update_entry(i, {"name": "Updated", "value": i})
+    results["update_entry (us)"] = round((time.perf_counter() - start) / min(len(sample), 10000) * 1e6, 1)
+
+    start = time.perf_counter()
+    for i in sample[:10000]:
+        store.delete_entry(i)
+    results["delete_entry (us)"] = round((time.perf_counter() - start) / min(len(sample), 10000) * 1e6, 1)
+
+    results["file size (MB)"] = round(os.path.getsize(path) / 1e6, 1)
+    store.close()
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark the DataEntry store.")
+    parser.add_argument("--entries", type=int, default=1_000_000)
+    args = parser.parse_args()
+    print(benchmark(args.entries))
@@ -1,12 +1,21 @@
+import pandas as pd
 import streamlit as st
 from data_entry import DataEntry
+from utils import clean_entries
+
+
+@st.cache_resource
+def get_store():
+    # One store per server process; the entries themselves live in the SQLite file.
+    return DataEntry()
+
 
 def main():
     st.title("Data Entry Application")
 
-    data_entry = DataEntry()
+    data_entry = get_store()
 
-    menu = ["Add Entry", "Update Entry", "Delete Entry"]
+    menu = ["Add Entry", "Bulk Upload", "Update Entry", "Delete Entry", "View Entries"]
     choice = st.sidebar.selectbox("Select an option", menu)
 
     if choice == "Add Entry":
@@ -14,8 +23,21 @@ def main():
         name = st.text_input("Name")
         age = st.number_input("Age", min_value=0)
         if st.button("Add"):
-            data_entry.add_entry(name, age)
-            st.success("Entry added successfully!")
+            entry_id = data_entry.add_entry({"name": name, "age": age})
+            st.success(f"Entry {entry_id} added successfully!")
+
+    elif choice == "Bulk Upload":
+        st.subheader("Upload Entries (CSV)")
+        uploaded = st.file_uploader("CSV with name and age columns", type="csv")
+        if uploaded is not None:
+            valid, errors = clean_entries(pd.read_csv(uploaded), required=("name", "age"))
+            st.write(f"{len(valid)} valid rows, {len(errors)} with errors")
+            if not errors.empty:
+                st.dataframe(errors)
+            if len(valid) and st.button("Add valid rows"):
+                records = valid.astype(object).where(valid.notna(), None).to_dict("records")
+                ids = data_entry.add_entries(records)
+                st.success(f"Entries {ids.start} to {ids.stop - 1} added successfully!")
 
     elif choice == "Update Entry":
         st.subheader("Update Existing Entry")
@@ -23,15 +45,27 @@ def main():
         name = st.text_input("New Name")
         age = st.number_input("New Age", min_value=0)
         if st.button("Update"):
-            data_entry.update_entry(entry_id, name, age)
-            st.success("Entry updated successfully!")
+            try:
+                data_entry.update_entry(entry_id, {"name": name, "age": age})
+                st.success("Entry updated successfully!")
+            except KeyError as e:
+                st.error(e.args[0])
 
     elif choice == "Delete Entry":
         st.subheader("Delete Entry")
         entry_id = st.number_input("Entry ID", min_value=1)
         if st.button("Delete"):
-            data_entry.delete_entry(entry_id)
-            st.success("Entry deleted successfully!")
+            try:
+                data_entry.delete_entry(entry_id)
+                st.success("Entry deleted successfully!")
+            except KeyError as e:
+                st.error(e.args[0])
+
+    elif choice == "View Entries":
+        st.subheader(f"Entries ({len(data_entry)})")
+        after_id = st.number_input("After ID", min_value=0)
+        rows = data_entry.list_entries(after_id, limit=100)
+        st.dataframe([{"id": i, **entry} for i, entry in rows])
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
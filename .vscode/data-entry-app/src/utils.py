@@ -1,3 +1,6 @@
+import pandas as pd
+
+
 def validate_entry(entry):
     # Implement validation logic for the data entry
     if not entry.get("name") or not entry.get("value"):
@@ -9,4 +12,57 @@ def format_entry(entry):
     return {
         "name": entry["name"].strip().title(),
         "value": str(entry["value"]).strip()
-    }
\ No newline at end of file
+    }
+
+REQUIRED_FIELDS = ("name", "value")
+try:
+    import pyarrow  # noqa: F401
+    TEXT = "string[pyarrow]"  # string kernels run in Arrow (C++), not one Python call per row
+except ImportError:
+    TEXT = "string"  # same results, slower (Python string methods per row)
+
+
+def _as_frame(entries):
+    if isinstance(entries, pd.DataFrame):
+        return entries
+    return pd.DataFrame.from_records(list(entries))
+
+
+def _blank(series):
+    # Missing, text that is empty after stripping, or a number that is zero (validate_entry's `not value`)
+    text = series.astype(TEXT)
+    zero = series.map(lambda v: isinstance(v, (int, float)) and v == 0).astype(bool)
+    return series.isna() | text.str.strip().eq("").fillna(True) | zero
+
+
+def validate_entries(entries, required=REQUIRED_FIELDS):
+    """Batch version of validate_entry for a DataFrame or a list of dicts.
+
+    Returns (valid, errors): the rows that passed, and a DataFrame indexed by the original row with one
+    "errors" column listing every problem found in that row.
+    """
+    df = _as_frame(entries)
+    messages = pd.Series("", index=df.index, dtype="object")
+    for field in required:
+        missing = _blank(df[field]) if field in df.columns else pd.Series(True, index=df.index)
+        messages = messages.where(~missing, messages + f"{field} is required; ")
+    invalid = messages.ne("")
+    errors = messages[invalid].str.rstrip("; ").to_frame("errors")
+    errors.index.name = "row"
+    return df[~invalid], errors
+
+
+def format_entries(entries):
+    """Batch version of format_entry: names stripped and title-cased, values as stripped text."""
+    df = _as_frame(entries).copy()
+    if "name" in df.columns:
+        df["name"] = df["name"].astype(TEXT).str.strip().str.title()
+    if "value" in df.columns:
+        df["value"] = df["value"].astype(TEXT).str.strip()
+    return df
+
+
+def clean_entries(entries, required=REQUIRED_FIELDS):
+    """Validates and formats in one pass: (formatted valid rows, error report by row)."""
+    valid, errors = validate_entries(entries, required)
+    return format_entries(valid), errors
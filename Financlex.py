@@ -1,29 +1,12 @@
 import streamlit as st
-import pandas as pd
-import sqlite3
 from datetime import date
+import instrumentacao
+import sincronizacao_financeiro
+from financeiro_db import (
+    TIPOS, inicializar_db, inserir, resumo, por_categoria, pagina, fluxo_mensal, verificar_razao, reconstruir_razao
+)
 
-# Conexão com SQLite
-def conectar_sqlite():
-    conn = sqlite3.connect("financeiro.db")
-    return conn
-
-# Inicializa tabela se não existir
-def inicializar_db():
-    conn = conectar_sqlite()
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS transacoes (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            data TEXT,
-            tipo TEXT,
-            categoria TEXT,
-            valor REAL,
-            descricao TEXT
-        )
-    """)
-    conn.commit()
-    conn.close()
-
+# Banco da seção [financeiro] da configuração (SQLite financeiro.db por padrão); ver financeiro_db.py
 inicializar_db()
 
 st.title("💰 Controle Financeiro")
@@ -31,41 +14,81 @@ st.title("💰 Controle Financeiro")
 # Formulário para nova transação
 with st.form("nova_transacao"):
     data = st.date_input("Data", value=date.today())
-    tipo = st.selectbox("Tipo", ["Receita", "Despesa"])
+    tipo = st.selectbox("Tipo", TIPOS)
     categoria = st.text_input("Categoria")
     valor = st.number_input("Valor", min_value=0.0, format="%.2f")
     descricao = st.text_input("Descrição")
     enviar = st.form_submit_button("Adicionar")
 
     if enviar:
-        conn = conectar_sqlite()
-        conn.execute(
-            "INSERT INTO transacoes (data, tipo, categoria, valor, descricao) VALUES (?, ?, ?, ?, ?)",
-            (str(data), tipo, categoria, valor, descricao)
-        )
-        conn.commit()
-        conn.close()
+        inserir(data, tipo, categoria, valor, descricao)
         st.success("Transação adicionada!")
 
-# Consulta e exibição dos dados
-conn = conectar_sqlite()
-df = pd.read_sql_query("SELECT * FROM transacoes ORDER BY data DESC", conn)
-conn.close()
+# Locações e despesas do hospedagem.db entram como transações (só o que mudou desde a última sincronização)
+if st.button("🔄 Sincronizar com Hospedagem"):
+    r = sincronizacao_financeiro.sincronizar()
+    incluidas = sum(v["incluidas"] for k, v in r.items() if k != "removidas")
+    alteradas = sum(v["alteradas"] for k, v in r.items() if k != "removidas")
+    st.success(f"Sincronizado: {incluidas} incluída(s), {alteradas} alterada(s), {r['removidas']} removida(s).")
 
+# Filtro de período (métricas, gráfico e tabela)
+filtrar = st.checkbox("Filtrar por período")
+inicio = fim = None
+if filtrar:
+    periodo = st.date_input("Período", value=[date.today().replace(day=1), date.today()])
+    if len(periodo) == 2:
+        inicio, fim = periodo
+
+# Consulta e exibição dos dados: só a página atual vem do banco
 st.subheader("Transações")
+tamanho = st.selectbox("Linhas por página", [25, 50, 100, 250], index=1)
+assinatura = (inicio, fim, tamanho)
+estado = st.session_state.setdefault("transacoes_pagina", {"assinatura": assinatura, "cursores": [None]})
+if estado["assinatura"] != assinatura:
+    estado.update(assinatura=assinatura, cursores=[None])
+df, proximo = pagina(inicio, fim, estado["cursores"][-1], tamanho)
 st.dataframe(df)
 
-# Resumo financeiro
-receitas = df[df["tipo"] == "Receita"]["valor"].sum()
-despesas = df[df["tipo"] == "Despesa"]["valor"].sum()
-saldo = receitas - despesas
+nav1, nav2, nav3 = st.columns([1, 4, 1])
+if nav1.button("◀ Anterior", disabled=len(estado["cursores"]) == 1):
+    estado["cursores"].pop()
+    st.rerun()
+nav2.caption(f"Página {len(estado['cursores'])}")
+if nav3.button("Próxima ▶", disabled=proximo is None):
+    estado["cursores"].append(proximo)
+    st.rerun()
+
+# Resumo financeiro (sem período vem da razão; com período, somado no banco)
+totais = resumo(inicio, fim)
 
-st.metric("Receitas", f"R$ {receitas:,.2f}")
-st.metric("Despesas", f"R$ {despesas:,.2f}")
-st.metric("Saldo", f"R$ {saldo:,.2f}")
+st.metric("Receitas", f"R$ {totais['receitas']:,.2f}")
+st.metric("Despesas", f"R$ {totais['despesas']:,.2f}")
+st.metric("Saldo", f"R$ {totais['saldo']:,.2f}")
 
 # Gráfico de barras por categoria
 st.subheader("Despesas por Categoria")
-if not df[df["tipo"] == "Despesa"].empty:
-    graf = df[df["tipo"] == "Despesa"].groupby("categoria")["valor"].sum().reset_index()
-    st.bar_chart(graf, x="categoria", y="valor")
\ No newline at end of file
+graf = por_categoria("Despesa", inicio, fim)
+if not graf.empty:
+    st.bar_chart(graf, x="categoria", y="valor")
+
+# Fluxo de caixa mensal, direto dos totais por mês da razão
+st.subheader("Fluxo de Caixa Mensal")
+fluxo = fluxo_mensal()
+if not fluxo.empty:
+    st.bar_chart(fluxo[["Receitas", "Despesas"]])
+    st.line_chart(fluxo[["Saldo acumulado"]])
+
+# Conferência da razão com as transações
+with st.expander("Conferir totais"):
+    if st.button("Verificar"):
+        diferencas = verificar_razao()
+        if diferencas.empty:
+            st.success("Totais consistentes com as transações.")
+        else:
+            st.warning(f"{len(diferencas)} divergência(s) encontrada(s).")
+            st.dataframe(diferencas.astype({"chave": str}))
+    if st.button("Reconstruir totais"):
+        reconstruir_razao()
+        st.success("Totais reconstruídos a partir das transações.")
+
+instrumentacao.painel_lateral()
@@ -0,0 +1,239 @@
+# analise.py
+# Camada analítica: as agregações do Dashboard e do Relatório de Despesas rodam como SQL no
+# próprio motor do banco (SQLite em processo ou o servidor configurado) e só o resultado —
+# poucas linhas — vira DataFrame. Benchmark contra o caminho antigo em pandas no README.
+# Com [armazem] ativo = 1 (ou ARMAZEM_ATIVO=1), locações e despesas são lidas do armazém analítico em memória
+# mapeada (armazem_analitico.py, sincronizado pelo id a cada consulta) e agregadas com NumPy/pandas; as unidades
+# continuam vindo do banco.
+import numpy as np
+import pandas as pd
+import config
+from hospedagem_db import repo
+from instrumentacao import medido
+
+USAR_ARMAZEM = str(config.obter("armazem", "ativo", "0")).lower() in ("1", "true", "sim")
+
+def _ler(sql: str, params=(), conn=None) -> pd.DataFrame:
+    if conn is None:
+        return repo().ler(sql, params)
+    return pd.read_sql(sql, conn, params=list(params))
+
+def _filtro_unidades(unidades, params: list, coluna: str = "u.nome") -> str:
+    if not unidades:
+        return ""
+    params.extend(unidades)
+    return f" AND {coluna} IN ({', '.join('?' * len(unidades))})"
+
+def _armazem(tabela: str):
+    """(tabela mapeada, registros vivos) do armazém, sincronizado antes da leitura."""
+    import armazem_analitico
+    t = armazem_analitico.abrir(tabela)
+    t.sincronizar()
+    return t, t.ativos()
+
+def _nomes_unidades(unidades=None) -> pd.Series:
+    """id -> nome das unidades (só as pedidas, se houver filtro)."""
+    u = repo().ler("SELECT id, nome FROM unidades")
+    if unidades:
+        u = u[u["nome"].isin(unidades)]
+    return pd.Series(u["nome"].to_numpy(), index=u["id"].astype(np.int64).to_numpy())
+
+def plataformas(conn=None) -> list:
+    df = _ler("SELECT DISTINCT plataforma FROM locacoes WHERE plataforma IS NOT NULL ORDER BY plataforma", conn=conn)
+    return df["plataforma"].tolist()
+
+def tipos_despesa(conn=None) -> list:
+    df = _ler("SELECT DISTINCT tipo FROM despesas WHERE tipo IS NOT NULL ORDER BY tipo", conn=conn)
+    return df["tipo"].tolist()
+
+# ---------- RELATÓRIO MENSAL ----------
+@medido("analise.relatorio_mensal")
+def relatorio_mensal(unidades=None, mes=None, tipo=None, conn=None) -> pd.DataFrame:
+    """Receita, despesas por tipo, total de despesas e lucro por unidade/ano/mês.
+
+    unidades: lista de nomes (vazia ou None = todas); mes: 1..12 (None = todos os meses, de qualquer ano);
+    tipo: restringe as colunas de despesa exibidas a esse tipo (os totais continuam considerando todos)."""
+    if USAR_ARMAZEM and conn is None:
+        return _montar_relatorio(_longo_armazem(unidades, mes), tipo)
+    r = repo()
+    params = []
+    filtro_u_rec = _filtro_unidades(unidades, params)
+    filtro_mes_rec = ""
+    if mes:
+        filtro_mes_rec = f" AND {r.mes('l.checkin')} = ?"
+        params.append(int(mes))
+    filtro_u_desp = _filtro_unidades(unidades, params)
+    filtro_mes_desp = ""
+    if mes:
+        filtro_mes_desp = f" AND {r.mes('d.data')} = ?"
+        params.append(int(mes))
+
+    longo = _ler(f"""
+        SELECT u.nome,
+               {r.ano('l.checkin')} AS ano,
+               {r.mes('l.checkin')} AS mes,
+               NULL AS tipo,
+               SUM(l.valor) AS valor
+        FROM locacoes l JOIN unidades u ON u.id = l.unidade_id
+        WHERE l.checkin IS NOT NULL{filtro_u_rec}{filtro_mes_rec}
+        GROUP BY u.nome, {r.ano('l.checkin')}, {r.mes('l.checkin')}
+        UNION ALL
+        SELECT u.nome,
+               {r.ano('d.data')} AS ano,
+               {r.mes('d.data')} AS mes,
+               d.tipo,
+               SUM(d.valor) AS valor
+        FROM despesas d JOIN unidades u ON u.id = d.unidade_id
+        WHERE d.data IS NOT NULL{filtro_u_desp}{filtro_mes_desp}
+        GROUP BY u.nome, {r.ano('d.data')}, {r.mes('d.data')}, d.tipo
+    """, params, conn)
+    return _montar_relatorio(longo, tipo)
+
+def _longo_armazem(unidades, mes) -> pd.DataFrame:
+    """Mesmo formato longo do SQL (nome, ano, mes, tipo, valor) a partir do armazém."""
+    nomes = _nomes_unidades(unidades)
+    partes = []
+    for tabela, coluna in (("locacoes", "checkin"), ("despesas", "data")):
+        t, reg = _armazem(tabela)
+        datas = reg[coluna]
+        meses = datas.astype("M8[M]").astype(np.int64)
+        manter = ~np.isnat(datas) & np.isin(reg["unidade_id"], nomes.index)
+        if mes:
+            manter &= meses % 12 + 1 == int(mes)
+        meses = meses[manter]
+        df = pd.DataFrame({
+            "nome": nomes.reindex(reg["unidade_id"][manter]).to_numpy(),
+            "ano": meses // 12 + 1970, "mes": meses % 12 + 1,
+            "tipo": np.asarray(t.decodificar("tipo", reg["tipo"][manter]), dtype=object) if tabela == "despesas" else None,
+            "valor": reg["valor"][manter],
+        })
+        partes.append(df.groupby(["nome", "ano", "mes", "tipo"], dropna=False)["valor"].sum().reset_index())
+    return pd.concat(partes, ignore_index=True)
+
+def _montar_relatorio(longo: pd.DataFrame, tipo=None) -> pd.DataFrame:
+    chaves = ["nome", "ano", "mes"]
+    if longo.empty:
+        return pd.DataFrame(columns=chaves + ["Receita Bruta", "Total Despesas", "Lucro Líquido"])
+
+    longo["tipo"] = longo["tipo"].fillna("Receita Bruta")
+    relatorio = longo.pivot_table(index=chaves, columns="tipo", values="valor", aggfunc="sum", fill_value=0.0)
+    relatorio.columns.name = None
+    if "Receita Bruta" not in relatorio.columns:
+        relatorio["Receita Bruta"] = 0.0
+    tipos = sorted(c for c in relatorio.columns if c != "Receita Bruta")
+    relatorio["Total Despesas"] = relatorio[tipos].sum(axis=1) if tipos else 0.0
+    relatorio["Lucro Líquido"] = relatorio["Receita Bruta"] - relatorio["Total Despesas"]
+    if tipo and tipo != "Todos":
+        tipos = [tipo] if tipo in tipos else []
+    return relatorio.reset_index()[chaves + ["Receita Bruta"] + tipos + ["Total Despesas", "Lucro Líquido"]]
+
+# ---------- OCUPAÇÃO ----------
+@medido("analise.ocupacao")
+def ocupacao(inicio, fim, unidades=None, plataforma=None, conn=None) -> pd.DataFrame:
+    """Uma linha por unidade e dia do período com locação: valor pró-rata da diária e marcadores
+    de ocupado (noite paga), check-in e check-out."""
+    if USAR_ARMAZEM and conn is None:
+        return _ocupacao_armazem(inicio, fim, unidades, plataforma)
+    r = repo()
+    inicio = pd.Timestamp(inicio).date().isoformat()
+    fim = pd.Timestamp(fim).date().isoformat()
+    params = [inicio, fim, inicio, fim]
+    filtros = _filtro_unidades(unidades, params)
+    if plataforma and plataforma != "Todas":
+        filtros += " AND l.plataforma = ?"
+        params.append(plataforma)
+    ocup = _ler(f"""
+        {r.cte_recursiva()} dias(dia) AS (
+            SELECT {r.data('?')}
+            UNION ALL
+            SELECT {r.mais_dias('dia', 1)} FROM dias WHERE dia < {r.data('?')}
+        ),
+        locs AS (
+            SELECT u.nome,
+                   {r.data('l.checkin')} AS ci,
+                   {r.data('l.checkout')} AS co,
+                   COALESCE(l.valor, 0) AS valor,
+                   {r.dias_entre(r.data('l.checkin'), r.data('l.checkout'))} AS noites
+            FROM locacoes l JOIN unidades u ON u.id = l.unidade_id
+            WHERE l.checkout >= ? AND l.checkin < {r.mais_dias('?', 1)}{filtros}
+        )
+        SELECT locs.nome,
+               dias.dia,
+               SUM(CASE WHEN dias.dia < locs.co THEN locs.valor / locs.noites ELSE 0 END) AS valor,
+               MAX(CASE WHEN dias.dia < locs.co THEN 1 ELSE 0 END) AS ocupado,
+               MAX(CASE WHEN dias.dia = locs.ci THEN 1 ELSE 0 END) AS checkin,
+               MAX(CASE WHEN dias.dia = locs.co THEN 1 ELSE 0 END) AS checkout
+        FROM locs JOIN dias ON dias.dia BETWEEN locs.ci AND locs.co
+        GROUP BY locs.nome, dias.dia{r.sufixo_recursao()}
+    """, params, conn)
+    ocup["dia"] = pd.to_datetime(ocup["dia"]).dt.date.map(lambda d: d.isoformat())
+    return ocup
+
+def _ocupacao_armazem(inicio, fim, unidades=None, plataforma=None) -> pd.DataFrame:
+    """Mesmo resultado de `ocupacao`, expandindo as estadias do armazém em dias com NumPy."""
+    nomes = _nomes_unidades(unidades)
+    t, reg = _armazem("locacoes")
+    d0, d1 = np.datetime64(pd.Timestamp(inicio).date(), "D"), np.datetime64(pd.Timestamp(fim).date(), "D")
+    ci, co = reg["checkin"], reg["checkout"]
+    manter = (~np.isnat(ci) & ~np.isnat(co) & (co >= ci) & (co >= d0) & (ci <= d1)
+              & np.isin(reg["unidade_id"], nomes.index))
+    if plataforma and plataforma != "Todas":
+        dicionario = t.meta["dicionarios"]["plataforma"]
+        manter &= reg["plataforma"] == (dicionario.index(plataforma) + 1 if plataforma in dicionario else -1)
+    ci, co, valor, uid = ci[manter], co[manter], reg["valor"][manter], reg["unidade_id"][manter]
+
+    # uma linha por estadia e dia do período entre o check-in e o check-out (inclusive)
+    a, b = np.maximum(ci, d0), np.minimum(co, d1)
+    n = (b - a).astype(np.int64) + 1
+    i = np.repeat(np.arange(len(a)), n)
+    dia = a[i] + (np.arange(n.sum()) - np.repeat(np.cumsum(n) - n, n)).astype("m8[D]")
+    antes = dia < co[i]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        diaria = np.where(antes, valor[i] / (co - ci).astype(np.int64)[i], 0.0)
+    ocup = (
+        pd.DataFrame({"nome": nomes.reindex(uid[i]).to_numpy(), "dia": dia, "valor": diaria,
+                      "ocupado": antes.astype(int), "checkin": (dia == ci[i]).astype(int),
+                      "checkout": (dia == co[i]).astype(int)})
+        .groupby(["nome", "dia"], as_index=False)
+        .agg(valor=("valor", "sum"), ocupado=("ocupado", "max"), checkin=("checkin", "max"),
+             checkout=("checkout", "max"))
+    )
+    ocup["dia"] = ocup["dia"].dt.strftime("%Y-%m-%d")
+    return ocup
+
+@medido("analise.grade_ocupacao", linhas=lambda r: r[0].size)   # células da grade
+def grade_ocupacao(ocup: pd.DataFrame, nomes: list, inicio, fim):
+    """Monta a grade do Dashboard (unidades x dias) a partir do resultado de `ocupacao`.
+    Retorna (valores numéricos, tabela com ícones e valores formatados)."""
+    dias = pd.date_range(start=inicio, end=fim, freq="D")
+    dias_iso = [d.date().isoformat() for d in dias]
+    dias_str = [d.strftime("%d/%m") for d in dias]
+    index_nomes = list(nomes) + ["Total R$"]
+
+    ocup = ocup[ocup["nome"].isin(nomes)]
+    valores_num = (
+        ocup.pivot_table(index="nome", columns="dia", values="valor", aggfunc="sum")
+        .reindex(index=index_nomes, columns=dias_iso).fillna(0.0)
+    )
+    icones = pd.Series("", index=ocup.index)
+    icones[ocup["ocupado"] == 1] = "🟧"
+    icones[ocup["checkout"] == 1] = "◧"
+    icones[ocup["checkin"] == 1] = "🟦"
+    tabela_icon = (
+        ocup.assign(icone=icones)
+        .pivot_table(index="nome", columns="dia", values="icone", aggfunc="first")
+        .reindex(index=index_nomes, columns=dias_iso).fillna("")
+    )
+    valores_num.columns = dias_str
+    tabela_icon.columns = dias_str
+
+    valores_num.loc["Total R$", :] = valores_num.sum(axis=0)
+    valores_num["Total R$"] = valores_num[dias_str].sum(axis=1)
+    valores_num["Valor Líquido (-13%)"] = valores_num["Total R$"] * 0.87
+    valores_num["Total Administradora (20%)"] = valores_num["Total R$"] * 0.20
+
+    texto_valores = valores_num[dias_str].apply(lambda col: col.map(lambda v: f"{v:,.2f}"))
+    tabela_visual = tabela_icon.where(valores_num[dias_str] <= 0, (tabela_icon + " " + texto_valores).apply(lambda col: col.str.strip()))
+    for col in ["Total R$", "Valor Líquido (-13%)", "Total Administradora (20%)"]:
+        tabela_visual[col] = valores_num[col].map(lambda v: f"{v:,.2f}")
+    return valores_num, tabela_visual
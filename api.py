@@ -0,0 +1,302 @@
+# api.py
+# API REST (JSON) dos dados da hospedagem, registrada no app Flask do main.py em /api.
+#
+#   GET /api/unidades | /api/precos
+#   GET /api/locacoes | /api/despesas      ?unidade_id=&inicio=&fim=&apos=<id>&limite=
+#   GET /api/ocupacao                      ?inicio=&fim=&unidade=<nome>(repetível)&plataforma=
+#   GET /api/relatorios/mensal             ?unidade=<nome>(repetível)&mes=&tipo=
+#   POST /api/locacoes/lote                 array JSON ou NDJSON de reservas (ingestao_locacoes.py)
+#   GET /api/unidades/<id>/calendario.ics  feed iCal da unidade (calendario_ics.py)
+#   POST /api/unidades/<id>/calendario     ?plataforma=&remover_ausentes=1, corpo = feed ICS do canal
+#
+# Listas: paginação por chave (`apos` = último id recebido; a resposta traz `proximo`) ou, com ?formato=ndjson
+# (ou Accept: application/x-ndjson), a lista inteira em NDJSON, lida do banco em lotes enquanto é enviada.
+# GET condicional: o ETag vem da versão dos dados das tabelas envolvidas (hospedagem_db.versao_dados), dos
+# parâmetros e da codificação; If-None-Match igual responde 304 sem consultar os dados. Respostas com gzip quando
+# aceito.
+import gzip
+import hashlib
+import json
+import zlib
+import pandas as pd
+from flask import Blueprint, Response, request, jsonify
+import analise
+import calendario_ics
+import hospedagem_db
+import ingestao_locacoes
+
+bp = Blueprint("api", __name__)
+
+LIMITE_PADRAO = 500
+LIMITE_MAXIMO = 5000
+LOTE_NDJSON = 5000
+LIMITE_INGESTAO = 50000  # reservas por requisição
+GZIP_MINIMO = 1024       # bytes: abaixo disso não compensa comprimir
+NDJSON = "application/x-ndjson"
+
+# Colunas expostas e coluna de data (filtro inicio/fim) de cada lista
+LISTAS = {
+    "unidades": {"colunas": "id, nome, localizacao, capacidade, status", "data": None},
+    "precos": {"colunas": "id, unidade_id, temporada, preco_base", "data": None},
+    "locacoes": {
+        "colunas": "id, unidade_id, checkin, checkout, hospede, valor, plataforma, status_pagamento, id_externo",
+        "data": "checkin",
+    },
+    "despesas": {"colunas": "id, unidade_id, data, tipo, valor, descricao", "data": "data"},
+}
+
+
+class ErroRequisicao(ValueError):
+    pass
+
+
+@bp.errorhandler(ErroRequisicao)
+def _erro_requisicao(e):
+    return jsonify(erro=str(e)), 400
+
+
+# ---------- PARÂMETROS ----------
+def _inteiro(nome: str, padrao=None, minimo=None, maximo=None):
+    valor = request.args.get(nome)
+    if valor in (None, ""):
+        return padrao
+    try:
+        valor = int(valor)
+    except ValueError:
+        raise ErroRequisicao(f"'{nome}' deve ser inteiro")
+    if minimo is not None and valor < minimo:
+        raise ErroRequisicao(f"'{nome}' deve ser >= {minimo}")
+    if maximo is not None and valor > maximo:
+        raise ErroRequisicao(f"'{nome}' deve ser <= {maximo}")
+    return valor
+
+def _data(nome: str):
+    valor = request.args.get(nome)
+    if not valor:
+        return None
+    try:
+        return pd.Timestamp(valor).date().isoformat()
+    except ValueError:
+        raise ErroRequisicao(f"'{nome}' deve ser uma data AAAA-MM-DD")
+
+def _quer_ndjson() -> bool:
+    return request.args.get("formato") == "ndjson" or request.accept_mimetypes.best == NDJSON
+
+# ---------- SERIALIZAÇÃO ----------
+# DataFrame -> JSON pelo serializador em C do pandas (bem mais rápido que montar dicts e usar json.dumps)
+def _registros(df: pd.DataFrame) -> str:
+    return df.to_json(orient="records", force_ascii=False, date_format="iso")
+
+def _resposta_json(df: pd.DataFrame, **extras) -> Response:
+    corpo = '{"itens":' + _registros(df)
+    for chave, valor in extras.items():
+        corpo += f',"{chave}":' + ("null" if valor is None else str(valor))
+    return Response(corpo + "}", mimetype="application/json")
+
+def _linhas_json(df: pd.DataFrame) -> str:
+    """Um objeto JSON por linha."""
+    if df.empty:
+        return ""
+    return df.to_json(orient="records", lines=True, force_ascii=False, date_format="iso").rstrip("\n") + "\n"
+
+def _aceita_gzip() -> bool:
+    return "gzip" in request.headers.get("Accept-Encoding", "")
+
+def _gzip_stream(partes):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)   # wbits 31 = formato gzip
+    for parte in partes:
+        dados = compressor.compress(parte.encode("utf-8"))
+        if dados:
+            yield dados
+    yield compressor.flush()
+
+@bp.after_request
+def _comprimir(resposta: Response):
+    resposta.vary.add("Accept-Encoding")
+    if (resposta.is_streamed or resposta.status_code != 200 or "Content-Encoding" in resposta.headers
+            or not _aceita_gzip()):
+        return resposta
+    corpo = resposta.get_data()
+    if len(corpo) >= GZIP_MINIMO:
+        resposta.set_data(gzip.compress(corpo, 6))
+        resposta.headers["Content-Encoding"] = "gzip"
+    return resposta
+
+# ---------- GET CONDICIONAL ----------
+def _codificacao() -> str:
+    """Entra no ETag: o corpo com gzip e o sem são representações diferentes da mesma versão."""
+    return "gzip" if _aceita_gzip() else "identity"
+
+def _etag(*tabelas) -> str:
+    base = "|".join([hospedagem_db.versao_dados(*tabelas), request.full_path, str(_quer_ndjson()), _codificacao()])
+    return hashlib.sha1(base.encode("utf-8")).hexdigest()
+
+def _condicional(tabelas, gerar):
+    """Responde 304 se o cliente já tem a versão atual; senão gera a resposta com o ETag."""
+    etag = _etag(*tabelas)
+    if request.if_none_match.contains(etag):
+        resposta = Response(status=304)
+    else:
+        resposta = gerar()
+    resposta.set_etag(etag)
+    resposta.headers["Cache-Control"] = "no-cache"
+    return resposta
+
+def _ndjson(partes) -> Response:
+    if _aceita_gzip():
+        resposta = Response(_gzip_stream(partes), mimetype=NDJSON)
+        resposta.headers["Content-Encoding"] = "gzip"
+        return resposta
+    return Response((p.encode("utf-8") for p in partes), mimetype=NDJSON)
+
+# ---------- LISTAS (paginação por chave) ----------
+def _pagina(tabela: str, filtros: list, params: list, apos, limite: int) -> pd.DataFrame:
+    r = hospedagem_db.repo()
+    condicoes = list(filtros)
+    params = list(params)
+    if apos is not None:
+        condicoes.append("id > ?")
+        params.append(int(apos))
+    where = (" WHERE " + " AND ".join(condicoes)) if condicoes else ""
+    sql = f"SELECT {LISTAS[tabela]['colunas']} FROM {tabela}{where} ORDER BY id"
+    return r.ler(r.limitar(sql, limite), params)
+
+def _linhas_ndjson(tabela: str, filtros: list, params: list, apos):
+    while True:
+        df = _pagina(tabela, filtros, params, apos, LOTE_NDJSON)
+        if df.empty:
+            return
+        yield _linhas_json(df)
+        if len(df) < LOTE_NDJSON:
+            return
+        apos = int(df["id"].iloc[-1])
+
+def _listar(tabela: str):
+    cfg = LISTAS[tabela]
+    filtros, params = [], []
+    unidade_id = _inteiro("unidade_id", minimo=1)
+    if unidade_id is not None:
+        filtros.append("unidade_id = ?" if tabela != "unidades" else "id = ?")
+        params.append(unidade_id)
+    if cfg["data"]:
+        inicio, fim = _data("inicio"), _data("fim")
+        if inicio:
+            filtros.append(f"{cfg['data']} >= ?")
+            params.append(inicio)
+        if fim:
+            filtros.append(f"{cfg['data']} <= ?")
+            params.append(fim)
+    apos = _inteiro("apos")
+    limite = min(_inteiro("limite", LIMITE_PADRAO, minimo=1), LIMITE_MAXIMO)
+
+    def gerar():
+        if _quer_ndjson():
+            return _ndjson(_linhas_ndjson(tabela, filtros, params, apos))
+        df = _pagina(tabela, filtros, params, apos, limite + 1)
+        proximo = int(df["id"].iloc[limite - 1]) if len(df) > limite else None
+        return _resposta_json(df.iloc[:limite], proximo=proximo)
+
+    return _condicional([tabela], gerar)
+
+@bp.get("/unidades")
+def unidades():
+    return _listar("unidades")
+
+@bp.get("/precos")
+def precos():
+    return _listar("precos")
+
+@bp.get("/locacoes")
+def locacoes():
+    return _listar("locacoes")
+
+@bp.get("/despesas")
+def despesas():
+    return _listar("despesas")
+
+# ---------- OCUPAÇÃO E RELATÓRIOS ----------
+def _tabela_analitica(tabelas, calcular):
+    def gerar():
+        df = calcular()
+        if _quer_ndjson():
+            return _ndjson(iter([_linhas_json(df)]))
+        return _resposta_json(df)
+    return _condicional(tabelas, gerar)
+
+@bp.get("/ocupacao")
+def ocupacao():
+    inicio, fim = _data("inicio"), _data("fim")
+    if not inicio or not fim:
+        raise ErroRequisicao("informe 'inicio' e 'fim'")
+    if fim < inicio:
+        raise ErroRequisicao("'fim' antes de 'inicio'")
+    return _tabela_analitica(
+        ["unidades", "locacoes"],
+        lambda: analise.ocupacao(inicio, fim, request.args.getlist("unidade"), request.args.get("plataforma"))
+    )
+
+@bp.get("/relatorios/mensal")
+def relatorio_mensal():
+    mes = _inteiro("mes", minimo=1, maximo=12)
+    return _tabela_analitica(
+        ["unidades", "locacoes", "despesas"],
+        lambda: analise.relatorio_mensal(request.args.getlist("unidade"), mes, request.args.get("tipo"))
+    )
+
+# ---------- INGESTÃO ----------
+def _itens_ndjson():
+    itens = []
+    for n, linha in enumerate(request.stream, start=1):
+        linha = linha.strip()
+        if not linha:
+            continue
+        try:
+            itens.append(json.loads(linha))
+        except ValueError:
+            raise ErroRequisicao(f"linha {n}: JSON inválido")
+        if len(itens) > LIMITE_INGESTAO:
+            break
+    return itens
+
+@bp.post("/locacoes/lote")
+def ingerir_locacoes():
+    if request.mimetype == NDJSON or request.args.get("formato") == "ndjson":
+        itens = _itens_ndjson()
+    else:
+        corpo = request.get_json(silent=True)
+        itens = corpo.get("itens") if isinstance(corpo, dict) else corpo
+        if not isinstance(itens, list):
+            raise ErroRequisicao("envie um array JSON de reservas (ou NDJSON, uma por linha)")
+    if len(itens) > LIMITE_INGESTAO:
+        return jsonify(erro=f"no máximo {LIMITE_INGESTAO} reservas por requisição"), 413
+    if not all(isinstance(i, dict) for i in itens):
+        raise ErroRequisicao("cada reserva deve ser um objeto JSON")
+    return jsonify(ingestao_locacoes.ingerir(itens))
+
+# ---------- CALENDÁRIOS ICS ----------
+@bp.get("/unidades/<int:unidade_id>/calendario.ics")
+def calendario(unidade_id: int):
+    resultado = calendario_ics.calendario(unidade_id)
+    if resultado is None:
+        return jsonify(erro="unidade não encontrada"), 404
+    etag, corpo = resultado
+    etag = hashlib.sha1(f"{etag}|{_codificacao()}".encode("utf-8")).hexdigest()
+    if request.if_none_match.contains(etag):
+        resposta = Response(status=304)
+    else:
+        resposta = Response(corpo, mimetype="text/calendar")
+    resposta.set_etag(etag)
+    resposta.headers["Cache-Control"] = "no-cache"
+    return resposta
+
+@bp.post("/unidades/<int:unidade_id>/calendario")
+def importar_calendario(unidade_id: int):
+    plataforma = request.args.get("plataforma", "")
+    if plataforma not in hospedagem_db.PLATAFORMAS:
+        raise ErroRequisicao(f"'plataforma' deve ser uma de {hospedagem_db.PLATAFORMAS}")
+    if not hospedagem_db.versao_unidade(unidade_id):
+        return jsonify(erro="unidade não encontrada"), 404
+    linhas = (l.decode("utf-8", "replace") for l in request.stream)
+    return jsonify(calendario_ics.importar(
+        linhas, unidade_id, plataforma, request.args.get("remover_ausentes") in ("1", "true")
+    ))
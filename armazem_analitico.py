@@ -0,0 +1,246 @@
+# armazem_analitico.py
+# Espelho opcional de `locacoes` e `despesas` em arrays estruturados NumPy de largura fixa,
+# gravados em disco e lidos via memória mapeada. O arquivo de registros só cresce (append-only);
+# exclusões e alterações marcam a posição antiga num bitmap de lápides e, no caso de alteração,
+# a nova versão da linha é acrescentada ao final. As alterações são achadas pela coluna `versao`.
+#
+# Uso: python armazem_analitico.py  (sincroniza as duas tabelas a partir do hospedagem.db)
+# Com [armazem] ativo = 1 o analise.py agrega a partir daqui (relatório mensal e ocupação).
+import json
+import os
+import sys
+import numpy as np
+import pandas as pd
+import config
+from hospedagem_db import conectar, tipar, PLATAFORMAS, STATUS_PAGAMENTO, TIPOS_DESPESA
+
+DIR_ARMAZEM = config.obter("armazem", "diretorio", "analitico")
+
+# Textos livres (hospede, descricao) ficam de fora: não são usados nas análises e
+# quebrariam a largura fixa dos registros.
+DTYPES = {
+    "locacoes": np.dtype([
+        ("id", "<i4"),
+        ("unidade_id", "<i4"),
+        ("checkin", "<M8[D]"),
+        ("checkout", "<M8[D]"),
+        ("valor", "<f8"),
+        ("plataforma", "u1"),
+        ("status_pagamento", "u1"),
+    ]),
+    "despesas": np.dtype([
+        ("id", "<i4"),
+        ("unidade_id", "<i4"),
+        ("data", "<M8[D]"),
+        ("valor", "<f8"),
+        ("tipo", "u1"),
+    ]),
+}
+
+# Colunas categóricas são gravadas como código u1 (0 = vazio); o dicionário fica no .json
+CATEGORICAS = {
+    "locacoes": {"plataforma": PLATAFORMAS, "status_pagamento": STATUS_PAGAMENTO},
+    "despesas": {"tipo": TIPOS_DESPESA},
+}
+
+DATAS = {"locacoes": ["checkin", "checkout"], "despesas": ["data"]}
+
+
+class TabelaMapeada:
+    def __init__(self, tabela: str, diretorio: str = DIR_ARMAZEM):
+        self.tabela = tabela
+        self.dtype = DTYPES[tabela]
+        os.makedirs(diretorio, exist_ok=True)
+        base = os.path.join(diretorio, tabela)
+        self.arq_registros = base + ".bin"
+        self.arq_lapides = base + ".del"
+        self.arq_meta = base + ".json"
+        self.meta = self._ler_meta()
+
+    # ---------- METADADOS ----------
+    def _ler_meta(self):
+        if os.path.exists(self.arq_meta):
+            with open(self.arq_meta, encoding="utf-8") as f:
+                return json.load(f)
+        return {
+            "ultimo_id": 0,
+            "dicionarios": {col: list(opcoes) for col, opcoes in CATEGORICAS[self.tabela].items()},
+        }
+
+    def _gravar_meta(self):
+        tmp = self.arq_meta + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.meta, f, ensure_ascii=False)
+        os.replace(tmp, self.arq_meta)
+
+    # ---------- LEITURA (sem cópia) ----------
+    def __len__(self):
+        if not os.path.exists(self.arq_registros):
+            return 0
+        return os.path.getsize(self.arq_registros) // self.dtype.itemsize
+
+    def registros(self) -> np.ndarray:
+        """Todos os registros (inclusive os excluídos), mapeados do disco sem cópia."""
+        n = len(self)
+        if n == 0:
+            return np.empty(0, dtype=self.dtype)
+        return np.memmap(self.arq_registros, dtype=self.dtype, mode="r", shape=(n,))
+
+    def vivos(self) -> np.ndarray:
+        """Máscara booleana das posições não marcadas no bitmap de lápides."""
+        n = len(self)
+        if n == 0 or not os.path.exists(self.arq_lapides):
+            return np.ones(n, dtype=bool)
+        bits = np.fromfile(self.arq_lapides, dtype=np.uint8)
+        return ~np.unpackbits(bits, count=n, bitorder="little").astype(bool)
+
+    def ativos(self) -> np.ndarray:
+        return self.registros()[self.vivos()]
+
+    def decodificar(self, coluna: str, codigos: np.ndarray) -> pd.Categorical:
+        return pd.Categorical.from_codes(codigos.astype(np.int16) - 1, self.meta["dicionarios"][coluna])
+
+    def para_dataframe(self, registros: np.ndarray = None) -> pd.DataFrame:
+        registros = self.ativos() if registros is None else registros
+        df = pd.DataFrame({nome: registros[nome] for nome in self.dtype.names})
+        for col in CATEGORICAS[self.tabela]:
+            df[col] = self.decodificar(col, registros[col])
+        for col in DATAS[self.tabela]:
+            df[col] = df[col].astype("datetime64[ns]")
+        return df
+
+    # ---------- ESCRITA (append-only) ----------
+    def _acrescentar(self, novos: np.ndarray):
+        if len(novos) == 0:
+            return
+        n_antes = len(self)
+        with open(self.arq_registros, "ab") as f:
+            f.write(novos.tobytes())
+        # o bitmap cresce junto, com as novas posições vivas (bit 0)
+        bytes_necessarios = (n_antes + len(novos) + 7) // 8
+        tamanho = os.path.getsize(self.arq_lapides) if os.path.exists(self.arq_lapides) else 0
+        if bytes_necessarios > tamanho:
+            with open(self.arq_lapides, "ab") as f:
+                f.write(b"\x00" * (bytes_necessarios - tamanho))
+
+    def _marcar_excluidos(self, posicoes: np.ndarray):
+        if len(posicoes) == 0:
+            return
+        bits = np.memmap(self.arq_lapides, dtype=np.uint8, mode="r+")
+        posicoes = np.asarray(posicoes, dtype=np.int64)
+        np.bitwise_or.at(bits, posicoes // 8, (1 << (posicoes % 8)).astype(np.uint8))
+        bits.flush()
+        del bits
+
+    def _codificar(self, df: pd.DataFrame) -> np.ndarray:
+        df = tipar(df, self.tabela)
+        arr = np.zeros(len(df), dtype=self.dtype)
+        arr["id"] = df["id"].to_numpy()
+        arr["unidade_id"] = df["unidade_id"].fillna(0).to_numpy()
+        arr["valor"] = df["valor"].fillna(0.0).to_numpy()
+        for col in DATAS[self.tabela]:
+            arr[col] = df[col].to_numpy().astype("M8[D]")
+        for col in CATEGORICAS[self.tabela]:
+            dicionario = self.meta["dicionarios"][col]
+            for valor in df[col].dropna().unique():
+                if valor not in dicionario:
+                    if len(dicionario) >= 255:
+                        raise ValueError(f"Coluna {col} excedeu 255 valores distintos")
+                    dicionario.append(valor)
+            codigos = {v: i + 1 for i, v in enumerate(dicionario)}
+            arr[col] = df[col].astype(object).map(codigos).fillna(0).to_numpy()
+        return arr
+
+    # ---------- SINCRONIZAÇÃO COM O SQLITE ----------
+    def sincronizar(self, conn=None, verificar: bool = False) -> dict:
+        """Traz as linhas incluídas ou alteradas desde a última sincronização (coluna `versao`, que os gatilhos
+        do hospedagem_db atualizam a cada gravação, acima da maior já vista) e marca como excluídas as que
+        sumiram do banco. A versão anterior de uma linha alterada vira lápide e a nova é acrescentada.
+        Com verificar=True compara também o conteúdo de todas as linhas já espelhadas (feito sozinho na
+        primeira sincronização de um armazém criado antes da marca de versão)."""
+        proprio = conn is None
+        if proprio:
+            conn = conectar()
+        verificar = verificar or "ultima_versao" not in self.meta
+        try:
+            colunas = ", ".join(self.dtype.names)
+            registros = self.registros()
+            vivos = self.vivos()
+            ids_sqlite = np.array([r[0] for r in conn.execute(f"SELECT id FROM {self.tabela}")], dtype=np.int32)
+
+            # exclusões: ids vivos no armazém que não existem mais no banco
+            excluir = np.flatnonzero(vivos & ~np.isin(registros["id"], ids_sqlite))
+
+            # incluídas ou alteradas desde a última marca (id acima do último cobre linhas anteriores à versão)
+            mudancas = pd.read_sql(
+                f"SELECT {colunas}, versao FROM {self.tabela} WHERE versao > ? OR id > ? ORDER BY id", conn,
+                params=(self.meta.get("ultima_versao", 0), self.meta["ultimo_id"])
+            )
+
+            conferir = np.empty(0, dtype=np.int64)
+            reconferidos = np.empty(0, dtype=self.dtype)
+            if verificar and len(registros):
+                atuais = pd.read_sql(f"SELECT {colunas} FROM {self.tabela} WHERE id <= ?", conn,
+                                     params=(self.meta["ultimo_id"],))
+                atuais = self._codificar(atuais)
+                pos_vivas = np.flatnonzero(vivos)
+                pos_vivas = pos_vivas[np.isin(registros["id"][pos_vivas], atuais["id"])]
+                ordem = np.argsort(atuais["id"])
+                idx = ordem[np.searchsorted(atuais["id"], registros["id"][pos_vivas], sorter=ordem)]
+                # comparação byte a byte (NaT != NaT quebraria a comparação campo a campo)
+                bruto = np.dtype((np.void, self.dtype.itemsize))
+                diferentes = registros[pos_vivas].view(bruto) != atuais[idx].view(bruto)
+                conferir = pos_vivas[diferentes]
+                reconferidos = atuais[idx[diferentes]]
+        finally:
+            if proprio:
+                conn.close()
+
+        mudancas_arr = self._codificar(mudancas.drop(columns="versao"))
+        # linhas que já estavam no armazém: a posição viva vira lápide
+        ja_espelhadas = vivos & np.isin(registros["id"], mudancas_arr["id"])
+        alterados = np.union1d(np.flatnonzero(ja_espelhadas), conferir)
+        reconferidos = reconferidos[~np.isin(reconferidos["id"], mudancas_arr["id"])]
+        self._marcar_excluidos(np.concatenate([excluir, alterados]))
+        self._acrescentar(reconferidos)
+        self._acrescentar(mudancas_arr)
+        if len(mudancas_arr):
+            self.meta["ultimo_id"] = max(self.meta["ultimo_id"], int(mudancas_arr["id"].max()))
+        self.meta["ultima_versao"] = max(self.meta.get("ultima_versao", 0),
+                                         int(mudancas["versao"].fillna(0).max()) if len(mudancas) else 0)
+        self._gravar_meta()
+        return {"novos": len(mudancas_arr) - int(ja_espelhadas.sum()), "excluidos": len(excluir),
+                "alterados": len(alterados)}
+
+    def compactar(self):
+        """Regrava apenas os registros vivos (libera o espaço das lápides)."""
+        vivos = np.array(self.ativos())
+        for arq in (self.arq_registros, self.arq_lapides):
+            if os.path.exists(arq):
+                os.remove(arq)
+        self._acrescentar(vivos)
+
+
+def abrir(tabela: str, diretorio: str = DIR_ARMAZEM) -> TabelaMapeada:
+    return TabelaMapeada(tabela, diretorio)
+
+def carregar(tabela: str, sincronizar: bool = True, diretorio: str = DIR_ARMAZEM) -> pd.DataFrame:
+    t = abrir(tabela, diretorio)
+    if sincronizar:
+        t.sincronizar()
+    return t.para_dataframe()
+
+def fatiar_periodo(tabela: str, inicio, fim, coluna: str = None, diretorio: str = DIR_ARMAZEM) -> np.ndarray:
+    """Registros vivos com a coluna de data dentro de [inicio, fim], direto do mapa em memória."""
+    t = abrir(tabela, diretorio)
+    coluna = coluna or DATAS[tabela][0]
+    reg = t.registros()
+    datas = reg[coluna]
+    mascara = t.vivos() & (datas >= np.datetime64(inicio, "D")) & (datas <= np.datetime64(fim, "D"))
+    return reg[mascara]
+
+
+if __name__ == "__main__":
+    verificar = "--verificar" in sys.argv
+    for tabela in DTYPES:
+        print(tabela, abrir(tabela).sincronizar(verificar=verificar))
@@ -0,0 +1 @@
+# benchmarks: dados sintéticos (dados_sinteticos.py), execução (rodar.py) e comparação (comparar.py)
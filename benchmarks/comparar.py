@@ -0,0 +1,58 @@
+# benchmarks/comparar.py
+# Compara dois resultados do benchmarks/rodar.py (mesma escala) caso a caso pela mediana e aponta regressões.
+# Sai com código 1 se algum caso ficou mais lento que o limite, para uso em CI ou antes de um merge.
+#
+#   python -m benchmarks.comparar antes.json depois.json [--limite 10]
+import argparse
+import json
+import sys
+import pandas as pd
+
+LIMITE_PCT = 10.0     # variação da mediana acima disso é regressão
+MINIMO_S = 0.001      # casos abaixo de 1 ms nas duas medições são ruído demais para julgar
+
+
+def carregar(caminho: str) -> dict:
+    with open(caminho, encoding="utf-8") as f:
+        return json.load(f)
+
+def comparar(antes: dict, depois: dict, limite_pct: float = LIMITE_PCT) -> pd.DataFrame:
+    """Uma linha por caso: medianas (ms), variação (%) e situação (regressão, melhora, estável, novo, removido)."""
+    nomes = list(dict.fromkeys([*antes["casos"], *depois["casos"]]))
+    linhas = []
+    for nome in nomes:
+        a = antes["casos"].get(nome, {}).get("mediana_s")
+        d = depois["casos"].get(nome, {}).get("mediana_s")
+        if a is None or d is None:
+            linhas.append((nome, a, d, None, "novo" if a is None else "removido"))
+            continue
+        variacao = (d - a) / a * 100 if a else 0.0
+        if max(a, d) < MINIMO_S:
+            situacao = "estável"
+        elif variacao > limite_pct:
+            situacao = "regressão"
+        elif variacao < -limite_pct:
+            situacao = "melhora"
+        else:
+            situacao = "estável"
+        linhas.append((nome, a, d, round(variacao, 1), situacao))
+    df = pd.DataFrame(linhas, columns=["caso", "antes_ms", "depois_ms", "variacao_pct", "situacao"])
+    df[["antes_ms", "depois_ms"]] = (df[["antes_ms", "depois_ms"]] * 1000).round(2)
+    return df
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Compara dois resultados de benchmark.")
+    ap.add_argument("antes")
+    ap.add_argument("depois")
+    ap.add_argument("--limite", type=float, default=LIMITE_PCT, help="variação (%%) que conta como regressão")
+    args = ap.parse_args()
+    antes, depois = carregar(args.antes), carregar(args.depois)
+    if antes["meta"]["linhas"] != depois["meta"]["linhas"]:
+        sys.exit(f"escalas diferentes: {antes['meta']['linhas']} x {depois['meta']['linhas']}")
+    print(f"{antes['meta']['commit']} -> {depois['meta']['commit']}  ({antes['meta']['linhas']:,} linhas)")
+    df = comparar(antes, depois, args.limite)
+    print(df.to_string(index=False))
+    regressoes = df[df["situacao"] == "regressão"]
+    if not regressoes.empty:
+        sys.exit(f"{len(regressoes)} regressão(ões) acima de {args.limite}%")
@@ -0,0 +1,217 @@
+# benchmarks/dados_sinteticos.py
+# Dados sintéticos para os benchmarks, em qualquer escala (1k a 10M linhas), gerados com NumPy e gravados em lote
+# nos bancos configurados (use HOSPEDAGEM_CAMINHO / FINANCEIRO_CAMINHO / PRONTIDAO_* apontando para arquivos
+# descartáveis; benchmarks/rodar.py faz isso num diretório temporário).
+#
+#   hospedagem.db  unidades, locações com estadias de 1 a 30 noites (maioria curta) em sequência por unidade e ~2%
+#                  sobrepostas (overbooking), despesas mensais de todos os TIPOS_DESPESA e preços por temporada
+#   financeiro.db  receitas e despesas de várias categorias ao longo dos anos, com a razão reconstruída
+#   prontidão      substituto local da view REP_TESTE_PRONTIDAO_BR (arquivo para [prontidao] origem_sqlite):
+#                  empregados numa hierarquia DES_N1..DES_N5 com um teste por dia útil
+#
+#   python -m benchmarks.dados_sinteticos --linhas 100000 --destino /tmp/bench
+import argparse
+import os
+import sqlite3
+from datetime import date
+import numpy as np
+import pandas as pd
+
+INICIO = date(2018, 1, 1)
+LOTE = 100_000
+SOBREPOSICAO = 0.02        # fração das estadias que começa antes do checkout da anterior
+STATUS_PRONTIDAO = ["TESTE NO HORÁRIO", "TESTE TARDIO", "NÃO REALIZOU"]
+NOMES = ["Ana", "Bruno", "Carla", "Diego", "Elisa", "Fábio", "Gabriela", "Heitor", "Isabela", "João", "Larissa",
+         "Marcos", "Natália", "Otávio", "Paula", "Rafael", "Sofia", "Tiago", "Vitória", "Yuri"]
+SOBRENOMES = ["Silva", "Santos", "Oliveira", "Souza", "Lima", "Pereira", "Costa", "Ferreira", "Almeida", "Ribeiro",
+              "Carvalho", "Gomes", "Martins", "Araújo", "Rocha", "Barbosa"]
+
+
+def _datas(dias: np.ndarray) -> np.ndarray:
+    """Dias desde INICIO -> 'AAAA-MM-DD'."""
+    return np.datetime_as_string(np.datetime64(INICIO) + dias.astype("timedelta64[D]"), unit="D")
+
+def _nomes(rng, n: int) -> np.ndarray:
+    return (np.array(NOMES, dtype=object)[rng.integers(0, len(NOMES), n)] + " "
+            + np.array(SOBRENOMES, dtype=object)[rng.integers(0, len(SOBRENOMES), n)])
+
+def _gravar(conn, sql: str, colunas):
+    """executemany em lotes de LOTE linhas a partir de colunas (arrays do mesmo tamanho)."""
+    n = len(colunas[0])
+    cur = conn.cursor()
+    for i in range(0, n, LOTE):
+        cur.executemany(sql, zip(*(c[i:i + LOTE].tolist() for c in colunas)))
+    conn.commit()
+
+
+# ---------- HOSPEDAGEM ----------
+def estadias(rng, n_locacoes: int, n_unidades: int):
+    """(unidade_id, checkin, checkout) em dias desde INICIO: por unidade, estadias em sequência com intervalos
+    de 0 a ~10 dias; uma fração começa antes do fim da anterior."""
+    por_unidade = -(-n_locacoes // n_unidades)
+    noites = np.clip(np.round(rng.lognormal(1.0, 0.6, (n_unidades, por_unidade))), 1, 30).astype(np.int64)
+    intervalo = rng.geometric(0.35, (n_unidades, por_unidade)) - 1
+    fim = np.cumsum(noites + intervalo, axis=1) + rng.integers(0, 30, (n_unidades, 1))
+    inicio = fim - noites
+    sobrepoe = rng.random((n_unidades, por_unidade)) < SOBREPOSICAO
+    inicio = np.where(sobrepoe, inicio - intervalo - rng.integers(1, 3, inicio.shape), inicio)
+    unidade = np.repeat(np.arange(1, n_unidades + 1), por_unidade).reshape(n_unidades, por_unidade)
+    return unidade.ravel()[:n_locacoes], inicio.ravel()[:n_locacoes], fim.ravel()[:n_locacoes]
+
+def _temporada(meses: np.ndarray) -> np.ndarray:
+    """0 = Baixa, 1 = Média, 2 = Alta (verão e férias de julho)."""
+    return np.select([np.isin(meses, [12, 1, 2, 7]), np.isin(meses, [3, 6, 11])], [2, 1], 0)
+
+def gerar_hospedagem(n_locacoes: int, semente: int = 42) -> dict:
+    import hospedagem_db
+    from hospedagem_db import PLATAFORMAS, STATUS_PAGAMENTO, TIPOS_DESPESA, TEMPORADAS, STATUS_UNIDADE
+    rng = np.random.default_rng(semente)
+    hospedagem_db.inicializar_db()
+    conn = hospedagem_db.conectar()
+
+    n_unidades = int(np.clip(n_locacoes // 400, 5, 25_000))
+    _gravar(conn, "INSERT INTO unidades (id, nome, localizacao, capacidade, status) VALUES (?, ?, ?, ?, ?)", [
+        np.arange(1, n_unidades + 1),
+        np.array([f"Unidade {i:05d}" for i in range(1, n_unidades + 1)], dtype=object),
+        np.array(["Centro", "Praia", "Serra", "Zona Sul", "Zona Norte"], dtype=object)[rng.integers(0, 5, n_unidades)],
+        rng.integers(2, 9, n_unidades),
+        np.array(STATUS_UNIDADE, dtype=object)[rng.choice(3, n_unidades, p=[0.8, 0.15, 0.05])],
+    ])
+
+    base = rng.uniform(150, 600, n_unidades)
+    fator = np.array([1.0, 1.3, 1.8])
+    _gravar(conn, "INSERT INTO precos (unidade_id, temporada, preco_base) VALUES (?, ?, ?)", [
+        np.repeat(np.arange(1, n_unidades + 1), 3),
+        np.tile(np.array(TEMPORADAS, dtype=object), n_unidades),
+        np.round(np.repeat(base, 3) * np.tile(fator, n_unidades), 2),
+    ])
+
+    unidade, inicio, fim = estadias(rng, n_locacoes, n_unidades)
+    checkin = _datas(inicio)
+    meses = (np.datetime64(INICIO) + inicio.astype("timedelta64[D]")).astype("datetime64[M]").astype(int) % 12 + 1
+    diaria = base[unidade - 1] * fator[_temporada(meses)]
+    valor = np.round((fim - inicio) * diaria * rng.uniform(0.85, 1.15, n_locacoes), 2)
+    _gravar(conn, "INSERT INTO locacoes (unidade_id, checkin, checkout, hospede, valor, plataforma, status_pagamento) "
+                  "VALUES (?, ?, ?, ?, ?, ?, ?)", [
+        unidade, checkin.astype(object), _datas(fim).astype(object), _nomes(rng, n_locacoes), valor,
+        np.array(PLATAFORMAS, dtype=object)[rng.choice(3, n_locacoes, p=[0.55, 0.35, 0.10])],
+        np.array(STATUS_PAGAMENTO, dtype=object)[rng.choice(2, n_locacoes, p=[0.2, 0.8])],
+    ])
+
+    # despesas: meses cobertos pelas locações, todos os tipos presentes
+    n_despesas = max(len(TIPOS_DESPESA), n_locacoes // 2)
+    dias = rng.integers(0, max(int(fim.max()), 30), n_despesas)
+    tipo = np.arange(n_despesas) % len(TIPOS_DESPESA)
+    rng.shuffle(tipo)
+    escala_tipo = np.array([1500, 600, 250, 120, 90, 400, 150, 350, 200, 100])[tipo]
+    _gravar(conn, "INSERT INTO despesas (unidade_id, data, tipo, valor, descricao) VALUES (?, ?, ?, ?, ?)", [
+        rng.integers(1, n_unidades + 1, n_despesas), _datas(dias).astype(object),
+        np.array(TIPOS_DESPESA, dtype=object)[tipo],
+        np.round(escala_tipo * rng.uniform(0.5, 1.5, n_despesas), 2),
+        np.array(["Mensal", "Avulsa", "Reparo", "Reposição", ""], dtype=object)[rng.integers(0, 5, n_despesas)],
+    ])
+    conn.close()
+    return {"unidades": n_unidades, "locacoes": n_locacoes, "despesas": n_despesas, "precos": n_unidades * 3}
+
+
+# ---------- FINANCEIRO ----------
+CATEGORIAS = {
+    "Receita": ["Hospedagem", "Serviços", "Rendimentos", "Outros"],
+    "Despesa": ["Manutenção", "Limpeza", "Impostos", "Luz", "Internet", "Condominio", "Administradora", "Outros"],
+}
+
+def gerar_financeiro(n_transacoes: int, semente: int = 42) -> dict:
+    import financeiro_db
+    rng = np.random.default_rng(semente + 1)
+    financeiro_db.inicializar_db()
+    receita = rng.random(n_transacoes) < 0.45
+    cat_receita = np.array(CATEGORIAS["Receita"], dtype=object)[rng.integers(0, 4, n_transacoes)]
+    cat_despesa = np.array(CATEGORIAS["Despesa"], dtype=object)[rng.integers(0, 8, n_transacoes)]
+    dias = rng.integers(0, 365 * 8, n_transacoes)
+    conn = financeiro_db.conectar()
+    _gravar(conn, financeiro_db.SQL_INSERIR, [
+        _datas(dias).astype(object), np.where(receita, "Receita", "Despesa").astype(object),
+        np.where(receita, cat_receita, cat_despesa), np.round(rng.lognormal(5.5, 1.0, n_transacoes), 2),
+        np.array(["Lançamento sintético"] * 4, dtype=object)[rng.integers(0, 4, n_transacoes)],
+    ])
+    conn.close()
+    financeiro_db.reconstruir_razao()
+    return {"transacoes": n_transacoes}
+
+
+# ---------- PRONTIDÃO ----------
+def gerar_prontidao(n_linhas: int, caminho_origem: str, semente: int = 42) -> dict:
+    """Arquivo SQLite com a tabela REP_TESTE_PRONTIDAO_BR (anexado como VFBR pelo prontidao_dados)."""
+    import prontidao_dados
+    rng = np.random.default_rng(semente + 2)
+    dias_uteis = pd.bdate_range("2022-07-01", periods=max(30, min(1000, n_linhas // 20)))
+    n_empregados = max(1, -(-n_linhas // len(dias_uteis)))
+    # hierarquia: 3 diretorias > 4 gerências > 5 áreas > 4 setores > 3 equipes
+    ramos = [3, 4, 5, 4, 3]
+    folha = rng.integers(0, np.prod(ramos), n_empregados)
+    niveis, resto = [], folha.copy()
+    for k in range(len(ramos) - 1, -1, -1):
+        niveis.insert(0, resto % ramos[k])
+        resto //= ramos[k]
+    caminhos = np.empty((n_empregados, len(ramos)), dtype=object)
+    prefixo = np.full(n_empregados, "", dtype=object)
+    for k, rotulo in enumerate(["DIR", "GER", "AREA", "SET", "EQ"]):
+        prefixo = prefixo + f"{rotulo}" + niveis[k].astype(str)
+        caminhos[:, k] = prefixo
+        prefixo = prefixo + "-"
+
+    emp = np.arange(n_linhas) % n_empregados
+    dia = np.arange(n_linhas) // n_empregados
+    horario = (dias_uteis[dia].to_numpy() + pd.to_timedelta(rng.integers(6 * 60, 9 * 60, n_linhas), unit="m")
+               .to_numpy())
+    nomes = _nomes(rng, n_empregados) + " " + np.arange(n_empregados).astype(str).astype(object)
+    df = pd.DataFrame({
+        "MATRICULA": (100000 + emp).astype(str), "NOME": nomes[emp],
+        **{f"DES_N{k + 1}": caminhos[emp, k] for k in range(len(ramos))},
+        "DT_ENTRADA": pd.Series(horario).dt.strftime("%Y-%m-%d %H:%M:%S").to_numpy(),
+        "TESTE_REAL": np.array(STATUS_PRONTIDAO, dtype=object)[rng.choice(3, n_linhas, p=[0.82, 0.12, 0.06])],
+    })
+    if os.path.exists(caminho_origem):
+        os.remove(caminho_origem)
+    conn = sqlite3.connect(caminho_origem)
+    tabela = prontidao_dados.VIEW.split(".", 1)[1]
+    conn.execute(f"CREATE TABLE {tabela} ({', '.join(prontidao_dados.COLUNAS)})")
+    _gravar(conn, f"INSERT INTO {tabela} VALUES ({', '.join('?' * len(prontidao_dados.COLUNAS))})",
+            [df[c].to_numpy() for c in prontidao_dados.COLUNAS])
+    conn.close()
+    return {"prontidao": n_linhas, "empregados": n_empregados, "dias": int(dia.max()) + 1}
+
+
+def configurar_ambiente(destino: str) -> dict:
+    """Aponta os bancos para arquivos em `destino` (antes de importar os módulos do app)."""
+    os.makedirs(destino, exist_ok=True)
+    caminhos = {
+        "HOSPEDAGEM_BACKEND": "sqlite", "HOSPEDAGEM_CAMINHO": os.path.join(destino, "hospedagem.db"),
+        "FINANCEIRO_BACKEND": "sqlite", "FINANCEIRO_CAMINHO": os.path.join(destino, "financeiro.db"),
+        "PRONTIDAO_ORIGEM_SQLITE": os.path.join(destino, "prontidao_origem.db"),
+        "PRONTIDAO_CACHE": os.path.join(destino, "prontidao_cache.db"),
+        "HOSPEDAQUI_CONFIG": os.path.join(destino, "sem_config.ini"),   # ignora o config.ini local
+        "INSTRUMENTACAO_ATIVA": "0",
+        "ARMAZEM_ATIVO": "0", "ARMAZEM_DIRETORIO": os.path.join(destino, "analitico"),
+    }
+    os.environ.update(caminhos)
+    return caminhos
+
+def gerar_tudo(n_linhas: int, destino: str, semente: int = 42) -> dict:
+    caminhos = configurar_ambiente(destino)
+    for chave in ("HOSPEDAGEM_CAMINHO", "FINANCEIRO_CAMINHO", "PRONTIDAO_CACHE"):
+        if os.path.exists(caminhos[chave]):
+            raise FileExistsError(f"{caminhos[chave]} já existe: use um destino vazio")
+    contagens = gerar_hospedagem(n_linhas, semente)
+    contagens.update(gerar_financeiro(n_linhas, semente))
+    contagens.update(gerar_prontidao(n_linhas, caminhos["PRONTIDAO_ORIGEM_SQLITE"], semente))
+    return contagens
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Gera hospedagem.db, financeiro.db e a origem da prontidão sintéticos.")
+    ap.add_argument("--linhas", type=int, default=100_000, help="locações, transações e linhas de prontidão")
+    ap.add_argument("--destino", required=True, help="diretório (vazio) dos arquivos gerados")
+    ap.add_argument("--semente", type=int, default=42)
+    args = ap.parse_args()
+    print(gerar_tudo(args.linhas, args.destino, args.semente))
@@ -0,0 +1,237 @@
+# benchmarks/rodar.py
+# Mede os caminhos quentes do app sobre dados sintéticos (benchmarks/dados_sinteticos.py) e grava o resultado em
+# JSON, um arquivo por commit e escala, para comparar entre commits (benchmarks/comparar.py).
+#
+#   python -m benchmarks.rodar --linhas 1000 100000 1000000
+#   python -m benchmarks.comparar benchmarks/resultados/<antes>_100000.json benchmarks/resultados/<depois>_100000.json
+#
+# Cada escala roda num processo próprio, com os bancos num diretório temporário (os .db do projeto e o config.ini
+# não são tocados). Cada caso roda uma vez para aquecer e depois --repeticoes vezes; o JSON guarda mediana,
+# mínimo e máximo em segundos e as linhas processadas.
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from benchmarks import dados_sinteticos
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PASTA_RESULTADOS = os.path.join(RAIZ, "benchmarks", "resultados")
+LIMITE_CARGA = 1_000_000     # acima disso não mede a leitura da tabela inteira (get_locacoes)
+LINHAS_CSV = 20_000
+LINHAS_EDITOR = 500          # uma página grande do editor
+LINHAS_INGESTAO = 5_000
+DIAS_OCUPACAO = 90
+
+
+def _git(*args) -> str:
+    try:
+        return subprocess.run(["git", *args], cwd=RAIZ, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+def metadados(linhas: int, repeticoes: int) -> dict:
+    return {
+        "commit": _git("rev-parse", "--short", "HEAD") or "sem-git",
+        "alterado": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "linhas": linhas, "repeticoes": repeticoes,
+        "python": platform.python_version(), "pandas": pd.__version__, "numpy": np.__version__,
+        "maquina": platform.machine(), "sistema": platform.platform(), "cpus": os.cpu_count(),
+    }
+
+def medir(funcao, repeticoes: int, preparar=None, aquecer: bool = True) -> dict:
+    """Roda `funcao` (que devolve as linhas processadas) e resume os tempos; `preparar` roda antes de cada
+    execução, fora da medição."""
+    tempos, linhas = [], 0
+    for i in range(repeticoes + (1 if aquecer else 0)):
+        if preparar:
+            preparar()
+        inicio = time.perf_counter()
+        linhas = funcao()
+        decorrido = time.perf_counter() - inicio
+        if i or not aquecer:
+            tempos.append(decorrido)
+    return {"mediana_s": round(statistics.median(tempos), 6), "min_s": round(min(tempos), 6),
+            "max_s": round(max(tempos), 6), "repeticoes": len(tempos), "linhas": int(linhas or 0)}
+
+
+# ---------- CASOS ----------
+def _csv_sintetico(unidades: pd.DataFrame, n: int, caminho: str):
+    """CSV no formato da tela de importação (separado por ;, datas dd/mm/aaaa, valores 'R$ 1.234,56')."""
+    rng = np.random.default_rng(7)
+    inicio = pd.Timestamp("2030-01-01") + pd.to_timedelta(rng.integers(0, 365, n), unit="D")
+    noites = pd.to_timedelta(rng.integers(1, 10, n), unit="D")
+    valor = rng.uniform(100, 5000, n)
+    pd.DataFrame({
+        "Unidade": unidades["nome"].to_numpy()[rng.integers(0, len(unidades), n)],
+        "Check-in": inicio.strftime("%d/%m/%Y"), "Check-out": (inicio + noites).strftime("%d/%m/%Y"),
+        "Hóspede": [f"CSV {i}" for i in range(n)],
+        "Valor": ["R$ " + f"{v:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".") for v in valor],
+        "Plataforma": "Airbnb", "Pagamento": "Pago",
+    }).to_csv(caminho, sep=";", index=False, encoding="latin-1")
+
+def casos_hospedagem(linhas: int, pasta: str):
+    import analise
+    import hospedagem_db
+    import importacao_csv
+    import ingestao_locacoes
+    r = hospedagem_db.repo()
+    unidades = hospedagem_db.get_unidades()
+    fim = pd.Timestamp(r.ler("SELECT MAX(checkout) AS fim FROM locacoes")["fim"].iloc[0]).date()
+    inicio = (pd.Timestamp(fim) - pd.Timedelta(days=DIAS_OCUPACAO - 1)).date()
+    nomes = sorted(unidades["nome"].tolist())
+
+    if linhas <= LIMITE_CARGA:
+        yield "hospedagem.get_locacoes", lambda: len(hospedagem_db.get_locacoes()), {}
+    yield "hospedagem.get_unidades", lambda: len(hospedagem_db.get_unidades()), {}
+    yield "hospedagem.pagina_locacoes", lambda: len(hospedagem_db.pagina("locacoes", tamanho=500)[0]), {}
+    yield "hospedagem.ocupacao", lambda: len(analise.ocupacao(inicio, fim)), {}
+    ocup = analise.ocupacao(inicio, fim)
+    yield "hospedagem.grade_ocupacao", lambda: analise.grade_ocupacao(ocup, nomes, inicio, fim)[0].size, {}
+    yield "hospedagem.relatorio_mensal", lambda: len(analise.relatorio_mensal()), {}
+    mes = int(pd.Timestamp(fim).month)
+    yield "hospedagem.relatorio_mensal_mes", lambda: len(analise.relatorio_mensal(mes=mes)), {}
+
+    # as mesmas agregações lendo do armazém analítico (a carga inicial do armazém fica no aquecimento)
+    def no_armazem(funcao):
+        def medida():
+            analise.USAR_ARMAZEM = True
+            try:
+                return funcao()
+            finally:
+                analise.USAR_ARMAZEM = False
+        return medida
+    yield "hospedagem.ocupacao_armazem", no_armazem(lambda: len(analise.ocupacao(inicio, fim))), {}
+    yield "hospedagem.relatorio_mensal_armazem", no_armazem(lambda: len(analise.relatorio_mensal())), {}
+
+    # importação de CSV: lê, prepara e grava; as linhas importadas são apagadas antes de cada execução
+    arquivo = os.path.join(pasta, "importacao.csv")
+    _csv_sintetico(unidades, min(linhas, LINHAS_CSV), arquivo)
+    def importar_csv():
+        df = importacao_csv.preparar(importacao_csv.ler_csv(arquivo))
+        inseridos, pulados = importacao_csv.importar_locacoes(df, unidades_df=unidades)
+        return inseridos + pulados
+    limpar_csv = lambda: r.executar("DELETE FROM locacoes WHERE hospede LIKE 'CSV %'")
+    yield "hospedagem.importacao_csv", importar_csv, {"preparar": limpar_csv}
+
+    # gravação do editor: uma página editada (datas como date, como no st.data_editor)
+    editado = hospedagem_db.pagina("locacoes", tamanho=LINHAS_EDITOR)[0]
+    editado["valor"] = editado["valor"].astype(float) + 1
+    yield "hospedagem.salvar_locacoes", lambda: hospedagem_db.salvar_locacoes(editado), {}
+    despesas = hospedagem_db.pagina("despesas", tamanho=LINHAS_EDITOR)[0]
+    yield "hospedagem.salvar_despesas", lambda: hospedagem_db.salvar_despesas(despesas), {}
+
+    # ingestão em lote da API: reservas novas (removidas antes de cada execução)
+    n = min(linhas, LINHAS_INGESTAO)
+    rng = np.random.default_rng(11)
+    ci = pd.Timestamp("2032-01-01") + pd.to_timedelta(np.arange(n) * 3, unit="D")
+    itens = [
+        {"id_externo": f"bench-{i}", "unidade_id": int(u), "checkin": a.date().isoformat(),
+         "checkout": (a + pd.Timedelta(days=2)).date().isoformat(), "hospede": f"Bench {i}", "valor": 500.0,
+         "plataforma": "Booking"}
+        for i, (u, a) in enumerate(zip(rng.choice(unidades["id"].to_numpy(), n), ci))
+    ]
+    limpar_ingestao = lambda: r.executar("DELETE FROM locacoes WHERE id_externo LIKE 'bench-%'")
+    yield "hospedagem.ingestao_lote", lambda: ingestao_locacoes.ingerir(itens)["resumo"]["incluidas"], \
+        {"preparar": limpar_ingestao}
+
+def casos_financeiro(linhas: int, pasta: str):
+    import financeiro_db
+    yield "financeiro.resumo", lambda: 1 if financeiro_db.resumo() else 0, {}
+    yield "financeiro.resumo_periodo", lambda: 1 if financeiro_db.resumo("2023-01-01", "2023-12-31") else 0, {}
+    yield "financeiro.por_categoria", lambda: len(financeiro_db.por_categoria()), {}
+    yield "financeiro.fluxo_mensal", lambda: len(financeiro_db.fluxo_mensal()), {}
+    yield "financeiro.pagina", lambda: len(financeiro_db.pagina(tamanho=500)[0]), {}
+
+def casos_prontidao(linhas: int, pasta: str):
+    import cubo_prontidao
+    import filtros_prontidao
+    import graficos_prontidao
+    import prontidao_dados
+    # carga inicial do cache a partir do substituto da view (medida uma vez só: as seguintes seriam incrementais)
+    yield "prontidao.atualizar_cache", lambda: prontidao_dados.atualizar_cache()["linhas"], \
+        {"repeticoes": 1, "aquecer": False}
+    yield "prontidao.atualizar_cache_incremental", lambda: prontidao_dados.atualizar_cache()["linhas"], {}
+
+    hoje = prontidao_dados.marca_dagua(prontidao_dados.conectar_cache())
+    inicio, fim = prontidao_dados.janela_periodo("Ano Móvel", hoje)
+    yield "prontidao.contagens_area_status", lambda: len(prontidao_dados.contagens_area_status(inicio, fim)), {}
+    yield "prontidao.contagens_dia_status", lambda: len(prontidao_dados.contagens_dia_status(inicio, fim)), {}
+    yield "prontidao.contagens_hierarquia", lambda: len(prontidao_dados.contagens_hierarquia()), {}
+    yield "prontidao.cubo_construir", lambda: len(cubo_prontidao.construir().folhas), {}
+    cubo = cubo_prontidao.construir()
+    janela = cubo_prontidao.JANELAS[1]
+    yield "prontidao.serie_indicadores", \
+        lambda: len(cubo_prontidao.indicadores(cubo.serie(inicio, fim), [janela])), {}
+    yield "prontidao.ranking", lambda: len(cubo.ranking("DES_N3", inicio, fim)), {}
+    yield "prontidao.mapa_calor", lambda: len(cubo.mapa_calor((), inicio, fim)), {}
+    yield "prontidao.filtros_construir", lambda: len(filtros_prontidao.construir().dimensoes), {}
+    opcoes = filtros_prontidao.construir()
+    yield "prontidao.buscar_nomes", lambda: len(opcoes.buscar_nomes("ana sil", inicio, fim)), {}
+    pivot = cubo_prontidao.indicadores(cubo.serie(inicio, fim), [janela])
+    yield "prontidao.figura_evolucao", lambda: len(graficos_prontidao.figura_evolucao(pivot, janela).data), {}
+
+GRUPOS = {"hospedagem": casos_hospedagem, "financeiro": casos_financeiro, "prontidao": casos_prontidao}
+
+
+def rodar(linhas: int, repeticoes: int = 5, grupos=None, semente: int = 42, manter: str = None) -> dict:
+    """Gera os dados numa pasta temporária (ou em `manter`), mede os casos e devolve o resultado."""
+    pasta = manter or tempfile.mkdtemp(prefix="hospedaqui_bench_")
+    try:
+        inicio = time.perf_counter()
+        contagens = dados_sinteticos.gerar_tudo(linhas, pasta, semente)
+        resultado = {"meta": metadados(linhas, repeticoes), "dados": contagens,
+                     "geracao_s": round(time.perf_counter() - inicio, 3), "casos": {}}
+        for grupo in grupos or GRUPOS:
+            for nome, funcao, opcoes in GRUPOS[grupo](linhas, pasta):
+                opcoes = {"repeticoes": repeticoes, **opcoes}
+                resultado["casos"][nome] = medir(funcao, **opcoes)
+                print(f"  {nome:<42} {resultado['casos'][nome]['mediana_s'] * 1000:>10.1f} ms", flush=True)
+        return resultado
+    finally:
+        if not manter:
+            shutil.rmtree(pasta, ignore_errors=True)
+
+def gravar(resultado: dict, saida: str = None) -> str:
+    meta = resultado["meta"]
+    saida = saida or os.path.join(
+        PASTA_RESULTADOS, f"{meta['commit']}{'-alterado' if meta['alterado'] else ''}_{meta['linhas']}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(saida)), exist_ok=True)
+    with open(saida, "w", encoding="utf-8") as f:
+        json.dump(resultado, f, ensure_ascii=False, indent=2)
+    return saida
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Benchmarks dos caminhos quentes sobre dados sintéticos.")
+    ap.add_argument("--linhas", type=int, nargs="+", default=[100_000],
+                    help="escalas (locações, transações e linhas de prontidão), de 1000 a 10000000")
+    ap.add_argument("--repeticoes", type=int, default=5)
+    ap.add_argument("--grupos", nargs="+", choices=list(GRUPOS))
+    ap.add_argument("--semente", type=int, default=42)
+    ap.add_argument("--saida", help="arquivo JSON (só com uma escala); padrão benchmarks/resultados/")
+    ap.add_argument("--manter", help="gera os bancos nesta pasta (vazia) e não os apaga")
+    args = ap.parse_args()
+
+    if len(args.linhas) > 1:
+        # uma escala por processo: os módulos do app fixam os caminhos dos bancos ao serem importados
+        base = [sys.executable, "-m", "benchmarks.rodar", "--repeticoes", str(args.repeticoes),
+                "--semente", str(args.semente)] + (["--grupos", *args.grupos] if args.grupos else [])
+        falhas = [n for n in args.linhas if subprocess.run(base + ["--linhas", str(n)], cwd=RAIZ).returncode]
+        sys.exit(f"falharam as escalas {falhas}" if falhas else 0)
+
+    warnings.simplefilter("ignore", FutureWarning)   # avisos de depreciação do pandas poluem a saída
+    print(f"escala {args.linhas[0]:,} linhas")
+    caminho = gravar(rodar(args.linhas[0], args.repeticoes, args.grupos, args.semente, args.manter), args.saida)
+    print(f"resultado em {caminho}")
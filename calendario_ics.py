@@ -0,0 +1,265 @@
+# calendario_ics.py
+# Calendários iCal (ICS) das unidades para sincronizar disponibilidade com Airbnb/Booking.
+#
+# Exportação: um VCALENDAR por unidade com as locações (datas de dia inteiro, checkout exclusivo). O texto fica em
+# cache por unidade e só é refeito quando as locações dela mudam (hospedagem_db.versao_unidade) ou o dia vira; a
+# API serve com ETag (GET /api/unidades/<id>/calendario.ics).
+# Importação: lê o feed do canal linha a linha (sem carregar o arquivo inteiro), junta os eventos em lotes e grava
+# com o upsert por `id_externo` (= "ics:" + UID do evento) da ingestao_locacoes.py. Em locações já existentes só as
+# datas são regravadas; valor, hóspede e pagamento lançados aqui são preservados. A remoção das locações que sumiram
+# do feed só considera as importadas por ICS e só acontece se o feed veio inteiro (BEGIN:VCALENDAR ... END:VCALENDAR).
+#
+#   python calendario_ics.py exportar 3 > unidade3.ics
+#   python calendario_ics.py importar 3 Airbnb https://www.airbnb.com/calendar/ical/....ics [--remover-ausentes]
+import argparse
+import hashlib
+import sys
+import threading
+import urllib.request
+from contextlib import contextmanager
+from datetime import date, timedelta
+import pandas as pd
+import hospedagem_db
+import ingestao_locacoes
+
+DIAS_PASSADOS = 90     # locações encerradas há mais tempo saem do feed
+TAMANHO_LOTE = 5000    # eventos por transação na importação
+CAMPOS_IMPORTADOS = ("unidade_id", "checkin", "checkout", "plataforma")
+PRODID = "-//hospedaqui//calendario//PT"
+DOMINIO_UID = "hospedaqui"
+PREFIXO_UID = "ics:"   # id_externo das locações importadas de feeds (separa dos códigos da ingestão em lote)
+
+_cache = {}            # unidade_id -> (chave, etag, corpo)
+_trava = threading.Lock()
+
+
+# ---------- EXPORTAÇÃO ----------
+def _escapar(serie: pd.Series) -> pd.Series:
+    return (serie.str.replace("\\", "\\\\", regex=False).str.replace(";", "\\;", regex=False)
+            .str.replace(",", "\\,", regex=False).str.replace("\n", "\\n", regex=False))
+
+def _dobrar(linha: str) -> str:
+    """Quebra linhas acima de 75 octetos (RFC 5545 3.1): continuação começa com espaço."""
+    dados = linha.encode("utf-8")
+    if len(dados) <= 75:
+        return linha
+    partes, inicio, limite = [], 0, 75
+    while inicio < len(dados):
+        fim = min(inicio + limite, len(dados))
+        while fim < len(dados) and (dados[fim] & 0xC0) == 0x80:   # não corta caractere UTF-8 ao meio
+            fim -= 1
+        partes.append(dados[inicio:fim].decode("utf-8"))
+        inicio, limite = fim, 74
+    return "\r\n ".join(partes)
+
+def gerar_ics(unidade_id: int, nome: str, hoje: date = None) -> str:
+    """Texto do calendário da unidade (montado de forma vetorizada sobre as locações)."""
+    hoje = hoje or date.today()
+    r = hospedagem_db.repo()
+    df = r.ler(
+        "SELECT id, checkin, checkout, plataforma, id_externo, atualizado_em FROM locacoes "
+        "WHERE unidade_id = ? AND checkout >= ? ORDER BY checkin, id",
+        [int(unidade_id), (hoje - timedelta(days=DIAS_PASSADOS)).isoformat()]
+    )
+    ci = pd.to_datetime(df["checkin"], errors="coerce", format="mixed")
+    co = pd.to_datetime(df["checkout"], errors="coerce", format="mixed")
+    df = df[ci.notna() & co.notna() & (co > ci)]
+    ci, co = ci[df.index], co[df.index]
+    externo = df["id_externo"].astype("string").str.removeprefix(PREFIXO_UID)
+    uid = externo.where(externo.notna() & (externo != ""), "locacao-" + df["id"].astype(str) + "@" + DOMINIO_UID)
+    carimbo = pd.to_datetime(df["atualizado_em"], errors="coerce", format="mixed").fillna(pd.Timestamp(hoje))
+    resumo = "Reservado (" + df["plataforma"].fillna("Direto").astype(str) + ")"
+    eventos = (
+        "BEGIN:VEVENT\r\nUID:" + _escapar(uid.astype(str))
+        + "\r\nDTSTAMP:" + carimbo.dt.strftime("%Y%m%dT%H%M%SZ")
+        + "\r\nDTSTART;VALUE=DATE:" + ci.dt.strftime("%Y%m%d")
+        + "\r\nDTEND;VALUE=DATE:" + co.dt.strftime("%Y%m%d")
+        + "\r\nSUMMARY:" + _escapar(resumo)
+        + "\r\nTRANSP:OPAQUE\r\nEND:VEVENT\r\n"
+    )
+    longas = uid.str.len() > 60   # só as linhas de UID podem passar de 75 octetos
+    if longas.any():
+        eventos[longas] = eventos[longas].map(lambda e: "\r\n".join(_dobrar(l) for l in e.split("\r\n")))
+    cabecalho = "\r\n".join([
+        "BEGIN:VCALENDAR", "VERSION:2.0", f"PRODID:{PRODID}", "CALSCALE:GREGORIAN", "METHOD:PUBLISH",
+        _dobrar("X-WR-CALNAME:" + _escapar(pd.Series([str(nome)])).iloc[0]),
+    ]) + "\r\n"
+    return cabecalho + "".join(eventos) + "END:VCALENDAR\r\n"
+
+def calendario(unidade_id: int):
+    """(etag, corpo em bytes) do calendário da unidade, refeito só se a versão mudou; None se não existe."""
+    versao = hospedagem_db.versao_unidade(unidade_id)
+    if not versao:
+        return None
+    hoje = date.today()
+    chave = f"{versao}|{hoje.isoformat()}"
+    etag = hashlib.sha1(chave.encode("utf-8")).hexdigest()
+    with _trava:
+        guardado = _cache.get(unidade_id)
+    if guardado and guardado[0] == chave:
+        return guardado[1], guardado[2]
+    corpo = gerar_ics(unidade_id, versao.split("|", 1)[0], hoje).encode("utf-8")
+    with _trava:
+        _cache[unidade_id] = (chave, etag, corpo)
+    return etag, corpo
+
+
+# ---------- IMPORTAÇÃO ----------
+def _desdobrar(linhas):
+    """Junta as linhas de continuação (começam com espaço ou tab) à anterior."""
+    atual = None
+    for linha in linhas:
+        linha = linha.rstrip("\r\n")
+        if linha[:1] in (" ", "\t"):
+            if atual is not None:
+                atual += linha[1:]
+            continue
+        if atual is not None:
+            yield atual
+        atual = linha
+    if atual is not None:
+        yield atual
+
+def _texto(valor: str) -> str:
+    return (valor.replace("\\n", "\n").replace("\\N", "\n").replace("\\,", ",")
+            .replace("\\;", ";").replace("\\\\", "\\"))
+
+def _data(valor: str):
+    """AAAAMMDD ou AAAAMMDDTHHMMSS[Z] -> 'AAAA-MM-DD' (só o dia interessa)."""
+    valor = valor.strip()
+    if len(valor) < 8 or not valor[:8].isdigit():
+        return None
+    return f"{valor[:4]}-{valor[4:6]}-{valor[6:8]}"
+
+def eventos(linhas, leitura: dict = None):
+    """Gera um dicionário por VEVENT (propriedade -> valor) enquanto lê as linhas.
+    `leitura["completo"]` fica True se o texto trouxe BEGIN:VCALENDAR e o END:VCALENDAR correspondente."""
+    leitura = {} if leitura is None else leitura
+    leitura["completo"] = False
+    aberto = False
+    evento = None
+    for linha in _desdobrar(linhas):
+        nome, _, valor = linha.partition(":")
+        nome = nome.split(";", 1)[0].upper()
+        if nome == "BEGIN" and valor.upper() == "VCALENDAR":
+            aberto = True
+        elif nome == "END" and valor.upper() == "VCALENDAR":
+            leitura["completo"] = aberto
+        elif nome == "BEGIN" and valor.upper() == "VEVENT":
+            evento = {}
+        elif nome == "END" and valor.upper() == "VEVENT":
+            if evento is not None:
+                yield evento
+            evento = None
+        elif evento is not None and nome not in evento:
+            evento[nome] = valor
+
+def _reserva(evento: dict, unidade_id: int, plataforma: str) -> dict:
+    checkin = _data(evento.get("DTSTART", ""))
+    checkout = _data(evento.get("DTEND", ""))
+    if checkout is None and checkin is not None:   # evento de um dia só
+        checkout = (date.fromisoformat(checkin) + timedelta(days=1)).isoformat()
+    uid = evento.get("UID")
+    return {
+        "id_externo": PREFIXO_UID + uid if uid else None, "unidade_id": unidade_id, "checkin": checkin, "checkout": checkout,
+        "hospede": _texto(evento.get("SUMMARY", "")), "valor": None, "plataforma": plataforma,
+    }
+
+def _prefixar_antigas(unidade_id: int, plataforma: str, lote: list):
+    """Locações importadas antes do PREFIXO_UID guardavam o UID puro: passam a usar o id com prefixo."""
+    r = hospedagem_db.repo()
+    r.executar_lote(
+        "UPDATE locacoes SET id_externo = ? WHERE unidade_id = ? AND plataforma = ? AND id_externo = ?",
+        [(i["id_externo"], int(unidade_id), plataforma, i["id_externo"][len(PREFIXO_UID):])
+         for i in lote if i["id_externo"]]
+    )
+
+def _remover_ausentes(conn, unidade_id: int, plataforma: str, vistos: set) -> int:
+    """Apaga locações futuras da unidade importadas desse canal que sumiram do feed (canceladas lá)."""
+    df = pd.read_sql(
+        "SELECT id, id_externo FROM locacoes WHERE unidade_id = ? AND plataforma = ? "
+        "AND id_externo LIKE ? AND checkout > ?",
+        conn, params=[int(unidade_id), plataforma, PREFIXO_UID + "%", date.today().isoformat()]
+    )
+    ausentes = df[~df["id_externo"].isin(vistos)]
+    hospedagem_db.repo().executar_lote("DELETE FROM locacoes WHERE id = ?", [(int(i),) for i in ausentes["id"]],
+                                       conn=conn)
+    return len(ausentes)
+
+def importar(linhas, unidade_id: int, plataforma: str, remover_ausentes: bool = False,
+             tamanho_lote: int = TAMANHO_LOTE) -> dict:
+    """Concilia um feed ICS (iterável de linhas de texto) com as locações da unidade. A remoção das ausentes roda
+    na transação do último lote, e só se o feed veio completo (uma página de erro ou download cortado não apaga
+    nada)."""
+    if plataforma not in hospedagem_db.PLATAFORMAS:
+        raise ValueError(f"plataforma deve ser uma de {hospedagem_db.PLATAFORMAS}")
+    resumo = {"eventos": 0, "incluidas": 0, "atualizadas": 0, "rejeitadas": 0, "removidas": 0,
+              "calendario_completo": False}
+    rejeitadas, vistos, lote, leitura = [], set(), [], {}
+
+    def gravar(finalizar=None):
+        _prefixar_antigas(unidade_id, plataforma, lote)
+        resultado = ingestao_locacoes.ingerir(lote, campos=CAMPOS_IMPORTADOS, finalizar=finalizar)
+        for k in ("incluidas", "atualizadas", "rejeitadas"):
+            resumo[k] += resultado["resumo"][k]
+        rejeitadas.extend(
+            {"id_externo": i["id_externo"], "erros": i["erros"]} for i in resultado["itens"]
+            if i["status"] == "rejeitada"
+        )
+        lote.clear()
+
+    for evento in eventos(linhas, leitura):
+        resumo["eventos"] += 1
+        if evento.get("STATUS", "").upper() == "CANCELLED":
+            continue
+        if len(lote) >= tamanho_lote:   # grava o lote cheio só quando há outro evento: o último fica para o fim
+            gravar()
+        reserva = _reserva(evento, unidade_id, plataforma)
+        if reserva["id_externo"]:
+            vistos.add(reserva["id_externo"])
+        lote.append(reserva)
+    resumo["calendario_completo"] = leitura["completo"]
+
+    def remover(conn):
+        resumo["removidas"] = _remover_ausentes(conn, unidade_id, plataforma, vistos)
+    if remover_ausentes and leitura["completo"]:
+        gravar(finalizar=remover)
+    elif lote:
+        gravar()
+    return {"resumo": resumo, "rejeitadas": rejeitadas}
+
+@contextmanager
+def linhas_de(origem: str):
+    """Gerenciador de contexto com as linhas de texto de um arquivo local ou URL, lidas sob demanda."""
+    if origem.startswith(("http://", "https://")):
+        with urllib.request.urlopen(origem, timeout=60) as resposta:
+            yield (l.decode("utf-8", "replace") for l in resposta)
+    else:
+        with open(origem, encoding="utf-8", errors="replace", newline="") as arquivo:
+            yield arquivo
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Exporta/importa calendários ICS das unidades.")
+    sub = ap.add_subparsers(dest="acao", required=True)
+    ex = sub.add_parser("exportar")
+    ex.add_argument("unidade_id", type=int)
+    im = sub.add_parser("importar")
+    im.add_argument("unidade_id", type=int)
+    im.add_argument("plataforma", choices=hospedagem_db.PLATAFORMAS)
+    im.add_argument("origem", help="arquivo .ics ou URL do feed")
+    im.add_argument("--remover-ausentes", action="store_true",
+                    help="apaga locações futuras desse canal que não estão mais no feed")
+    args = ap.parse_args()
+    hospedagem_db.inicializar_db()
+    if args.acao == "exportar":
+        resultado = calendario(args.unidade_id)
+        if resultado is None:
+            sys.exit(f"unidade {args.unidade_id} não encontrada")
+        sys.stdout.buffer.write(resultado[1])
+    else:
+        with linhas_de(args.origem) as linhas:
+            resumo = importar(linhas, args.unidade_id, args.plataforma, args.remover_ausentes)["resumo"]
+        print(resumo)
+        if args.remover_ausentes and not resumo["calendario_completo"]:
+            sys.exit("feed incompleto (sem BEGIN:VCALENDAR ... END:VCALENDAR): nenhuma locação foi removida")
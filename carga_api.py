@@ -0,0 +1,132 @@
+# carga_api.py
+# Teste de carga local da API: sobe o servidor.py num subprocesso (ou usa --url de um já no ar) e dispara
+# requisições concorrentes com um cliente assíncrono (AsyncHTTPClient do Tornado) contra a disponibilidade
+# (/api/ocupacao) e a lista de locações (/api/locacoes). Relata p50/p99 de latência, requisições por segundo
+# e quantas voltaram 503 (backpressure).
+#
+#   python carga_api.py --requisicoes 2000 --concorrencia 64
+#   python carga_api.py --url http://127.0.0.1:8000 --condicional
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from datetime import date, timedelta
+import numpy as np
+from tornado.httpclient import AsyncHTTPClient, HTTPClientError
+
+DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _porta_livre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _caminhos(requisicoes: int):
+    hoje = date.today()
+    ocupacao = f"/api/ocupacao?inicio={hoje.isoformat()}&fim={(hoje + timedelta(days=30)).isoformat()}"
+    return {
+        "disponibilidade": [ocupacao] * requisicoes,
+        "locacoes": [f"/api/locacoes?limite=100&apos={random.randint(0, 100) * 100}" for _ in range(requisicoes)],
+    }
+
+
+async def _disparar(cliente, url: str, caminhos: list, concorrencia: int, etags: dict = None) -> dict:
+    """etags: dicionário compartilhado caminho -> ETag para GET condicional (None = sem If-None-Match)."""
+    latencias, codigos = [], {}
+    semaforo = asyncio.Semaphore(concorrencia)
+
+    async def uma(caminho):
+        async with semaforo:
+            cabecalhos = {"Accept-Encoding": "gzip"}
+            if etags is not None and caminho in etags:
+                cabecalhos["If-None-Match"] = etags[caminho]
+            t0 = time.perf_counter()
+            try:
+                resposta = await cliente.fetch(url + caminho, headers=cabecalhos, raise_error=False,
+                                               decompress_response=True)
+                codigo = resposta.code
+                if etags is not None and resposta.headers.get("ETag"):
+                    etags[caminho] = resposta.headers["ETag"]
+            except (HTTPClientError, OSError):
+                codigo = 599
+            latencias.append(time.perf_counter() - t0)
+            codigos[codigo] = codigos.get(codigo, 0) + 1
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(uma(c) for c in caminhos))
+    total = time.perf_counter() - t0
+    ms = np.array(latencias) * 1000
+    return {
+        "requisicoes": len(caminhos),
+        "req/s": round(len(caminhos) / total, 1),
+        "p50 (ms)": round(float(np.percentile(ms, 50)), 1),
+        "p99 (ms)": round(float(np.percentile(ms, 99)), 1),
+        "códigos": dict(sorted(codigos.items())),
+    }
+
+
+async def rodar(url: str, requisicoes: int, concorrencia: int, condicional: bool) -> dict:
+    AsyncHTTPClient.configure(None, max_clients=concorrencia)
+    cliente = AsyncHTTPClient()
+    resultado = {}
+    for nome, caminhos in _caminhos(requisicoes).items():
+        etags = {} if condicional else None
+        await _disparar(cliente, url, caminhos[:concorrencia], concorrencia, etags)   # aquecimento
+        resultado[nome] = await _disparar(cliente, url, caminhos, concorrencia, etags)
+    cliente.close()
+    return resultado
+
+
+async def _esperar_porta(porta: int, limite: float = 30.0):
+    fim = time.monotonic() + limite
+    while time.monotonic() < fim:
+        try:
+            _, escritor = await asyncio.open_connection("127.0.0.1", porta)
+            escritor.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"servidor não respondeu na porta {porta}")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Teste de carga local da API (p50/p99, req/s).")
+    ap.add_argument("--url", help="API já no ar; sem isso sobe o servidor.py numa porta livre")
+    ap.add_argument("--requisicoes", type=int, default=1000)
+    ap.add_argument("--concorrencia", type=int, default=32)
+    ap.add_argument("--trabalhadores", type=int, default=8)
+    ap.add_argument("--fila", type=int, default=64)
+    ap.add_argument("--condicional", action="store_true", help="reenvia o ETag recebido (If-None-Match)")
+    args = ap.parse_args(argv)
+
+    processo = None
+    url = args.url
+    if url is None:
+        porta = _porta_livre()
+        processo = subprocess.Popen(
+            [sys.executable, os.path.join(DIR, "servidor.py"), "--porta", str(porta),
+             "--trabalhadores", str(args.trabalhadores), "--fila", str(args.fila)],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        url = f"http://127.0.0.1:{porta}"
+    try:
+        if processo is not None:
+            asyncio.run(_esperar_porta(int(url.rsplit(":", 1)[1])))
+        resultado = asyncio.run(rodar(url, args.requisicoes, args.concorrencia, args.condicional))
+    finally:
+        if processo is not None:
+            processo.terminate()
+            processo.wait()
+    for nome, r in resultado.items():
+        print(f"{nome:16s} {r}")
+    return resultado
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+# conexao_sql.py
+# Fábrica de conexões com o SQL Server (DWH) compartilhada por pred.py, prontidao_dados.py e hello.py:
+# pool de conexões reaproveitadas, string de conexão vinda da configuração, retentativas com backoff
+# exponencial (tenacity) e cursores já com `arraysize` grande e `fast_executemany`.
+#
+# [dwh]
+# servidor = TERBRDWHDB03
+# banco = DWH_BRASIL
+# driver = ODBC Driver 17 for SQL Server
+# usuario =                ; sem usuário/senha usa autenticação do Windows (Trusted_Connection)
+# senha =
+# odbc =                   ; string completa, tem prioridade sobre os campos acima
+# pool = 4
+# espera_pool = 30         ; segundos aguardando conexão livre com o pool cheio (depois TimeoutError)
+# arraysize = 5000
+# tentativas = 4
+#
+# (ou DWH_SERVIDOR, DWH_SENHA, ... no ambiente). O driver é qualquer módulo DB-API com connect()
+# e Error; por padrão o pyodbc, importado só quando a primeira conexão é aberta.
+import threading
+from contextlib import contextmanager
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
+import config
+from repositorio import ConexaoDoPool, PoolConexoes
+
+
+def string_conexao(secao: str = "dwh") -> str:
+    odbc = config.obter(secao, "odbc")
+    if odbc:
+        return odbc
+    partes = [
+        f"DRIVER={{{config.obter(secao, 'driver', 'ODBC Driver 17 for SQL Server')}}}",
+        f"SERVER={config.obter(secao, 'servidor', 'TERBRDWHDB03')}",
+        f"DATABASE={config.obter(secao, 'banco', 'DWH_BRASIL')}",
+    ]
+    usuario = config.obter(secao, "usuario")
+    if usuario:
+        partes += [f"UID={usuario}", f"PWD={config.obter(secao, 'senha', '')}"]
+    else:
+        partes.append("Trusted_Connection=yes")
+    return ";".join(partes) + ";"
+
+
+class ConexaoDWH(ConexaoDoPool):
+    """Conexão do pool cujos cursores já saem configurados para leitura/gravação em lote."""
+
+    def cursor(self):
+        cur = self._conn.cursor()
+        cur.arraysize = self._pool.arraysize
+        if hasattr(cur, "fast_executemany"):
+            cur.fast_executemany = True
+        return cur
+
+
+class FabricaConexoes:
+    def __init__(self, conn_str: str, tamanho_pool: int = 4, arraysize: int = 5000,
+                 tentativas: int = 4, driver=None, espera_pool: float = 30):
+        if driver is None:
+            import pyodbc as driver
+        self.conn_str = conn_str
+        self.driver = driver
+        transitorios = tuple(
+            getattr(driver, nome) for nome in ("OperationalError", "InterfaceError") if hasattr(driver, nome)
+        ) or (driver.Error,)
+        self._retentar = retry(
+            retry=retry_if_exception_type(transitorios),
+            stop=stop_after_attempt(tentativas),
+            wait=wait_exponential(multiplier=0.5, max=10),
+            reraise=True,
+        )
+        self.pool = PoolConexoes(self._retentar(self._abrir), tamanho_pool, embrulho=ConexaoDWH, espera=espera_pool)
+        self.pool.arraysize = arraysize
+
+    def _abrir(self):
+        return self.driver.connect(self.conn_str, autocommit=False)
+
+    def conectar(self):
+        """Conexão do pool; close() devolve ao pool."""
+        return self.pool.obter()
+
+    @contextmanager
+    def conexao(self):
+        conn = self.conectar()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def cursor(self):
+        with self.conexao() as conn:
+            cur = conn.cursor()
+            try:
+                yield cur
+            finally:
+                cur.close()
+
+    def ler(self, sql: str, params=()):
+        """Executa a consulta com retentativa (uma conexão quebrada é descartada pelo pool)
+        e retorna (colunas, linhas)."""
+        @self._retentar
+        def consultar():
+            with self.cursor() as cur:
+                cur.execute(sql, tuple(params))
+                colunas = [d[0] for d in cur.description]
+                linhas = []
+                while True:
+                    lote = cur.fetchmany()
+                    if not lote:
+                        break
+                    linhas.extend(lote)
+                return colunas, linhas
+        return consultar()
+
+
+_fabricas = {}
+_trava = threading.Lock()
+
+def obter_fabrica(secao: str = "dwh", driver=None) -> FabricaConexoes:
+    with _trava:
+        if secao not in _fabricas:
+            _fabricas[secao] = FabricaConexoes(
+                string_conexao(secao),
+                tamanho_pool=config.obter_int(secao, "pool", 4),
+                arraysize=config.obter_int(secao, "arraysize", 5000),
+                tentativas=config.obter_int(secao, "tentativas", 4),
+                driver=driver,
+                espera_pool=config.obter_int(secao, "espera_pool", 30),
+            )
+        return _fabricas[secao]
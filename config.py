@@ -0,0 +1,28 @@
+# config.py
+# Configuração lida de config.ini (opcional) com sobrescrita por variáveis de ambiente:
+# a chave `backend` da seção [hospedagem] pode vir de HOSPEDAGEM_BACKEND, por exemplo.
+import configparser
+import os
+
+ARQUIVO_CONFIG = os.environ.get("HOSPEDAQUI_CONFIG", "config.ini")
+
+_parser = None
+
+def _ler_arquivo():
+    global _parser
+    if _parser is None:
+        _parser = configparser.ConfigParser()
+        _parser.read(ARQUIVO_CONFIG, encoding="utf-8")
+    return _parser
+
+def obter(secao: str, chave: str, padrao=None):
+    env = f"{secao}_{chave}".upper()
+    if env in os.environ:
+        return os.environ[env]
+    parser = _ler_arquivo()
+    if parser.has_option(secao, chave):
+        return parser.get(secao, chave)
+    return padrao
+
+def obter_int(secao: str, chave: str, padrao: int) -> int:
+    return int(obter(secao, chave, padrao))
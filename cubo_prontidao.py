@@ -0,0 +1,188 @@
+# cubo_prontidao.py
+# Cubo de contagens diárias da prontidão. Uma consulta agrupa o cache por DES_N1..DES_N5, dia e TESTE_REAL
+# e o resultado vira um array acumulado no tempo (folha x dia x status, int32): a soma de qualquer janela
+# é acum[:, fim] - acum[:, inicio]. Aderência, médias móveis (7/30/90 dias) e rankings por área saem de
+# fatias desse array, sem reagrupar as linhas brutas.
+# A hierarquia DES_N1 > ... > DES_N5 fica pré-agregada por profundidade (caminhos N1..Nk num MultiIndex e o
+# acumulado de cada caminho), o que permite descer/subir de nível e montar o mapa de calor de qualquer nível.
+import numpy as np
+import pandas as pd
+import prontidao_dados
+
+NIVEIS = ["DES_N1", "DES_N2", "DES_N3", "DES_N4", "DES_N5"]
+NO_HORARIO = "TESTE NO HORÁRIO"
+JANELAS = [7, 30, 90]
+SEM_VALOR = "(sem valor)"
+
+
+class CuboProntidao:
+    def __init__(self, contagens: pd.DataFrame):
+        """contagens: colunas DES_N1..DES_N5, Data, TESTE_REAL e QTD (ver prontidao_dados.contagens_hierarquia)."""
+        contagens = contagens.dropna(subset=["Data", "TESTE_REAL"])
+        cod_folha = contagens.groupby(NIVEIS, dropna=False, sort=True).ngroup().to_numpy()
+        self.folhas = (
+            contagens[NIVEIS].assign(_f=cod_folha).drop_duplicates("_f").sort_values("_f")
+            .drop(columns="_f").reset_index(drop=True)
+        )
+        datas = pd.to_datetime(contagens["Data"]).dt.normalize()
+        if datas.empty:
+            self.dias = pd.DatetimeIndex([])
+        else:
+            self.dias = pd.date_range(datas.min(), datas.max(), freq="D")
+        cod_dia = ((datas - (self.dias[0] if len(self.dias) else datas)).dt.days).to_numpy()
+        cod_status, status = pd.factorize(contagens["TESTE_REAL"], sort=True)
+        self.status = list(status)
+
+        diario = np.zeros((len(self.folhas), len(self.dias), len(self.status)), dtype=np.int32)
+        np.add.at(diario, (cod_folha, cod_dia, cod_status), contagens["QTD"].to_numpy(dtype=np.int32))
+        self.acum = np.zeros((len(self.folhas), len(self.dias) + 1, len(self.status)), dtype=np.int32)
+        np.cumsum(diario, axis=1, out=self.acum[:, 1:])
+        self._niveis = {}
+
+        # hierarquia: para cada profundidade k, os caminhos (DES_N1..DES_Nk) e o acumulado de cada caminho,
+        # somando as folhas; na profundidade 5 os caminhos são as próprias folhas
+        rotulos = self.folhas.astype(object).where(self.folhas.notna(), SEM_VALOR)
+        self.hierarquia = {}
+        for k in range(1, len(NIVEIS) + 1):
+            if k == len(NIVEIS):
+                cod, agregado = np.arange(len(rotulos)), self.acum
+                caminhos = rotulos
+            else:
+                cod = rotulos.groupby(NIVEIS[:k], sort=True).ngroup().to_numpy()
+                agregado = np.zeros((cod.max() + 1 if len(cod) else 0,) + self.acum.shape[1:], dtype=np.int32)
+                np.add.at(agregado, cod, self.acum)
+                caminhos = rotulos[NIVEIS[:k]].assign(_c=cod).drop_duplicates("_c").sort_values("_c").drop(columns="_c")
+            self.hierarquia[k] = (pd.MultiIndex.from_frame(caminhos[NIVEIS[:k]]), agregado)
+
+    # ---------- NÍVEIS ----------
+    def nivel(self, nivel: str):
+        """(valores do nível, acumulado por valor): soma das folhas de cada valor, calculada uma vez por nível."""
+        if nivel not in self._niveis:
+            cod, valores = pd.factorize(self.folhas[nivel], sort=True)
+            agregado = np.zeros((len(valores),) + self.acum.shape[1:], dtype=np.int32)
+            validos = cod >= 0
+            np.add.at(agregado, cod[validos], self.acum[validos])
+            self._niveis[nivel] = (pd.Index(valores, name=nivel), agregado)
+        return self._niveis[nivel]
+
+    # ---------- HIERARQUIA ----------
+    def _no(self, caminho: tuple, k: int):
+        """Posições, na profundidade k, dos caminhos que começam por `caminho`."""
+        caminhos, _ = self.hierarquia[k]
+        manter = np.ones(len(caminhos), dtype=bool)
+        for i, valor in enumerate(caminho):
+            manter &= (caminhos.get_level_values(i) == valor)
+        return np.flatnonzero(manter)
+
+    def filhos(self, caminho=()) -> list:
+        """Drill-down: valores do nível abaixo de `caminho` (tupla DES_N1, DES_N2, ...)."""
+        k = len(caminho) + 1
+        if k > len(NIVEIS):
+            return []
+        caminhos, _ = self.hierarquia[k]
+        return caminhos[self._no(tuple(caminho), k)].get_level_values(k - 1).tolist()
+
+    @staticmethod
+    def pai(caminho=()) -> tuple:
+        """Roll-up: o caminho um nível acima."""
+        return tuple(caminho)[:-1]
+
+    def mapa_calor(self, caminho, inicio, fim, nivel=None, status=None, filtro=None) -> pd.DataFrame:
+        """Contagens da janela por valor de `nivel` x status, dentro do nó `caminho`.
+        nivel: padrão é o nível logo abaixo do caminho; um nível mais fundo agrega os valores iguais de ramos
+        diferentes. filtro: (nível, valor) que restringe as folhas; nesse caso soma direto das folhas."""
+        caminho = tuple(caminho)
+        k = NIVEIS.index(nivel) + 1 if nivel else len(caminho) + 1
+        if k <= len(caminho):
+            raise ValueError(f"{NIVEIS[k - 1]} não está abaixo do caminho {caminho}")
+        i0, i1 = self._posicao(inicio, fim)
+        colunas = self._colunas_status(status)
+        nomes = [self.status[i] for i in colunas]
+        if filtro and filtro[1] not in (None, "Todos"):
+            caminhos, agregado = self.hierarquia[len(NIVEIS)]
+            pos = self._no(caminho, len(NIVEIS))
+            pos = pos[(self.folhas[filtro[0]].to_numpy()[pos] == filtro[1])]
+        else:
+            caminhos, agregado = self.hierarquia[k]
+            pos = self._no(caminho, k)
+        janela = (agregado[pos, i1] - agregado[pos, i0])[:, colunas]
+        chaves = np.asarray(caminhos.get_level_values(k - 1))[pos]
+        df = pd.DataFrame(janela, columns=nomes).groupby(chaves).sum().rename_axis(NIVEIS[k - 1])
+        return df[df.sum(axis=1) > 0]
+
+    def _selecao(self, nivel=None, valor=None):
+        """Acumulado (dia+1 x status) do recorte: tudo, ou um valor de um nível."""
+        if not nivel or valor in (None, "Todos"):
+            return self.acum.sum(axis=0)
+        valores, agregado = self.nivel(nivel)
+        if valor not in valores:
+            return np.zeros(self.acum.shape[1:], dtype=np.int32)
+        return agregado[valores.get_loc(valor)]
+
+    def _posicao(self, inicio, fim):
+        if not len(self.dias):
+            return 0, 0
+        i0 = int(self.dias.searchsorted(pd.Timestamp(inicio).normalize(), side="left"))
+        i1 = int(self.dias.searchsorted(pd.Timestamp(fim).normalize(), side="right"))
+        return i0, max(i0, i1)
+
+    def _colunas_status(self, status):
+        if not status:
+            return list(range(len(self.status)))
+        return [i for i, s in enumerate(self.status) if s in status]
+
+    # ---------- MÉTRICAS ----------
+    def serie(self, inicio, fim, nivel=None, valor=None, status=None) -> pd.DataFrame:
+        """Contagens por dia (calendário completo de início a fim) x status do recorte."""
+        acum = self._selecao(nivel, valor)
+        i0, i1 = self._posicao(inicio, fim)
+        colunas = self._colunas_status(status)
+        diario = np.diff(acum[i0:i1 + 1][:, colunas], axis=0) if i1 > i0 else np.zeros((0, len(colunas)), np.int32)
+        calendario = pd.date_range(pd.Timestamp(inicio).normalize(), pd.Timestamp(fim).normalize(), freq="D")
+        df = pd.DataFrame(diario, index=self.dias[i0:i1], columns=[self.status[i] for i in colunas])
+        return df.reindex(calendario, fill_value=0).rename_axis("Data")
+
+    def ranking(self, nivel: str, inicio, fim, status=None, filtro=None) -> pd.DataFrame:
+        """Total, testes no horário e aderência por valor do nível na janela, da maior para a menor aderência.
+        filtro: (nível, valor) que restringe as folhas consideradas."""
+        i0, i1 = self._posicao(inicio, fim)
+        colunas = self._colunas_status(status)
+        janela = (self.acum[:, i1] - self.acum[:, i0])[:, colunas]
+        folhas = self.folhas
+        if filtro and filtro[1] not in (None, "Todos"):
+            manter = (folhas[filtro[0]] == filtro[1]).to_numpy()
+            janela, folhas = janela[manter], folhas[manter]
+        nomes = [self.status[i] for i in colunas]
+        df = pd.DataFrame(janela, columns=nomes).groupby(folhas[nivel].to_numpy()).sum()
+        df = df.rename_axis(nivel)
+        df["Total"] = df[nomes].sum(axis=1)
+        df["No horário"] = df[NO_HORARIO] if NO_HORARIO in df else 0
+        df = df[df["Total"] > 0]
+        df["Aderência (%)"] = (df["No horário"] / df["Total"] * 100).round(1)
+        return df[["Total", "No horário", "Aderência (%)"]].sort_values(["Aderência (%)", "Total"], ascending=False)
+
+
+def indicadores(diario: pd.DataFrame, janelas=JANELAS) -> pd.DataFrame:
+    """Acrescenta a um quadro dia x status (calendário completo) o Total, a Aderência (%) do dia e a
+    aderência móvel de cada janela em dias corridos (testes no horário / testes da janela), por soma acumulada."""
+    out = diario.copy()
+    total = out.sum(axis=1).to_numpy(dtype=np.int64)
+    no_horario = out[NO_HORARIO].to_numpy(dtype=np.int64) if NO_HORARIO in out else np.zeros_like(total)
+    out["Total"] = total
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out["Aderência (%)"] = np.round(np.where(total > 0, no_horario / total * 100, np.nan), 1)
+        acum_total = np.concatenate([[0], np.cumsum(total)])
+        acum_no_horario = np.concatenate([[0], np.cumsum(no_horario)])
+        fim = np.arange(1, len(total) + 1)
+        for j in janelas:
+            inicio = np.maximum(fim - j, 0)
+            soma_total = acum_total[fim] - acum_total[inicio]
+            soma_no_horario = acum_no_horario[fim] - acum_no_horario[inicio]
+            out[f"Aderência Móvel {j}d (%)"] = np.round(
+                np.where(soma_total > 0, soma_no_horario / soma_total * 100, np.nan), 1
+            )
+    return out
+
+
+def construir(caminho_cache: str = None) -> CuboProntidao:
+    return CuboProntidao(prontidao_dados.contagens_hierarquia(caminho_cache))
@@ -0,0 +1,158 @@
+# exportar_prontidao.py
+# Exportação do relatório de prontidão de um período, sem interface (para agendar no cron / Agendador de Tarefas):
+# resumo por tipo de teste, mapa de calor área x tipo, evolução diária com aderência e, opcionalmente, as linhas
+# de detalhe. Usa as mesmas agregações do pred.py (prontidao_dados / cubo_prontidao). O XLSX é gravado em modo
+# write-only e o Parquet em lotes, então o detalhe com milhões de linhas não fica inteiro em memória.
+#
+#   python exportar_prontidao.py --periodo "Exercício Atual" --formato ambos --detalhe --saida exportacoes
+#   python exportar_prontidao.py --inicio 2025-01-01 --fim 2025-03-31 --area "GERÊNCIA X"
+import argparse
+import os
+import unicodedata
+from datetime import datetime
+import pandas as pd
+import prontidao_dados
+import cubo_prontidao
+
+LIMITE_LINHAS_XLSX = 1_048_575   # linhas por planilha no Excel, fora o cabeçalho
+
+
+def montar_relatorio(inicio, fim, nome=None, area=None, status=None, caminho_cache: str = None) -> dict:
+    """{nome da aba: DataFrame} com os agregados do período, como no dashboard."""
+    filtros = dict(nome=nome, area=area, status=status, caminho_cache=caminho_cache)
+    area_status = prontidao_dados.contagens_area_status(inicio, fim, **filtros)
+    dia_status = prontidao_dados.contagens_dia_status(inicio, fim, **filtros)
+
+    resumo = (
+        area_status.groupby("TESTE_REAL")["QTD"].sum().sort_values(ascending=False)
+        .rename_axis("Tipo de Teste").rename("Quantidade").reset_index()
+    )
+    mapa = (
+        area_status.dropna(subset=["DES_N3", "TESTE_REAL"])
+        .pivot_table(index="DES_N3", columns="TESTE_REAL", values="QTD", aggfunc="sum", fill_value=0)
+    )
+    mapa.columns.name = None
+    diario = dia_status.dropna(subset=["TESTE_REAL"]).pivot(index="Data", columns="TESTE_REAL", values="QTD").fillna(0)
+    diario.index = pd.to_datetime(diario.index)
+    diario = diario.reindex(pd.date_range(pd.Timestamp(inicio).date(), pd.Timestamp(fim).date()), fill_value=0)
+    evolucao = cubo_prontidao.indicadores(diario.astype(int))
+    evolucao = evolucao[evolucao["Total"] > 0].rename_axis("Data")
+    evolucao.columns.name = None
+    return {
+        "Resumo": resumo,
+        "Mapa de Calor": mapa.reset_index(),
+        "Evolução Diária": evolucao.reset_index(),
+    }
+
+
+def _valor_celula(v):
+    if v is None or (isinstance(v, float) and v != v) or v is pd.NaT:
+        return None
+    if isinstance(v, pd.Timestamp):
+        return v.to_pydatetime()
+    return v.item() if hasattr(v, "item") else v
+
+
+def _linhas(df: pd.DataFrame):
+    for linha in df.itertuples(index=False, name=None):
+        yield [_valor_celula(v) for v in linha]
+
+
+def exportar_xlsx(caminho: str, abas: dict, lotes_detalhe=None) -> int:
+    """Grava as abas e, se houver, o detalhe em abas 'Detalhe', 'Detalhe 2', ... (write-only). Retorna as linhas de detalhe."""
+    from openpyxl import Workbook
+    wb = Workbook(write_only=True)
+    for nome, df in abas.items():
+        ws = wb.create_sheet(nome)
+        ws.append(list(df.columns))
+        for linha in _linhas(df):
+            ws.append(linha)
+
+    total = 0
+    if lotes_detalhe is not None:
+        ws, n_aba, na_aba = None, 0, LIMITE_LINHAS_XLSX
+        for lote in lotes_detalhe:
+            for linha in _linhas(lote):
+                if na_aba >= LIMITE_LINHAS_XLSX:
+                    n_aba += 1
+                    ws = wb.create_sheet("Detalhe" if n_aba == 1 else f"Detalhe {n_aba}")
+                    ws.append(prontidao_dados.COLUNAS)
+                    na_aba = 0
+                ws.append(linha)
+                na_aba += 1
+                total += 1
+    wb.save(caminho)
+    return total
+
+
+def exportar_parquet(pasta: str, abas: dict, lotes_detalhe=None) -> int:
+    """Um arquivo .parquet por aba; o detalhe é escrito lote a lote num único arquivo."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    os.makedirs(pasta, exist_ok=True)
+    for nome, df in abas.items():
+        arquivo = unicodedata.normalize("NFKD", nome).encode("ascii", "ignore").decode().lower().replace(" ", "_")
+        df.to_parquet(os.path.join(pasta, f"{arquivo}.parquet"), index=False)
+
+    total = 0
+    if lotes_detalhe is not None:
+        escritor = None
+        esquema = None
+        try:
+            for lote in lotes_detalhe:
+                tabela = pa.Table.from_pandas(lote, preserve_index=False)
+                if escritor is None:
+                    # coluna toda nula no primeiro lote: assume texto para os lotes seguintes
+                    esquema = pa.schema([
+                        f.with_type(pa.string()) if pa.types.is_null(f.type) else f for f in tabela.schema
+                    ])
+                    escritor = pq.ParquetWriter(os.path.join(pasta, "detalhe.parquet"), esquema)
+                escritor.write_table(tabela.cast(esquema))
+                total += len(lote)
+        finally:
+            if escritor is not None:
+                escritor.close()
+    return total
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Exporta o relatório de prontidão de um período para XLSX/Parquet.")
+    ap.add_argument("--periodo", choices=prontidao_dados.PERIODOS[:3], default="Exercício Atual")
+    ap.add_argument("--inicio", help="AAAA-MM-DD (com --fim, substitui --periodo)")
+    ap.add_argument("--fim", help="AAAA-MM-DD")
+    ap.add_argument("--nome")
+    ap.add_argument("--area", help="valor de DES_N3")
+    ap.add_argument("--status", action="append", help="TESTE_REAL (pode repetir)")
+    ap.add_argument("--formato", choices=["xlsx", "parquet", "ambos"], default="xlsx")
+    ap.add_argument("--detalhe", action="store_true", help="inclui as linhas do período")
+    ap.add_argument("--saida", default=".")
+    ap.add_argument("--sem-atualizar", action="store_true", help="não busca novidades na origem antes de exportar")
+    args = ap.parse_args(argv)
+
+    if args.inicio and args.fim:
+        inicio, fim = prontidao_dados.janela_periodo("Personalizado", inicio=args.inicio, fim=args.fim)
+        rotulo = f"{args.inicio}_{args.fim}"
+    else:
+        inicio, fim = prontidao_dados.janela_periodo(args.periodo)
+        rotulo = args.periodo.lower().replace(" ", "_")
+    if not args.sem_atualizar:
+        prontidao_dados.atualizar_cache()
+
+    status = [s.upper().strip() for s in args.status] if args.status else None
+    abas = montar_relatorio(inicio, fim, args.nome, args.area, status)
+    base = os.path.join(args.saida, f"prontidao_{rotulo}_{datetime.now():%Y%m%d_%H%M}")
+    os.makedirs(args.saida, exist_ok=True)
+
+    def detalhe():
+        return prontidao_dados.lotes_periodo(inicio, fim, args.nome, args.area, status) if args.detalhe else None
+
+    if args.formato in ("xlsx", "ambos"):
+        n = exportar_xlsx(base + ".xlsx", abas, detalhe())
+        print(f"{base}.xlsx ({n} linhas de detalhe)")
+    if args.formato in ("parquet", "ambos"):
+        n = exportar_parquet(base, abas, detalhe())
+        print(f"{base}/ ({n} linhas de detalhe)")
+
+
+if __name__ == "__main__":
+    main()
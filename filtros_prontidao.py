@@ -0,0 +1,90 @@
+# filtros_prontidao.py
+# Opções dos filtros do pred.py sem varrer as linhas a cada rerun: cada dimensão (NOME, DES_N3, TESTE_REAL)
+# vira uma tabela de códigos ordenada (categórico) com os pares (dia, código) ordenados por dia, então os
+# valores distintos de um período saem de uma fatia + bincount. Os nomes têm um índice de prefixos
+# (palavras sem acento, em minúsculas) para a busca enquanto se digita.
+import unicodedata
+import numpy as np
+import pandas as pd
+import prontidao_dados
+
+DIMENSOES = ["NOME", "DES_N3", "TESTE_REAL"]
+LIMITE_BUSCA = 50
+
+
+def chave_busca(texto: str) -> str:
+    """Minúsculas e sem acentos, para comparar prefixos."""
+    decomposto = unicodedata.normalize("NFKD", str(texto))
+    return "".join(c for c in decomposto if not unicodedata.combining(c)).casefold().strip()
+
+
+class Dimensao:
+    def __init__(self, pares: pd.DataFrame):
+        """pares: colunas dia (AAAA-MM-DD) e valor, distintos."""
+        valores = pd.Categorical(pares["valor"])
+        categorias = valores.categories.sort_values()
+        valores = valores.set_categories(categorias)
+        self.valores = categorias                                  # tabela de códigos
+        dias = pd.to_datetime(pares["dia"]).to_numpy().astype("datetime64[D]").astype(np.int32)
+        ordem = np.argsort(dias, kind="stable")
+        self.dias = dias[ordem]
+        self.codigos = np.asarray(valores.codes, dtype=np.int32)[ordem]
+
+    def _fatia(self, inicio, fim):
+        d0 = np.datetime64(pd.Timestamp(inicio).date(), "D").astype(np.int32)
+        d1 = np.datetime64(pd.Timestamp(fim).date(), "D").astype(np.int32)
+        return self.codigos[np.searchsorted(self.dias, d0, "left"):np.searchsorted(self.dias, d1, "right")]
+
+    def presentes(self, inicio, fim) -> np.ndarray:
+        """Máscara, por código, dos valores que aparecem no período."""
+        return np.bincount(self._fatia(inicio, fim), minlength=len(self.valores)) > 0
+
+    def distintos(self, inicio, fim) -> list:
+        return self.valores[self.presentes(inicio, fim)].tolist()
+
+
+class IndicePrefixos:
+    """Cada palavra de cada nome, normalizada e ordenada: um prefixo vira um intervalo via searchsorted."""
+
+    def __init__(self, nomes):
+        palavras, codigos = [], []
+        for codigo, nome in enumerate(nomes):
+            for palavra in chave_busca(nome).split():
+                palavras.append(palavra)
+                codigos.append(codigo)
+        ordem = np.argsort(palavras, kind="stable")
+        self.palavras = np.asarray(palavras, dtype=object)[ordem].astype(str)
+        self.codigos = np.asarray(codigos, dtype=np.int32)[ordem]
+        self.n = len(nomes)
+
+    def buscar(self, texto: str) -> np.ndarray:
+        """Máscara dos nomes em que cada palavra digitada é início de alguma palavra do nome."""
+        mascara = np.ones(self.n, dtype=bool)
+        for termo in chave_busca(texto).split():
+            i0 = np.searchsorted(self.palavras, termo, "left")
+            i1 = np.searchsorted(self.palavras, termo + "\U0010ffff", "left")
+            achados = np.zeros(self.n, dtype=bool)
+            achados[self.codigos[i0:i1]] = True
+            mascara &= achados
+        return mascara
+
+
+class OpcoesFiltro:
+    def __init__(self, dimensoes: dict):
+        self.dimensoes = dimensoes
+        self.indice_nomes = IndicePrefixos(dimensoes["NOME"].valores)
+
+    def distintos(self, coluna: str, inicio, fim) -> list:
+        return self.dimensoes[coluna].distintos(inicio, fim)
+
+    def buscar_nomes(self, texto: str, inicio, fim, limite: int = LIMITE_BUSCA) -> list:
+        """Nomes do período que casam com o texto digitado (no máximo `limite`, em ordem alfabética)."""
+        nomes = self.dimensoes["NOME"]
+        mascara = nomes.presentes(inicio, fim)
+        if texto.strip():
+            mascara &= self.indice_nomes.buscar(texto)
+        return nomes.valores[np.flatnonzero(mascara)[:limite]].tolist()
+
+
+def construir(caminho_cache: str = None) -> OpcoesFiltro:
+    return OpcoesFiltro({c: Dimensao(prontidao_dados.dias_valores(c, caminho_cache)) for c in DIMENSOES})
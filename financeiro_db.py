@@ -0,0 +1,300 @@
+# financeiro_db.py
+# Camada de dados do Financlex: as métricas e o gráfico por categoria são agregados no banco (GROUP BY),
+# com filtro de período, e a tabela carrega só uma página de transações por vez.
+# Razão: saldo, totais por mês e por categoria ficam em tabelas de resumo atualizadas na mesma transação de
+# cada gravação, então as métricas sem filtro de período e o fluxo de caixa mensal são leituras de poucas linhas.
+#
+#   python financeiro_db.py --verificar      # compara os resumos com as transações
+#   python financeiro_db.py --reconstruir    # refaz os resumos do zero
+import argparse
+import pandas as pd
+from instrumentacao import medido
+from repositorio import obter_repositorio
+
+TIPOS = ["Receita", "Despesa"]
+
+# ---------- BANCO DE DADOS ----------
+# O backend (SQLite local ou servidor) vem da seção [financeiro] da configuração; ver repositorio.py
+def repo():
+    return obter_repositorio("financeiro")
+
+def conectar():
+    return repo().conectar()
+
+def inicializar_db():
+    r = repo()
+    conn = conectar()
+    r.criar_tabela(conn, "transacoes", """
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            data DATE,
+            tipo TEXT,
+            categoria TEXT,
+            valor REAL,
+            descricao TEXT
+    """)
+    # totais por tipo no período e por categoria
+    r.criar_indice(conn, "idx_transacoes_tipo_data", "transacoes", "tipo, data")
+    r.criar_indice(conn, "idx_transacoes_categoria", "transacoes", "categoria")
+    # paginação da tabela (data decrescente, id)
+    r.criar_indice(conn, "idx_transacoes_data", "transacoes", "data, id")
+    # lançamentos projetados do hospedagem.db (sincronizacao_financeiro.py): origem = tabela, origem_id = id lá
+    r.adicionar_coluna(conn, "transacoes", "origem", "TEXT")
+    r.adicionar_coluna(conn, "transacoes", "origem_id", "INTEGER")
+    r.criar_indice(conn, "idx_transacoes_origem", "transacoes", "origem, origem_id")
+    r.criar_tabela(conn, "sincronizacao", "chave TEXT PRIMARY KEY, valor TEXT")
+    # razão
+    r.criar_tabela(conn, "razao_saldo", "id INTEGER PRIMARY KEY, receitas REAL, despesas REAL, quantidade INTEGER")
+    r.criar_tabela(conn, "razao_mes", "mes TEXT, tipo TEXT, total REAL, quantidade INTEGER, PRIMARY KEY (mes, tipo)")
+    r.criar_tabela(conn, "razao_categoria",
+                   "categoria TEXT, tipo TEXT, total REAL, quantidade INTEGER, PRIMARY KEY (categoria, tipo)")
+    conn.commit()
+    vazio = conn.cursor().execute("SELECT COUNT(*) FROM razao_saldo").fetchone()[0] == 0
+    conn.close()
+    if vazio:
+        # primeira execução com a razão (ou banco novo): monta os resumos a partir das transações existentes
+        reconstruir_razao()
+
+# ---------- ESQUEMA TIPADO ----------
+TEXTO = "string[pyarrow]"
+
+def tipar(df: pd.DataFrame) -> pd.DataFrame:
+    if "id" in df:
+        df["id"] = df["id"].astype("int32")
+    if "data" in df:
+        df["data"] = pd.to_datetime(df["data"], format="ISO8601", errors="coerce")
+    if "tipo" in df:
+        df["tipo"] = pd.Categorical(df["tipo"], categories=TIPOS)
+    for col in ("categoria", "descricao", "origem"):
+        if col in df:
+            df[col] = df[col].astype(TEXTO)
+    if "valor" in df:
+        df["valor"] = df["valor"].astype("float64")
+    return df
+
+def data_sql(v):
+    """Converte Timestamp/date/str para 'AAAA-MM-DD' (formato gravado no banco)."""
+    if v is None or pd.isna(v):
+        return None
+    return pd.Timestamp(v).date().isoformat()
+
+# ---------- GRAVAÇÃO ----------
+SQL_INSERIR = "INSERT INTO transacoes (data, tipo, categoria, valor, descricao) VALUES (?, ?, ?, ?, ?)"
+
+def inserir(data, tipo: str, categoria: str, valor: float, descricao: str):
+    inserir_lote([(data, tipo, categoria, valor, descricao)])
+
+def inserir_lote(linhas) -> int:
+    """Insere (data, tipo, categoria, valor, descricao) e atualiza a razão, tudo numa transação."""
+    linhas = [(data_sql(d), t, c, float(v or 0), desc) for d, t, c, v, desc in linhas]
+    conn = conectar()
+    try:
+        n = repo().executar_lote(SQL_INSERIR, linhas, conn=conn)
+        aplicar_razao(conn, [(d, t, c, v) for d, t, c, v, _ in linhas])
+        conn.commit()
+        return n
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+# ---------- RAZÃO ----------
+def _mes(data) -> str:
+    data = data_sql(data)
+    return data[:7] if data else ""
+
+def _somar(cur, tabela: str, chave: str, valor_chave, tipo: str, total: float, quantidade: int):
+    cur.execute(
+        f"UPDATE {tabela} SET total = total + ?, quantidade = quantidade + ? WHERE {chave} = ? AND tipo = ?",
+        (total, quantidade, valor_chave, tipo)
+    )
+    if cur.rowcount == 0:
+        cur.execute(
+            f"INSERT INTO {tabela} ({chave}, tipo, total, quantidade) VALUES (?, ?, ?, ?)",
+            (valor_chave, tipo, total, quantidade)
+        )
+
+def aplicar_razao(conn, linhas, sinal: int = 1):
+    """Soma (sinal=1) ou retira (sinal=-1) as transações (data, tipo, categoria, valor) dos resumos.
+    Não faz commit: roda na transação de quem gravou as transações."""
+    receitas = despesas = 0.0
+    quantidade = 0
+    por_mes, por_categoria_ = {}, {}
+    for data, tipo, categoria, valor in linhas:
+        v = sinal * float(valor or 0)
+        quantidade += sinal
+        if tipo == "Receita":
+            receitas += v
+        elif tipo == "Despesa":
+            despesas += v
+        for acum, chave in ((por_mes, (_mes(data), tipo)), (por_categoria_, (categoria or "", tipo))):
+            total, n = acum.get(chave, (0.0, 0))
+            acum[chave] = (total + v, n + sinal)
+    if not quantidade and not por_mes:
+        return
+    cur = conn.cursor()
+    cur.execute(
+        "UPDATE razao_saldo SET receitas = receitas + ?, despesas = despesas + ?, quantidade = quantidade + ? WHERE id = 1",
+        (receitas, despesas, quantidade)
+    )
+    if cur.rowcount == 0:
+        cur.execute("INSERT INTO razao_saldo (id, receitas, despesas, quantidade) VALUES (1, ?, ?, ?)",
+                    (receitas, despesas, quantidade))
+    for (mes, tipo), (total, n) in por_mes.items():
+        _somar(cur, "razao_mes", "mes", mes, tipo, total, n)
+    for (categoria, tipo), (total, n) in por_categoria_.items():
+        _somar(cur, "razao_categoria", "categoria", categoria, tipo, total, n)
+
+def _resumos_das_transacoes(conn=None) -> dict:
+    """Os três resumos calculados do zero com GROUP BY sobre transacoes."""
+    r = repo()
+    ler = (lambda sql: r.ler(sql)) if conn is None else (lambda sql: pd.read_sql(sql, conn))
+    mes = ler(f"""
+        SELECT {r.ano('data')} AS ano, {r.mes('data')} AS m, tipo, SUM(valor) AS total, COUNT(*) AS quantidade
+        FROM transacoes GROUP BY {r.ano('data')}, {r.mes('data')}, tipo
+    """)
+    mes["mes"] = [
+        f"{int(a):04d}-{int(m):02d}" if pd.notna(a) else "" for a, m in zip(mes["ano"], mes["m"])
+    ]
+    mes = mes.groupby(["mes", "tipo"], as_index=False)[["total", "quantidade"]].sum()
+    categoria = ler("""
+        SELECT COALESCE(categoria, '') AS categoria, tipo, SUM(valor) AS total, COUNT(*) AS quantidade
+        FROM transacoes GROUP BY COALESCE(categoria, ''), tipo
+    """)
+    por_tipo = mes.groupby("tipo")["total"].sum()
+    saldo = pd.DataFrame([{
+        "id": 1,
+        "receitas": float(por_tipo.get("Receita", 0.0)),
+        "despesas": float(por_tipo.get("Despesa", 0.0)),
+        "quantidade": int(mes["quantidade"].sum()),
+    }])
+    return {"razao_saldo": saldo, "razao_mes": mes, "razao_categoria": categoria}
+
+def reconstruir_razao():
+    """Refaz os resumos a partir das transações, numa transação."""
+    r = repo()
+    conn = conectar()
+    try:
+        resumos = _resumos_das_transacoes(conn)
+        for tabela, df in resumos.items():
+            conn.cursor().execute(f"DELETE FROM {tabela}")
+            colunas = list(df.columns)
+            r.executar_lote(
+                f"INSERT INTO {tabela} ({', '.join(colunas)}) VALUES ({', '.join('?' * len(colunas))})",
+                ([v.item() if hasattr(v, "item") else v for v in linha] for linha in df.itertuples(index=False)),
+                conn=conn
+            )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+def verificar_razao(tolerancia: float = 0.005) -> pd.DataFrame:
+    """Diferenças entre os resumos gravados e os recalculados (vazio = consistente)."""
+    r = repo()
+    chaves = {"razao_saldo": ["id"], "razao_mes": ["mes", "tipo"], "razao_categoria": ["categoria", "tipo"]}
+    diferencas = []
+    for tabela, esperado in _resumos_das_transacoes().items():
+        gravado = r.ler(f"SELECT * FROM {tabela}")
+        k = chaves[tabela]
+        junto = esperado.merge(gravado, on=k, how="outer", suffixes=("_esperado", "_gravado")).fillna(0)
+        for col in [c for c in esperado.columns if c not in k]:
+            diverge = (junto[f"{col}_esperado"] - junto[f"{col}_gravado"]).abs() > tolerancia
+            for _, linha in junto[diverge].iterrows():
+                diferencas.append({
+                    "tabela": tabela, "chave": tuple(linha[c] for c in k), "coluna": col,
+                    "esperado": linha[f"{col}_esperado"], "gravado": linha[f"{col}_gravado"],
+                })
+    return pd.DataFrame(diferencas, columns=["tabela", "chave", "coluna", "esperado", "gravado"])
+
+# ---------- AGREGAÇÕES ----------
+def _periodo(inicio=None, fim=None, params: list = None) -> str:
+    filtro = ""
+    if inicio is not None:
+        filtro += " AND data >= ?"
+        params.append(data_sql(inicio))
+    if fim is not None:
+        filtro += " AND data <= ?"
+        params.append(data_sql(fim))
+    return filtro
+
+@medido("financeiro_db.resumo")
+def resumo(inicio=None, fim=None) -> dict:
+    """Receitas, despesas e saldo do período (None = sem limite; sem período vem direto da razão)."""
+    if inicio is None and fim is None:
+        df = repo().ler("SELECT receitas, despesas FROM razao_saldo WHERE id = 1")
+        receitas, despesas = (float(df["receitas"].iloc[0]), float(df["despesas"].iloc[0])) if not df.empty else (0.0, 0.0)
+        return {"receitas": receitas, "despesas": despesas, "saldo": receitas - despesas}
+    params = []
+    filtro = _periodo(inicio, fim, params)
+    df = repo().ler(f"SELECT tipo, SUM(valor) AS total FROM transacoes WHERE 1=1{filtro} GROUP BY tipo", params)
+    totais = dict(zip(df["tipo"], df["total"].fillna(0.0)))
+    receitas = float(totais.get("Receita", 0.0))
+    despesas = float(totais.get("Despesa", 0.0))
+    return {"receitas": receitas, "despesas": despesas, "saldo": receitas - despesas}
+
+@medido("financeiro_db.por_categoria")
+def por_categoria(tipo: str = "Despesa", inicio=None, fim=None) -> pd.DataFrame:
+    if inicio is None and fim is None:
+        return repo().ler(
+            "SELECT categoria, total AS valor FROM razao_categoria WHERE tipo = ? AND quantidade > 0 ORDER BY categoria",
+            [tipo]
+        )
+    params = [tipo]
+    filtro = _periodo(inicio, fim, params)
+    return repo().ler(
+        f"SELECT categoria, SUM(valor) AS valor FROM transacoes WHERE tipo = ?{filtro} "
+        f"GROUP BY categoria ORDER BY categoria",
+        params
+    )
+
+@medido("financeiro_db.fluxo_mensal")
+def fluxo_mensal() -> pd.DataFrame:
+    """Receitas, despesas, saldo do mês e saldo acumulado por mês, da razão."""
+    df = repo().ler("SELECT mes, tipo, total FROM razao_mes WHERE mes <> '' AND quantidade > 0")
+    fluxo = df.pivot_table(index="mes", columns="tipo", values="total", aggfunc="sum", fill_value=0.0)
+    fluxo = fluxo.reindex(columns=TIPOS, fill_value=0.0).rename(columns={"Receita": "Receitas", "Despesa": "Despesas"})
+    fluxo.columns.name = None
+    fluxo["Saldo do mês"] = fluxo["Receitas"] - fluxo["Despesas"]
+    fluxo["Saldo acumulado"] = fluxo["Saldo do mês"].cumsum()
+    return fluxo.sort_index()
+
+# ---------- PAGINAÇÃO ----------
+@medido("financeiro_db.pagina")
+def pagina(inicio=None, fim=None, apos=None, tamanho: int = 50):
+    """Transações mais recentes primeiro (data, id decrescentes), uma página por vez via cursor
+    (data, id) da última linha da página anterior. Retorna (DataFrame tipado, próximo cursor ou None)."""
+    r = repo()
+    params = []
+    filtro = _periodo(inicio, fim, params)
+    if apos is not None and apos[0] is None:
+        # datas nulas ficam por último: continua entre elas
+        filtro += " AND data IS NULL AND id < ?"
+        params.append(int(apos[1]))
+    elif apos is not None:
+        filtro += " AND (data < ? OR (data = ? AND id < ?) OR data IS NULL)"
+        params.extend([apos[0], apos[0], int(apos[1])])
+    sql = f"SELECT id, data, tipo, categoria, valor, descricao, origem FROM transacoes WHERE 1=1{filtro} ORDER BY data DESC, id DESC"
+    df = r.ler(r.limitar(sql, int(tamanho) + 1), params)
+
+    proximo = None
+    if len(df) > tamanho:
+        df = df.iloc[:tamanho]
+        ultima = df.iloc[-1]
+        proximo = (None if pd.isna(ultima["data"]) else ultima["data"], int(ultima["id"]))
+    return tipar(df), proximo
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Verifica ou reconstrói os resumos da razão do Financlex.")
+    ap.add_argument("--verificar", action="store_true")
+    ap.add_argument("--reconstruir", action="store_true")
+    args = ap.parse_args()
+    inicializar_db()
+    if args.reconstruir:
+        reconstruir_razao()
+        print("Resumos reconstruídos.")
+    diferencas = verificar_razao()
+    print("Razão consistente." if diferencas.empty else diferencas.to_string())
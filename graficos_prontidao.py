@@ -0,0 +1,81 @@
+# graficos_prontidao.py
+# Gráfico "Evolução Diária" do pred.py: barras empilhadas por tipo de teste + aderência (%) e aderência móvel.
+# Cada trace é emitido uma vez; períodos longos são agrupados em semanas ou meses (contagens somadas, aderência
+# recalculada sobre as somas) e as linhas usam Scattergl (WebGL) quando têm muitos pontos.
+import pandas as pd
+import plotly.graph_objects as go
+
+# Paleta Ternium
+CORES = {
+    "TESTE NO HORÁRIO": "#FF6600",   # Laranja Ternium
+    "NÃO REALIZOU": "#666666",       # Cinza Ternium
+    "TESTE TARDIO": "#FFD100",       # Amarelo Ternium
+}
+COR_OUTROS = "#BBBBBB"               # Cinza claro para outros status
+COR_ADERENCIA = "#005288"            # Azul institucional
+
+INDICADORES = ["Total", "Aderência (%)"]
+LIMITE_DIARIO = 120      # até 120 dias: uma barra por dia
+LIMITE_SEMANAL = 730     # até 2 anos: por semana; acima, por mês
+LIMITE_WEBGL = 500       # pontos a partir dos quais as linhas vão para WebGL
+FREQUENCIAS = {"D": "Diária", "W-MON": "Semanal", "MS": "Mensal"}
+
+
+def escolher_frequencia(n_dias: int) -> str:
+    if n_dias <= LIMITE_DIARIO:
+        return "D"
+    if n_dias <= LIMITE_SEMANAL:
+        return "W-MON"
+    return "MS"
+
+
+def agrupar(diario: pd.DataFrame, coluna_movel: str, frequencia: str) -> pd.DataFrame:
+    """Reagrupa a saída de cubo_prontidao.indicadores (calendário diário) na frequência pedida.
+    A aderência móvel fica com o valor do último dia de cada grupo. Grupos sem testes são descartados."""
+    status = [c for c in diario.columns if c not in INDICADORES and not c.startswith("Aderência Móvel")]
+    if frequencia == "D":
+        out = diario[status + INDICADORES + [coluna_movel]]
+    else:
+        out = diario[status + ["Total"]].resample(frequencia, label="left", closed="left").sum()
+        no_horario = out["TESTE NO HORÁRIO"] if "TESTE NO HORÁRIO" in out else 0
+        out["Aderência (%)"] = (no_horario / out["Total"].where(out["Total"] > 0) * 100).round(1)
+        out[coluna_movel] = diario[coluna_movel].resample(frequencia, label="left", closed="left").last()
+    return out[out["Total"] > 0]
+
+
+def figura_evolucao(diario: pd.DataFrame, janela: int, frequencia: str = None) -> go.Figure:
+    """diario: saída de cubo_prontidao.indicadores com a janela `janela` (índice = dias corridos do período)."""
+    coluna_movel = f"Aderência Móvel {janela}d (%)"
+    frequencia = frequencia or escolher_frequencia(len(diario))
+    dados = agrupar(diario, coluna_movel, frequencia)
+    status = [c for c in dados.columns if c not in INDICADORES + [coluna_movel]]
+    x = dados.index.date
+    Linha = go.Scattergl if len(dados) > LIMITE_WEBGL else go.Scatter
+
+    fig = go.Figure()
+    # Barras empilhadas para todos os status
+    for s in status:
+        fig.add_trace(go.Bar(x=x, y=dados[s], name=s, marker_color=CORES.get(s, COR_OUTROS), yaxis="y1"))
+
+    # Linha de aderência (%)
+    fig.add_trace(Linha(
+        x=x, y=dados["Aderência (%)"], mode="lines+markers", name="Aderência (%)", yaxis="y2",
+        line=dict(color=COR_ADERENCIA, dash="dash")
+    ))
+    # Linha da aderência móvel
+    fig.add_trace(Linha(
+        x=x, y=dados[coluna_movel], mode="lines", name=f"Média Móvel ({janela}d) Aderência", yaxis="y2",
+        line=dict(color=CORES["TESTE NO HORÁRIO"], width=4, dash="dot")
+    ))
+
+    # Layout com barras empilhadas e dois eixos y
+    rotulo = FREQUENCIAS[frequencia]
+    fig.update_layout(
+        barmode="stack",
+        title=f"Evolução {rotulo}: Status dos Testes (Barras Empilhadas) e Aderência (%)",
+        xaxis_title="Data" if frequencia == "D" else f"Data (início do período, agrupamento {rotulo.lower()})",
+        yaxis=dict(title="Quantidade", side="left"),
+        yaxis2=dict(title="Aderência (%)", overlaying="y", side="right", range=[0, 100]),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    return fig
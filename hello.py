@@ -1,30 +1,14 @@
-import pyodbc
+from conexao_sql import obter_fabrica
 
-# Dados de conexãop
-server = 'terbrdwhdb03'
-database = 'dwh_brasil'
-driver = '{ODBC Driver 17 for SQL Server}'
+# Dados de conexão: seção [dwh] do config.ini (ou DWH_SERVIDOR, DWH_BANCO, DWH_ODBC... no ambiente);
+# sem usuário/senha usa autenticação do Windows
+fabrica = obter_fabrica("dwh")
 
-# String de conexão usando autenticação do Windows
-conn_str = (
-    f"DRIVER={driver};"
-    f"SERVER={server};"
-    f"DATABASE={database};"
-    f"Trusted_Connection=yes;"
-)
-
-# Conectando ao banco
-conn = pyodbc.connect(conn_str)
-cursor = conn.cursor()
-
-# Consulta à tabela
-cursor.execute("SELECT TOP 10 * FROM vfbr.rep_despacho")
-rows = cursor.fetchall()
+# Consulta à tabela (cursor e conexão são fechados/devolvidos ao pool ao sair do bloco)
+with fabrica.cursor() as cursor:
+    cursor.execute("SELECT TOP 10 * FROM vfbr.rep_despacho")
+    rows = cursor.fetchall()
 
 # Exibindo os resultados
 for row in rows:
     print(row)
-
-# Fechando a conexão
-cursor.close()
-conn.close()
@@ -0,0 +1,430 @@
+# hospedagem_db.py
+import pandas as pd
+from instrumentacao import medido, secao
+from repositorio import obter_repositorio
+
+# Opções conhecidas das colunas de baixa cardinalidade (usadas nos formulários e como categorias)
+PLATAFORMAS = ["Airbnb", "Booking", "Direto"]
+STATUS_PAGAMENTO = ["Pendente", "Pago"]
+TIPOS_DESPESA = ["Prestação", "Condominio", "Luz", "Internet", "Gás", "Administradora", "Limpeza", "Manutenção", "Insumos", "Outros"]
+TEMPORADAS = ["Baixa", "Média", "Alta"]
+STATUS_UNIDADE = ["Disponível", "Ocupado", "Manutenção"]
+
+# ---------- BANCO DE DADOS ----------
+# O backend (SQLite local ou servidor) vem da seção [hospedagem] da configuração; ver repositorio.py
+def repo():
+    return obter_repositorio("hospedagem")
+
+def conectar():
+    return repo().conectar()
+
+def inicializar_db():
+    r = repo()
+    conn = conectar()
+    r.criar_tabela(conn, "unidades", """
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nome TEXT,
+            localizacao TEXT,
+            capacidade INTEGER,
+            status TEXT
+    """)
+    r.criar_tabela(conn, "locacoes", """
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            unidade_id INTEGER,
+            checkin DATE,
+            checkout DATE,
+            hospede TEXT,
+            valor REAL,
+            plataforma TEXT,
+            status_pagamento TEXT,
+            FOREIGN KEY(unidade_id) REFERENCES unidades(id)
+    """)
+    r.criar_tabela(conn, "despesas", """
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            unidade_id INTEGER,
+            data DATE,
+            tipo TEXT,
+            valor REAL,
+            descricao TEXT,
+            FOREIGN KEY(unidade_id) REFERENCES unidades(id)
+    """)
+    r.criar_tabela(conn, "precos", """
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            unidade_id INTEGER,
+            temporada TEXT,
+            preco_base REAL,
+            FOREIGN KEY(unidade_id) REFERENCES unidades(id)
+    """)
+    # índices usados pelas agregações da analise.py (filtro de período e junção com unidades)
+    r.criar_indice(conn, "idx_locacoes_checkin", "locacoes", "checkin")
+    r.criar_indice(conn, "idx_locacoes_checkout", "locacoes", "checkout")
+    r.criar_indice(conn, "idx_locacoes_unidade", "locacoes", "unidade_id")
+    r.criar_indice(conn, "idx_despesas_unidade_data", "despesas", "unidade_id, data")
+    # paginação por data (keyset data+id) e busca por prefixo nos editores
+    r.criar_indice(conn, "idx_despesas_data", "despesas", "data")
+    r.criar_indice(conn, "idx_locacoes_hospede", "locacoes", "hospede COLLATE NOCASE" if r.dialeto == "sqlite" else "hospede")
+    r.criar_indice(conn, "idx_despesas_descricao", "despesas", "descricao COLLATE NOCASE" if r.dialeto == "sqlite" else "descricao")
+    # reserva vinda de canal (Airbnb/Booking/channel manager): chave do upsert da ingestão em lote
+    r.adicionar_coluna(conn, "locacoes", "id_externo", "TEXT")
+    r.criar_indice(conn, "idx_locacoes_externo", "locacoes", "id_externo")
+    # único por unidade (parcial: no SQL Server nulos contam como iguais num índice único)
+    cur = conn.cursor()
+    cur.execute(
+        "SELECT unidade_id, id_externo FROM locacoes WHERE id_externo IS NOT NULL "
+        "GROUP BY unidade_id, id_externo HAVING COUNT(*) > 1"
+    )
+    duplicados = cur.fetchall()
+    if duplicados:
+        conn.close()
+        raise RuntimeError(
+            f"{len(duplicados)} id_externo repetidos na mesma unidade (ex.: unidade {duplicados[0][0]}, "
+            f"{duplicados[0][1]!r}); remova as duplicatas antes de iniciar"
+        )
+    r.criar_indice(conn, "idx_locacoes_unidade_externo", "locacoes", "unidade_id, id_externo", unico=True,
+                   onde="id_externo IS NOT NULL")
+    r.criar_indice(conn, "idx_locacoes_unidade_checkin", "locacoes", "unidade_id, checkin")
+    _rastrear_alteracoes(r, conn)
+    # versão por unidade do calendário ICS (versao_unidade)
+    r.criar_indice(conn, "idx_locacoes_unidade_versao", "locacoes", "unidade_id, versao")
+    if r.dialeto == "sqlite":
+        _corrigir_inteiros_blob(conn)
+    conn.commit()
+    if r.dialeto == "sqlite":
+        # WAL: leituras (telas, API) não bloqueiam nem são bloqueadas pela gravação; fica gravado no arquivo
+        conn.execute("PRAGMA journal_mode=WAL")
+    conn.close()
+
+# ---------- RASTREIO DE ALTERAÇÕES ----------
+# As tabelas têm `atualizado_em`, preenchido por gatilho em toda inclusão/alteração (de qualquer tela ou
+# importação), e cada exclusão deixa uma linha em `exclusoes`. A sincronização com o Financlex
+# (sincronizacao_financeiro.py) lê só o que mudou desde a última marca.
+# Os mesmos gatilhos somam 1 ao contador da tabela em `versoes` a cada inclusão, alteração ou exclusão e gravam
+# o novo valor na coluna `versao` da linha. O contador é a versão que a API (api.py) usa no ETag, e o maior
+# `versao` e a quantidade de locações de uma unidade são a versão do calendário ICS dela. O carimbo em
+# milissegundos não serve para isso: duas gravações no mesmo milissegundo deixariam o ETag igual. `criado_em`
+# distingue um banco recriado, em que o contador recomeça.
+RASTREADAS = ("unidades", "locacoes", "despesas", "precos")
+
+def _rastrear_alteracoes(r, conn):
+    r.criar_tabela(conn, "exclusoes", """
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            tabela TEXT,
+            registro_id INTEGER,
+            excluido_em TEXT
+    """)
+    r.criar_indice(conn, "idx_exclusoes_tabela", "exclusoes", "tabela, seq")
+    r.criar_tabela(conn, "versoes", """
+            tabela TEXT PRIMARY KEY,
+            versao INTEGER,
+            criado_em TEXT
+    """)
+    agora = r.agora()
+    for t in RASTREADAS:
+        contar = f"UPDATE versoes SET versao = versao + 1 WHERE tabela = '{t}';"
+        marcar = f"atualizado_em = {agora}, versao = (SELECT versao FROM versoes WHERE tabela = '{t}')"
+        if r.dialeto == "sqlite":
+            # recriados a cada inicialização (bancos de versões anteriores têm gatilhos sem o contador)
+            for gatilho in ("inclusao", "alteracao", "exclusao"):
+                conn.execute(f"DROP TRIGGER IF EXISTS trg_{t}_{gatilho}")
+        r.adicionar_coluna(conn, t, "atualizado_em", "TEXT")
+        r.adicionar_coluna(conn, t, "versao", "INTEGER")
+        conn.execute(f"UPDATE {t} SET atualizado_em = {agora} WHERE atualizado_em IS NULL")
+        conn.execute(f"UPDATE {t} SET versao = 0 WHERE versao IS NULL")
+        r.criar_indice(conn, f"idx_{t}_atualizado", t, "atualizado_em, id")
+        r.criar_indice(conn, f"idx_{t}_versao", t, "versao")     # linhas mudadas desde uma versão (armazém)
+        conn.execute(
+            f"INSERT INTO versoes (tabela, versao, criado_em) SELECT '{t}', 0, {agora} "
+            f"WHERE NOT EXISTS (SELECT 1 FROM versoes WHERE tabela = '{t}')"
+        )
+        if r.dialeto == "sqlite":
+            conn.execute(f"""
+                CREATE TRIGGER trg_{t}_inclusao AFTER INSERT ON {t}
+                BEGIN {contar} UPDATE {t} SET {marcar} WHERE id = NEW.id; END
+            """)
+            # a própria marcação muda `versao` e não dispara de novo
+            conn.execute(f"""
+                CREATE TRIGGER trg_{t}_alteracao AFTER UPDATE ON {t}
+                WHEN NEW.versao IS OLD.versao
+                BEGIN {contar} UPDATE {t} SET {marcar} WHERE id = NEW.id; END
+            """)
+            conn.execute(f"""
+                CREATE TRIGGER trg_{t}_exclusao AFTER DELETE ON {t}
+                BEGIN {contar}
+                INSERT INTO exclusoes (tabela, registro_id, excluido_em) VALUES ('{t}', OLD.id, {agora}); END
+            """)
+        else:
+            # um incremento por comando: as linhas gravadas juntas ficam com a mesma versão
+            gatilhos = {
+                f"trg_{t}_alteracao": f"""CREATE OR ALTER TRIGGER trg_{t}_alteracao ON {t} AFTER INSERT, UPDATE AS
+                    BEGIN SET NOCOUNT ON; IF TRIGGER_NESTLEVEL() > 1 RETURN;
+                    IF NOT EXISTS (SELECT 1 FROM inserted) RETURN;
+                    {contar}
+                    UPDATE x SET {marcar} FROM {t} x JOIN inserted i ON i.id = x.id; END""",
+                f"trg_{t}_exclusao": f"""CREATE OR ALTER TRIGGER trg_{t}_exclusao ON {t} AFTER DELETE AS
+                    BEGIN SET NOCOUNT ON;
+                    IF NOT EXISTS (SELECT 1 FROM deleted) RETURN;
+                    {contar}
+                    INSERT INTO exclusoes (tabela, registro_id, excluido_em) SELECT '{t}', id, {agora} FROM deleted; END""",
+            }
+            for ddl in gatilhos.values():
+                conn.execute(f"EXEC(N'{ddl.replace(chr(39), chr(39) * 2)}')")
+
+def _corrigir_inteiros_blob(conn):
+    """Regrava como INTEGER os unidade_id que foram gravados como BLOB (np.int64 passado ao sqlite3)."""
+    for tabela in ("locacoes", "despesas", "precos"):
+        linhas = conn.execute(f"SELECT id, unidade_id FROM {tabela} WHERE typeof(unidade_id) = 'blob'").fetchall()
+        conn.executemany(
+            f"UPDATE {tabela} SET unidade_id=? WHERE id=?",
+            [(int.from_bytes(uid, "little", signed=True), i) for i, uid in linhas]
+        )
+
+def versao_dados(*tabelas) -> str:
+    """Muda a cada inclusão, alteração ou exclusão nas tabelas: contador de cada uma em `versoes`
+    (uma leitura pela chave primária)."""
+    for t in tabelas:
+        if t not in RASTREADAS:
+            raise ValueError(f"Tabela sem rastreio: {t}")
+    df = repo().ler(
+        f"SELECT tabela, versao, criado_em FROM versoes WHERE tabela IN ({', '.join('?' * len(tabelas))})",
+        list(tabelas)
+    ).set_index("tabela").reindex(list(tabelas))
+    return ";".join(f"{t}:{c}:{v}" for t, v, c in zip(df.index, df["versao"], df["criado_em"]))
+
+def versao_unidade(unidade_id: int) -> str:
+    """Versão das locações de uma unidade (calendário ICS): maior `versao` e quantidade. Toda inclusão ou
+    alteração leva a linha a uma versão nova, maior que todas as anteriores, e uma exclusão diminui a
+    quantidade, então o par muda sempre que as locações da unidade mudam. Vazio se a unidade não existe."""
+    df = repo().ler(
+        "SELECT (SELECT nome FROM unidades WHERE id = ?) AS nome, "
+        "(SELECT criado_em FROM versoes WHERE tabela = 'locacoes') AS criado_em, "
+        "MAX(versao) AS versao, COUNT(*) AS total FROM locacoes WHERE unidade_id = ?", [int(unidade_id), int(unidade_id)]
+    )
+    if df["nome"].isna().iloc[0]:
+        return ""
+    versao = df["versao"].iloc[0]
+    return f"{df['nome'].iloc[0]}|{df['criado_em'].iloc[0]}:{0 if pd.isna(versao) else int(versao)}|{int(df['total'].iloc[0])}"
+
+# ---------- ESQUEMA TIPADO ----------
+# Cada coluna é convertida uma única vez na carga: datas viram datetime64, textos livres
+# viram strings Arrow, colunas de poucas opções viram categóricas e ids viram int32.
+# Comparativo de memória/tempo com 1M locações no README.
+TEXTO = "string[pyarrow]"
+
+ESQUEMAS = {
+    "unidades": {
+        "id": "int32",
+        "nome": TEXTO,
+        "localizacao": TEXTO,
+        "capacidade": "Int16",
+        "status": STATUS_UNIDADE,
+        "atualizado_em": TEXTO,
+        "versao": "Int64",
+    },
+    "locacoes": {
+        "id": "int32",
+        "unidade_id": "Int32",
+        "checkin": "data",
+        "checkout": "data",
+        "hospede": TEXTO,
+        "valor": "float64",
+        "plataforma": PLATAFORMAS,
+        "status_pagamento": STATUS_PAGAMENTO,
+        "id_externo": TEXTO,
+        "atualizado_em": TEXTO,
+        "versao": "Int64",
+    },
+    "despesas": {
+        "id": "int32",
+        "unidade_id": "Int32",
+        "data": "data",
+        "tipo": TIPOS_DESPESA,
+        "valor": "float64",
+        "descricao": TEXTO,
+        "atualizado_em": TEXTO,
+        "versao": "Int64",
+    },
+    "precos": {
+        "id": "int32",
+        "unidade_id": "Int32",
+        "temporada": TEMPORADAS,
+        "preco_base": "float64",
+        "atualizado_em": TEXTO,
+        "versao": "Int64",
+    },
+}
+
+def _categoria(serie: pd.Series, conhecidas) -> pd.Series:
+    """Categórica com as opções conhecidas primeiro e os demais valores observados em seguida."""
+    cat = pd.Categorical(serie)
+    extras = [c for c in cat.categories if c not in conhecidas]
+    return cat.set_categories(list(conhecidas) + extras)
+
+def _inteiro(serie: pd.Series) -> pd.Series:
+    """Inteiros gravados como BLOB (np.int64 passado direto ao sqlite3) voltam a ser int."""
+    if serie.dtype == object:
+        serie = serie.map(lambda v: int.from_bytes(v, "little", signed=True) if isinstance(v, bytes) else v)
+    return serie
+
+def tipar(df: pd.DataFrame, tabela: str) -> pd.DataFrame:
+    for col, tipo in ESQUEMAS[tabela].items():
+        if col not in df.columns:
+            continue
+        if isinstance(tipo, list):
+            df[col] = _categoria(df[col], tipo)
+        elif tipo == "data":
+            df[col] = pd.to_datetime(df[col], format="ISO8601", errors="coerce")
+        elif "int" in tipo.lower():
+            df[col] = _inteiro(df[col]).astype(tipo)
+        else:
+            df[col] = df[col].astype(tipo)
+    return df
+
+def ler_tabela(tabela: str, conn=None) -> pd.DataFrame:
+    proprio = conn is None
+    if proprio:
+        conn = conectar()
+    try:
+        with secao(f"hospedagem_db.read_sql.{tabela}") as s:
+            df = pd.read_sql(f"SELECT * FROM {tabela}", conn)
+            s.linhas(len(df))
+    finally:
+        if proprio:
+            conn.close()
+    with secao(f"hospedagem_db.tipar.{tabela}") as s:
+        s.linhas(len(df))
+        return tipar(df, tabela)
+
+@medido("hospedagem_db.get_unidades")
+def get_unidades():
+    return ler_tabela("unidades")
+
+@medido("hospedagem_db.get_locacoes")
+def get_locacoes():
+    return ler_tabela("locacoes")
+
+@medido("hospedagem_db.get_despesas")
+def get_despesas():
+    return ler_tabela("despesas")
+
+@medido("hospedagem_db.get_precos")
+def get_precos():
+    return ler_tabela("precos")
+
+# ---------- CONVERSÃO PARA GRAVAÇÃO ----------
+def data_sql(v):
+    """Converte Timestamp/date/str para 'AAAA-MM-DD' (formato gravado no banco)."""
+    if v is None or pd.isna(v):
+        return None
+    return pd.Timestamp(v).date().isoformat()
+
+def valor_sql(v):
+    """Converte escalares pandas/numpy (pd.NA, np.int32...) em tipos aceitos pelo sqlite3."""
+    if v is None or pd.isna(v):
+        return None
+    return v.item() if hasattr(v, "item") else v
+
+# ---------- PAGINAÇÃO (editores de Locações e Despesas) ----------
+# Paginação por chave (keyset): cada página começa depois da última linha da anterior, usando os
+# índices de id ou data+id, sem OFFSET e sem carregar a tabela inteira.
+PAGINAVEIS = {
+    "locacoes": {
+        "colunas": "t.id, t.unidade_id, u.nome, t.checkin, t.checkout, t.hospede, t.valor, t.plataforma, t.status_pagamento",
+        "data": "checkin",
+        "busca": "hospede",
+    },
+    "despesas": {
+        "colunas": "t.id, t.unidade_id, u.nome, t.data, t.tipo, t.valor, t.descricao",
+        "data": "data",
+        "busca": "descricao",
+    },
+}
+
+LIMITE_CONTAGEM = 10000
+
+def _filtros_pagina(tabela: str, unidade_id=None, mes=None, busca: str = ""):
+    r = repo()
+    cfg = PAGINAVEIS[tabela]
+    condicoes, params = [], []
+    if unidade_id is not None:
+        condicoes.append("t.unidade_id = ?")
+        params.append(int(unidade_id))
+    if mes:
+        condicoes.append(f"{r.mes('t.' + cfg['data'])} = ?")
+        params.append(int(mes))
+    if busca:
+        # prefixo: aproveita o índice (NOCASE no SQLite) em vez de varrer com '%termo%'
+        condicoes.append(f"t.{cfg['busca']} LIKE ? ESCAPE '\\'")
+        params.append(_literal_like(busca) + "%")
+    return condicoes, params
+
+def _literal_like(termo: str) -> str:
+    """Termo que o LIKE ... ESCAPE '\\' compara literalmente: \\, % e _ escapados (e [, curinga no SQL Server)."""
+    for especial in ("\\", "%", "_", "["):
+        termo = termo.replace(especial, "\\" + especial)
+    return termo
+
+def contar_estimado(tabela: str, unidade_id=None, mes=None, busca: str = ""):
+    """Contagem limitada a LIMITE_CONTAGEM linhas. Retorna (quantidade, exata?)."""
+    r = repo()
+    condicoes, params = _filtros_pagina(tabela, unidade_id, mes, busca)
+    where = (" WHERE " + " AND ".join(condicoes)) if condicoes else ""
+    interna = r.limitar(f"SELECT 1 AS x FROM {tabela} t{where}", LIMITE_CONTAGEM + 1)
+    n = int(r.ler(f"SELECT COUNT(*) AS n FROM ({interna}) c", params)["n"].iloc[0])
+    return min(n, LIMITE_CONTAGEM), n <= LIMITE_CONTAGEM
+
+@medido("hospedagem_db.pagina")
+def pagina(tabela: str, unidade_id=None, mes=None, busca: str = "", ordem: str = "id", apos=None, tamanho: int = 50):
+    """Uma página do editor. `ordem` é "id" ou "data"; `apos` é o cursor devolvido pela página
+    anterior (None = primeira página). Retorna (DataFrame tipado, cursor da próxima página ou None)."""
+    r = repo()
+    cfg = PAGINAVEIS[tabela]
+    condicoes, params = _filtros_pagina(tabela, unidade_id, mes, busca)
+    if ordem == "data":
+        col = "t." + cfg["data"]
+        if apos is not None and apos[0] is None:
+            # NULLs vêm primeiro na ordenação: continua entre eles e depois segue para as datas
+            condicoes.append(f"(({col} IS NULL AND t.id > ?) OR {col} IS NOT NULL)")
+            params.append(apos[1])
+        elif apos is not None:
+            condicoes.append(f"({col} > ? OR ({col} = ? AND t.id > ?))")
+            params.extend([apos[0], apos[0], apos[1]])
+        order_by = f"{col}, t.id"
+    else:
+        if apos is not None:
+            condicoes.append("t.id > ?")
+            params.append(int(apos[1]))
+        order_by = "t.id"
+    where = (" WHERE " + " AND ".join(condicoes)) if condicoes else ""
+    sql = f"SELECT {cfg['colunas']} FROM {tabela} t JOIN unidades u ON u.id = t.unidade_id{where} ORDER BY {order_by}"
+    df = r.ler(r.limitar(sql, int(tamanho) + 1), params)
+
+    proximo = None
+    if len(df) > tamanho:
+        df = df.iloc[:tamanho]
+        ultima = df.iloc[-1]
+        proximo = (ultima[cfg["data"]] if ordem == "data" else None, int(ultima["id"]))
+    return tipar(df, tabela), proximo
+
+# ---------- GRAVAÇÃO DOS EDITORES ----------
+@medido("hospedagem_db.salvar_locacoes", linhas=lambda n: n)
+def salvar_locacoes(editado: pd.DataFrame) -> int:
+    """Grava as linhas da página editada de locações (UPDATE por id)."""
+    return repo().executar_lote(
+        "UPDATE locacoes SET checkin=?, checkout=?, hospede=?, valor=?, plataforma=?, status_pagamento=? WHERE id=?",
+        [
+            (data_sql(row["checkin"]), data_sql(row["checkout"]), valor_sql(row["hospede"]), valor_sql(row["valor"]),
+             valor_sql(row["plataforma"]), valor_sql(row["status_pagamento"]), int(row["id"]))
+            for _, row in editado.dropna(subset=["id"]).iterrows()
+        ]
+    )
+
+@medido("hospedagem_db.salvar_despesas", linhas=lambda n: n)
+def salvar_despesas(editado: pd.DataFrame) -> int:
+    """Grava as linhas da página editada de despesas (UPDATE por id)."""
+    return repo().executar_lote(
+        "UPDATE despesas SET data=?, tipo=?, valor=?, descricao=? WHERE id=?",
+        [
+            (data_sql(row["data"]), valor_sql(row["tipo"]), float(row["valor"]), valor_sql(row["descricao"]), int(row["id"]))
+            for _, row in editado.dropna(subset=["id"]).iterrows()
+        ]
+    )
@@ -0,0 +1,137 @@
+# importacao_csv.py
+# Importação de locações por CSV (separado por ;) da tela Locações do hospedagem.py: leitura com apelidos de
+# colunas, conversão de datas (dia primeiro) e valores em formato brasileiro, e gravação em lote.
+# Fica fora do script do Streamlit para poder ser medida pelos benchmarks (benchmarks/).
+import re
+import unicodedata
+import pandas as pd
+from hospedagem_db import repo, conectar, get_unidades
+from instrumentacao import medido
+
+OBRIGATORIAS = ["unidade", "checkin", "checkout"]
+ALIAS = {
+    "unidade": ["unidade", "unit", "nome_unidade", "apto", "apartamento", "imovel", "imóvel"],
+    "checkin": ["checkin", "check-in", "data_checkin", "entrada", "inicio", "início"],
+    "checkout": ["checkout", "check-out", "data_checkout", "saida", "saída", "fim", "final"],
+    "hospede": ["hospede", "hóspede", "cliente", "nome_hospede"],
+    "valor": ["valor", "valor_total", "preco", "preço", "amount", "price"],
+    "plataforma": ["plataforma", "canal", "origem"],
+    "status_pagamento": ["status_pagamento", "pagamento", "status", "payment_status"]
+}
+
+def _norm(s: str) -> str:
+    s = str(s or "").strip().lower()
+    s = unicodedata.normalize("NFKD", s)
+    return "".join(ch for ch in s if not unicodedata.combining(ch))
+
+def parse_valor_cell(x) -> float:
+    """Converte strings de dinheiro em float. Suporta 'R$ 1.234,56', '1,234.56', '1234,56', '1234.56', '(1.234,56)'. """
+    if x is None:
+        return 0.0
+    s = str(x).strip()
+    if s == "" or s.lower() in {"nan", "none"}:
+        return 0.0
+    neg = False
+    if s.startswith("(") and s.endswith(")"):
+        neg = True
+        s = s[1:-1]
+    s = re.sub(r"[^\d,.\-]", "", s)
+    if "," in s and "." in s:
+        if s.rfind(",") > s.rfind("."):
+            s = s.replace(".", "").replace(",", ".")
+        else:
+            s = s.replace(",", "")
+    elif "," in s:
+        s = s.replace(".", "").replace(",", ".")
+    try:
+        v = float(s)
+        return -v if neg else v
+    except Exception:
+        return 0.0
+
+def parse_valor_series(series: pd.Series) -> pd.Series:
+    return series.apply(parse_valor_cell)
+
+@medido("importacao_csv.ler_csv")
+def ler_csv(arquivo) -> pd.DataFrame:
+    """Lê o CSV (latin-1 ou UTF-8), limpa espaços e renomeia as colunas pelos apelidos."""
+    try:
+        df_csv = pd.read_csv(arquivo, sep=";", encoding="latin-1", dtype=str)
+    except UnicodeDecodeError:
+        if hasattr(arquivo, "seek"):
+            arquivo.seek(0)
+        df_csv = pd.read_csv(arquivo, sep=";", encoding="utf-8-sig", dtype=str)
+
+    df_csv.columns = [c.strip().lower() for c in df_csv.columns]
+    df_csv = df_csv.applymap(lambda x: x.strip() if isinstance(x, str) else x)
+
+    def pick(col_alts):
+        for c in col_alts:
+            if c in df_csv.columns:
+                return c
+        return None
+    selected = {k: pick(v) for k, v in ALIAS.items()}
+    rename_map = {v: k for k, v in selected.items() if v is not None}
+    return df_csv.rename(columns=rename_map)
+
+def faltando(df_csv: pd.DataFrame) -> list:
+    return [c for c in OBRIGATORIAS if c not in df_csv.columns]
+
+@medido("importacao_csv.preparar")
+def preparar(df_csv: pd.DataFrame) -> pd.DataFrame:
+    """Datas (dia primeiro), valores e padrões de plataforma/status; exige as colunas obrigatórias."""
+    for col in ["checkin", "checkout"]:
+        df_csv[col] = pd.to_datetime(df_csv[col], dayfirst=True, errors="coerce").dt.date
+
+    if "valor" in df_csv.columns:
+        df_csv["valor"] = parse_valor_series(df_csv["valor"])
+    else:
+        df_csv["valor"] = 0.0
+
+    if "plataforma" not in df_csv.columns:
+        df_csv["plataforma"] = "Direto"
+    else:
+        df_csv["plataforma"] = df_csv["plataforma"].fillna("Direto").astype(str)
+
+    if "status_pagamento" not in df_csv.columns:
+        df_csv["status_pagamento"] = "Pendente"
+    else:
+        df_csv["status_pagamento"] = df_csv["status_pagamento"].fillna("Pendente").astype(str)
+    return df_csv
+
+@medido("importacao_csv.importar_locacoes", linhas=lambda r: sum(r))
+def importar_locacoes(df_csv: pd.DataFrame, sobrescrever: bool = False, unidades_df: pd.DataFrame = None):
+    """Grava as locações preparadas. Retorna (inseridos, pulados); linhas sem unidade conhecida ou datas são puladas."""
+    unidades_df = get_unidades() if unidades_df is None else unidades_df
+    conn = conectar(); cur = conn.cursor()
+    if sobrescrever:
+        cur.execute("DELETE FROM locacoes")
+        conn.commit()
+
+    mapa_unidade = {_norm(n): int(i) for n, i in zip(unidades_df["nome"], unidades_df["id"])}
+    nomes = df_csv["unidade"]
+    uid = nomes.map({n: mapa_unidade.get(_norm(n)) for n in nomes.dropna().unique()})
+    ok = uid.notna() & df_csv["checkin"].notna() & df_csv["checkout"].notna()
+    df = df_csv[ok]
+    pulados = int(len(df_csv) - ok.sum())
+
+    def texto(col, padrao):
+        if col not in df.columns:
+            return pd.Series(padrao, index=df.index)
+        s = df[col].fillna("").astype(str).str.strip()
+        return s.mask(s == "", padrao) if padrao else s
+
+    # tolist() devolve int/float do Python (o sqlite3 gravaria np.int64 como BLOB)
+    linhas = list(zip(
+        uid[ok].astype(int).tolist(), df["checkin"].astype(str).tolist(), df["checkout"].astype(str).tolist(),
+        texto("hospede", "").tolist(),
+        pd.to_numeric(df["valor"], errors="coerce").fillna(0.0).astype(float).tolist() if "valor" in df.columns
+        else [0.0] * len(df),
+        texto("plataforma", "Direto").tolist(), texto("status_pagamento", "Pendente").tolist(),
+    ))
+    inseridos = repo().executar_lote(
+        "INSERT INTO locacoes (unidade_id, checkin, checkout, hospede, valor, plataforma, status_pagamento) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        linhas, conn=conn
+    )
+    conn.commit(); conn.close()
+    return inseridos, pulados
@@ -0,0 +1,244 @@
+# ingestao_locacoes.py
+# Ingestão em lote de reservas vindas dos canais (Airbnb/Booking/channel manager), usada por POST /api/locacoes/lote.
+# O lote inteiro é validado com operações vetorizadas (pandas/NumPy): unidade (id ou nome), datas, valor e
+# sobreposição com as estadias já gravadas e entre os itens do próprio lote. Os itens válidos entram com upsert
+# por `id_externo` numa única transação, sob a trava de escrita do repositório (BEGIN IMMEDIATE no SQLite,
+# sp_getapplock no SQL Server): a checagem de sobreposição e a gravação enxergam o mesmo estado, e o índice único
+# (unidade_id, id_externo) barra duplicatas que escapem disso. Cada item recebe um resultado: incluida, atualizada
+# ou rejeitada (com os erros).
+import re
+import unicodedata
+import numpy as np
+import pandas as pd
+import hospedagem_db
+from hospedagem_db import PLATAFORMAS, STATUS_PAGAMENTO
+
+TAMANHO_IN = 500          # ids por IN (...)
+MAX_NOITES = 365
+GRAVADOS = ["unidade_id", "checkin", "checkout", "hospede", "valor", "plataforma", "status_pagamento"]
+CAMPOS = ["id_externo", "unidade_id", "unidade", "checkin", "checkout", "hospede", "valor", "plataforma",
+          "status_pagamento"]
+# fuso depois do horário ("T10:00:00Z", "10:00-03:00"): sai, e vale a data como o canal escreveu
+FUSO = re.compile(r"(\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?)\s*(?:Z|UTC|GMT|[+-]\d{2}:?\d{2})$", re.IGNORECASE)
+
+
+def _chave(texto) -> str:
+    texto = unicodedata.normalize("NFKD", str(texto or "").strip().lower())
+    return "".join(c for c in texto if not unicodedata.combining(c))
+
+
+def _em_blocos(valores, tamanho: int = TAMANHO_IN):
+    valores = list(valores)
+    for i in range(0, len(valores), tamanho):
+        yield valores[i:i + tamanho]
+
+
+# ---------- VALIDAÇÃO ----------
+def _datas(serie: pd.Series) -> pd.Series:
+    """Datas sem horário e sem fuso (datetime64 ingênuo); inválidas viram NaT. Misturar datas com e sem fuso no
+    mesmo lote não pode quebrar as contas de noites e de sobreposição."""
+    serie = serie.map(lambda v: FUSO.sub(r"\1", v.strip()) if isinstance(v, str) else v)
+    datas = pd.to_datetime(serie, errors="coerce", format="mixed", utc=True)   # outros fusos: convertidos para UTC
+    return datas.dt.tz_convert(None).dt.normalize()
+
+
+def _escalar(v) -> bool:
+    """id_externo aceito: texto ou número (listas, objetos e true/false do JSON não)."""
+    return isinstance(v, (str, int, float)) and not isinstance(v, bool)
+
+
+def _normalizar(itens: list) -> pd.DataFrame:
+    df = pd.DataFrame.from_records(itens, columns=CAMPOS) if itens else pd.DataFrame(columns=CAMPOS)
+    df["indice"] = np.arange(len(df))
+    ausente = df["id_externo"].map(lambda v: v is None or (isinstance(v, float) and np.isnan(v))).astype(bool)
+    df["externo_invalido"] = ~ausente & ~df["id_externo"].map(_escalar).astype(bool)
+    df["id_externo"] = df["id_externo"].map(lambda v: str(v).strip() or None if _escalar(v) and v == v else None)
+    df["ci"] = _datas(df["checkin"])
+    df["co"] = _datas(df["checkout"])
+    booleano = df["valor"].map(lambda v: isinstance(v, bool)).astype(bool)   # true/false do JSON não é valor
+    informado = df["valor"].notna() & (df["valor"].astype(str).str.strip() != "")   # ausente/vazio vale 0
+    df["valor"] = pd.to_numeric(df["valor"], errors="coerce")
+    df["valor_invalido"] = (informado & df["valor"].isna()) | booleano
+    df["plataforma"] = df["plataforma"].fillna("Direto").astype(str).str.strip()
+    df["status_pagamento"] = df["status_pagamento"].fillna("Pendente").astype(str).str.strip()
+    df["hospede"] = df["hospede"].fillna("").astype(str).str.strip()
+    return df
+
+
+def _resolver_unidades(df: pd.DataFrame, unidades: pd.DataFrame) -> pd.Series:
+    """unidade_id informado (se existir) ou nome da unidade (sem acento/maiúsculas)."""
+    por_nome = {_chave(n): int(i) for n, i in zip(unidades["nome"], unidades["id"])}
+    ids = pd.to_numeric(df["unidade_id"], errors="coerce")
+    ids = ids.where(ids.isin(unidades["id"].astype(int)))
+    nomes = df["unidade"].dropna()
+    pelo_nome = pd.to_numeric(nomes.map(lambda n: por_nome.get(_chave(n))), errors="coerce").reindex(df.index)
+    return ids.fillna(pelo_nome).astype("Int64")
+
+
+def _sobrepoe_existentes(df: pd.DataFrame, existentes: pd.DataFrame) -> np.ndarray:
+    """Máscara dos itens que se sobrepõem a alguma estadia gravada da mesma unidade (checkout exclusivo).
+    Por unidade: estadias ordenadas por checkin e máximo acumulado dos checkouts; o item sobrepõe se, entre as
+    estadias com checkin antes do seu checkout, o maior checkout passa do seu checkin."""
+    conflito = np.zeros(len(df), dtype=bool)
+    if existentes.empty or df.empty:
+        return conflito
+    for uid, grupo in df.groupby("uid").indices.items():
+        ex = existentes[existentes["unidade_id"] == uid]
+        if ex.empty:
+            continue
+        ordem = np.argsort(ex["ci"].to_numpy())
+        cis = ex["ci"].to_numpy()[ordem]
+        max_co = np.maximum.accumulate(ex["co"].to_numpy()[ordem])
+        k = np.searchsorted(cis, df["co"].to_numpy()[grupo], "left")
+        tem = k > 0
+        conflito[grupo[tem]] = max_co[k[tem] - 1] > df["ci"].to_numpy()[grupo[tem]]
+    return conflito
+
+
+def _sobrepoe_no_lote(df: pd.DataFrame) -> np.ndarray:
+    """Itens que se sobrepõem a outro item do lote da mesma unidade (os dois são rejeitados)."""
+    if df.empty:
+        return np.zeros(0, dtype=bool)
+    ordenado = df.sort_values(["uid", "ci", "indice"])
+    uid = ordenado["uid"].to_numpy()
+    ci = ordenado["ci"].to_numpy()
+    co = ordenado["co"].to_numpy()
+    mesmo_anterior = np.r_[False, uid[1:] == uid[:-1]]
+    mesmo_proximo = np.r_[uid[:-1] == uid[1:], False]
+    # maior checkout anterior dentro da unidade
+    co_num = co.astype("datetime64[D]").astype(np.int64)
+    inicio_grupo = np.flatnonzero(~mesmo_anterior)
+    acumulado = np.empty_like(co_num)
+    for a, b in zip(inicio_grupo, np.r_[inicio_grupo[1:], len(co_num)]):
+        acumulado[a:b] = np.maximum.accumulate(co_num[a:b])
+    anterior = np.r_[np.iinfo(np.int64).min, acumulado[:-1]]
+    ci_num = ci.astype("datetime64[D]").astype(np.int64)
+    com_anterior = mesmo_anterior & (anterior > ci_num)
+    com_proximo = mesmo_proximo & (np.r_[ci_num[1:], 0] < co_num)
+    conflito = np.zeros(len(df), dtype=bool)
+    conflito[ordenado["indice"].to_numpy()] = com_anterior | com_proximo
+    return conflito
+
+
+def validar(itens: list, conn) -> pd.DataFrame:
+    """DataFrame do lote com `uid` (unidade resolvida) e `erros` (lista por item; vazia = válido)."""
+    df = _normalizar(itens)
+    erros = [[] for _ in range(len(df))]
+
+    def marcar(mascara, mensagem):
+        for i in np.flatnonzero(np.asarray(mascara, dtype=bool)):
+            erros[i].append(mensagem)
+
+    unidades = pd.read_sql("SELECT id, nome FROM unidades", conn)
+    df["uid"] = _resolver_unidades(df, unidades)
+    marcar(df["externo_invalido"], "id_externo inválido (deve ser texto ou número)")
+    marcar(df["id_externo"].isna() & ~df["externo_invalido"], "id_externo ausente")
+    repetido = df["id_externo"].notna() & df.duplicated("id_externo", keep="last")
+    marcar(repetido, "id_externo repetido no lote (vale o último)")
+    marcar(df["uid"].isna(), "unidade não encontrada")
+    marcar(df["ci"].isna(), "checkin inválido")
+    marcar(df["co"].isna(), "checkout inválido")
+    noites = (df["co"] - df["ci"]).dt.days
+    marcar(noites.notna() & (noites <= 0), "checkout deve ser depois do checkin")
+    marcar(noites > MAX_NOITES, f"estadia maior que {MAX_NOITES} noites")
+    marcar(df["valor_invalido"], "valor inválido")
+    marcar(df["valor"].notna() & (df["valor"] < 0), "valor negativo")
+    marcar(~df["plataforma"].isin(PLATAFORMAS), f"plataforma deve ser uma de {PLATAFORMAS}")
+    marcar(~df["status_pagamento"].isin(STATUS_PAGAMENTO), f"status_pagamento deve ser um de {STATUS_PAGAMENTO}")
+
+    # sobreposição: só itens com unidade e datas válidas; estadias do mesmo id_externo serão substituídas
+    ok = np.array([not e for e in erros], dtype=bool)
+    candidatos = df[ok].reset_index(drop=True)
+    if not candidatos.empty:
+        candidatos["uid"] = candidatos["uid"].astype(np.int64)
+        existentes = _estadias(conn, candidatos)
+        existentes = existentes[~existentes["id_externo"].isin(candidatos["id_externo"])]
+        conflito = _sobrepoe_existentes(candidatos, existentes)
+        no_lote = _sobrepoe_no_lote(candidatos.assign(indice=np.arange(len(candidatos))))
+        originais = candidatos["indice"].to_numpy()
+        for i in originais[conflito]:
+            erros[i].append("sobrepõe estadia existente da unidade")
+        for i in originais[no_lote]:
+            erros[i].append("sobrepõe outro item do lote na mesma unidade")
+    df["erros"] = erros
+    return df
+
+
+def _estadias(conn, candidatos: pd.DataFrame) -> pd.DataFrame:
+    """Estadias gravadas das unidades do lote que cruzam o intervalo total do lote."""
+    inicio = candidatos["ci"].min().date().isoformat()
+    fim = candidatos["co"].max().date().isoformat()
+    partes = []
+    for bloco in _em_blocos(sorted(int(u) for u in candidatos["uid"].unique())):   # int: np.int64 vira BLOB
+        partes.append(pd.read_sql(
+            f"SELECT id, unidade_id, checkin, checkout, id_externo FROM locacoes "
+            f"WHERE unidade_id IN ({', '.join('?' * len(bloco))}) AND checkin < ? AND checkout > ?",
+            conn, params=bloco + [fim, inicio]
+        ))
+    ex = pd.concat(partes, ignore_index=True)
+    ex["ci"] = _datas(ex["checkin"])
+    ex["co"] = _datas(ex["checkout"])
+    return ex.dropna(subset=["ci", "co"])
+
+
+# ---------- GRAVAÇÃO ----------
+def _ids_por_externo(conn, externos) -> dict:
+    mapa = {}
+    for bloco in _em_blocos(externos):
+        cur = conn.cursor()
+        cur.execute(f"SELECT id_externo, id FROM locacoes WHERE id_externo IN ({', '.join('?' * len(bloco))})", bloco)
+        mapa.update({e: int(i) for e, i in cur.fetchall()})
+    return mapa
+
+
+def ingerir(itens: list, campos=GRAVADOS, finalizar=None) -> dict:
+    """Valida e grava o lote numa transação. Retorna {"resumo": {...}, "itens": [resultado por item]}.
+    `campos`: colunas regravadas nas locações que já existem (as novas recebem todas).
+    `finalizar(conn)`: executada na mesma transação depois da gravação, antes do commit."""
+    posicoes = [GRAVADOS.index(c) for c in campos]
+    r = hospedagem_db.repo()
+    conn = hospedagem_db.conectar()
+    try:
+        if r.dialeto == "sqlite":
+            conn.execute("PRAGMA synchronous=NORMAL")   # seguro em WAL; evita um fsync por commit
+        r.travar(conn, "locacoes")
+        df = validar(itens, conn)
+        validos = df[df["erros"].map(len) == 0]
+        existentes = _ids_por_externo(conn, validos["id_externo"].tolist())
+        linhas = [
+            (int(v.uid), v.ci.date().isoformat(), v.co.date().isoformat(), v.hospede,
+             0.0 if pd.isna(v.valor) else float(v.valor), v.plataforma, v.status_pagamento, v.id_externo)
+            for v in validos.itertuples(index=False)
+        ]
+        atualizar = [tuple(l[i] for i in posicoes) + (existentes[l[7]],) for l in linhas if l[7] in existentes]
+        incluir = [l for l in linhas if l[7] not in existentes]
+        r.executar_lote(
+            f"UPDATE locacoes SET {', '.join(c + '=?' for c in campos)} WHERE id=?", atualizar, conn=conn
+        )
+        r.executar_lote(
+            "INSERT INTO locacoes (unidade_id, checkin, checkout, hospede, valor, plataforma, status_pagamento, "
+            "id_externo) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", incluir, conn=conn
+        )
+        novos = _ids_por_externo(conn, [l[7] for l in incluir])
+        if finalizar:
+            finalizar(conn)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    resultados = []
+    for linha in df.itertuples(index=False):
+        item = {"indice": int(linha.indice), "id_externo": linha.id_externo}
+        if linha.erros:
+            item.update(status="rejeitada", erros=linha.erros)
+        elif linha.id_externo in existentes:
+            item.update(status="atualizada", id=existentes[linha.id_externo])
+        else:
+            item.update(status="incluida", id=novos[linha.id_externo])
+        resultados.append(item)
+    resumo = {"recebidas": len(df), "incluidas": len(incluir), "atualizadas": len(atualizar),
+              "rejeitadas": int((df["erros"].map(len) > 0).sum())}
+    return {"resumo": resumo, "itens": resultados}
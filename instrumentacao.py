@@ -0,0 +1,191 @@
+# instrumentacao.py
+# Medição leve de onde o tempo vai: seções (chamadas, tempo total/máximo, linhas processadas) e contadores,
+# acumulados por processo. Desligada por padrão; liga com [instrumentacao] ativa = 1 (ou INSTRUMENTACAO_ATIVA=1)
+# ou pelo painel lateral. Desligada, uma função com @medido custa uma checagem de flag a mais e `secao(...)`
+# devolve um objeto nulo, então os pontos de medição podem ficar no código.
+#
+#   @medido("hospedagem_db.get_locacoes")      # linhas = len() do retorno
+#   def get_locacoes(): ...
+#
+#   with secao("hospedagem.importacao_csv") as s:
+#       ...
+#       s.linhas(inseridos)
+#
+# Exportação em JSON (exportar_json) e no formato texto do Prometheus (exportar_prometheus, também em /metricas
+# do main.py).
+import functools
+import json
+import threading
+import time
+from datetime import datetime
+import pandas as pd
+import config
+
+PREFIXO = "hospedaqui"
+
+_ativa = str(config.obter("instrumentacao", "ativa", "0")).lower() in ("1", "true", "sim")
+_trava = threading.Lock()
+_secoes = {}        # nome -> [chamadas, segundos, maximo, linhas]
+_contadores = {}
+
+
+def ativa() -> bool:
+    return _ativa
+
+def ativar(ligar: bool = True):
+    global _ativa
+    _ativa = bool(ligar)
+
+def zerar():
+    with _trava:
+        _secoes.clear()
+        _contadores.clear()
+
+def _registrar(nome: str, segundos: float, linhas: int):
+    with _trava:
+        s = _secoes.get(nome)
+        if s is None:
+            s = _secoes[nome] = [0, 0.0, 0.0, 0]
+        s[0] += 1
+        s[1] += segundos
+        s[2] = max(s[2], segundos)
+        s[3] += linhas
+
+def contar(nome: str, n: int = 1):
+    if _ativa:
+        with _trava:
+            _contadores[nome] = _contadores.get(nome, 0) + n
+
+# ---------- PONTOS DE MEDIÇÃO ----------
+def _linhas(resultado) -> int:
+    """Linhas de um DataFrame/Series/lista; de uma tupla, as do primeiro item."""
+    if isinstance(resultado, tuple):
+        resultado = resultado[0] if resultado else None
+    if isinstance(resultado, (pd.DataFrame, pd.Series, list)):
+        return len(resultado)
+    return 0
+
+class _Secao:
+    __slots__ = ("nome", "inicio", "n")
+
+    def __init__(self, nome: str):
+        self.nome = nome
+        self.n = 0
+
+    def linhas(self, n):
+        self.n += int(n)
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        _registrar(self.nome, time.perf_counter() - self.inicio, self.n)
+        return False
+
+class _SecaoNula:
+    __slots__ = ()
+
+    def linhas(self, n):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULA = _SecaoNula()
+
+def secao(nome: str):
+    """Gerenciador de contexto que mede o bloco (nulo com a instrumentação desligada)."""
+    return _Secao(nome) if _ativa else _NULA
+
+def medido(nome: str = None, linhas=_linhas):
+    """Decorador: mede cada chamada; `linhas(retorno)` dá as linhas processadas."""
+    def decorar(funcao):
+        rotulo = nome or f"{funcao.__module__}.{funcao.__qualname__}"
+
+        @functools.wraps(funcao)
+        def envolvida(*args, **kwargs):
+            if not _ativa:
+                return funcao(*args, **kwargs)
+            inicio = time.perf_counter()
+            n = 0
+            try:
+                resultado = funcao(*args, **kwargs)
+                n = linhas(resultado)
+                return resultado
+            finally:
+                _registrar(rotulo, time.perf_counter() - inicio, n)
+        return envolvida
+    return decorar
+
+# ---------- EXPORTAÇÃO ----------
+def relatorio() -> pd.DataFrame:
+    """Uma linha por seção, da que mais consumiu tempo para a que menos consumiu."""
+    with _trava:
+        itens = [(nome, *valores) for nome, valores in _secoes.items()]
+    df = pd.DataFrame(itens, columns=["secao", "chamadas", "total_s", "max_s", "linhas"]).astype(
+        {"chamadas": "int64", "total_s": "float64", "max_s": "float64", "linhas": "int64"}
+    )   # sem seções o quadro vazio viria como object
+    df["medio_ms"] = (df["total_s"] / df["chamadas"] * 1000).round(2)
+    df["max_ms"] = (df["max_s"] * 1000).round(2)
+    df["total_s"] = df["total_s"].round(4)
+    return (df[["secao", "chamadas", "total_s", "medio_ms", "max_ms", "linhas"]]
+            .sort_values("total_s", ascending=False, ignore_index=True))
+
+def exportar_json() -> str:
+    with _trava:
+        secoes = {
+            nome: {"chamadas": c, "segundos": round(s, 6), "max_segundos": round(m, 6), "linhas": n}
+            for nome, (c, s, m, n) in _secoes.items()
+        }
+        contadores = dict(_contadores)
+    return json.dumps({"gerado_em": datetime.now().isoformat(timespec="seconds"), "ativa": _ativa,
+                       "secoes": secoes, "contadores": contadores}, ensure_ascii=False, indent=2)
+
+def _rotulo(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def exportar_prometheus(prefixo: str = PREFIXO) -> str:
+    """Formato texto de exposição do Prometheus (contadores acumulados desde o início ou o último zerar)."""
+    with _trava:
+        secoes = {nome: list(v) for nome, v in _secoes.items()}
+        contadores = dict(_contadores)
+    metricas = [
+        ("secao_chamadas_total", "counter", "Chamadas da seção", 0),
+        ("secao_segundos_total", "counter", "Tempo acumulado na seção (s)", 1),
+        ("secao_segundos_max", "gauge", "Maior duração de uma chamada (s)", 2),
+        ("secao_linhas_total", "counter", "Linhas processadas pela seção", 3),
+    ]
+    linhas = []
+    for nome, tipo, ajuda, i in metricas:
+        linhas += [f"# HELP {prefixo}_{nome} {ajuda}", f"# TYPE {prefixo}_{nome} {tipo}"]
+        linhas += [f'{prefixo}_{nome}{{secao="{_rotulo(s)}"}} {v[i]}' for s, v in sorted(secoes.items())]
+    linhas += [f"# HELP {prefixo}_contador_total Contadores de eventos", f"# TYPE {prefixo}_contador_total counter"]
+    linhas += [f'{prefixo}_contador_total{{nome="{_rotulo(c)}"}} {v}' for c, v in sorted(contadores.items())]
+    return "\n".join(linhas) + "\n"
+
+# ---------- PAINEL ----------
+def painel_lateral():
+    """Expansor na barra lateral do Streamlit: liga/desliga, tabela por seção e downloads.
+    Chamar no fim do script, para mostrar também as medições da execução atual."""
+    if str(config.obter("instrumentacao", "painel", "1")).lower() not in ("1", "true", "sim"):
+        return
+    import streamlit as st
+    with st.sidebar.expander("⏱️ Instrumentação"):
+        ligar = st.checkbox("Medir tempos", value=_ativa, key="instrumentacao_ativa")
+        if ligar != _ativa:
+            ativar(ligar)
+            st.rerun()
+        df = relatorio()
+        if df.empty:
+            st.caption("Nada medido ainda." if _ativa else "Desligada.")
+        else:
+            st.dataframe(df, hide_index=True, use_container_width=True)
+        st.download_button("JSON", exportar_json(), "instrumentacao.json", "application/json")
+        st.download_button("Prometheus", exportar_prometheus(), "instrumentacao.prom", "text/plain")
+        if st.button("Zerar medições"):
+            zerar()
+            st.rerun()
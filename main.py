@@ -1,8 +1,22 @@
 # save this as app.py
-from flask import Flask
+from flask import Flask, Response
+import api
+import hospedagem_db
+import instrumentacao
 
 app = Flask(__name__)
+app.json.ensure_ascii = False
+app.json.sort_keys = False
+
+# garante tabelas, índices e gatilhos de versão usados pela API
+hospedagem_db.inicializar_db()
+app.register_blueprint(api.bp, url_prefix="/api")
 
 @app.route("/")
 def hello():
-    return "Hello, KKK!"
\ No newline at end of file
+    return "Hello, KKK!"
+
+# tempos por seção no formato do Prometheus (com [instrumentacao] ativa = 1)
+@app.route("/metricas")
+def metricas():
+    return Response(instrumentacao.exportar_prometheus(), mimetype="text/plain; version=0.0.4")
@@ -1,11 +1,16 @@
 import streamlit as st
 import pandas as pd
-import pyodbc
+import time
 from io import BytesIO
 import matplotlib.pyplot as plt
 import plotly.express as px
-import plotly.graph_objects as go
-from datetime import date, timedelta
+from datetime import date
+import prontidao_dados
+import cubo_prontidao
+import filtros_prontidao
+import graficos_prontidao
+import instrumentacao
+from instrumentacao import medido
 
 # Topo com logo e barra de título
 col_logo, col_titulo = st.columns([1, 6])
@@ -32,111 +37,109 @@ with col_titulo:
 # Configuração da página
 st.set_page_config(page_title="Gestão de Teste de Prontidão", layout="wide")
 
-# Conexão com SQL Server
-def conectar_sql():
-    return pyodbc.connect(
-        'DRIVER={ODBC Driver 17 for SQL Server};'
-        'SERVER=TERBRDWHDB03;'
-        'DATABASE=DWH_BRASIL;'
-        'Trusted_Connection=yes;'
-        'UID=Ternium\\10240974'
+# Carregar dados: o cache local é atualizado de forma incremental a cada TTL (ou no botão).
+# A tela só recebe contagens agregadas no banco (área x status, dia x status), com cache por
+# combinação de filtros; linhas de detalhe só quando uma célula é detalhada.
+@st.cache_data
+@medido("pred.atualizar_dados")
+def atualizar_dados(marca_ttl: int):
+    return prontidao_dados.atualizar_cache()
+
+# Tabelas de códigos por dimensão e índice de prefixos dos nomes, refeitos a cada atualização
+@st.cache_resource(max_entries=1)
+@medido("pred.carregar_opcoes")
+def carregar_opcoes(marca_ttl: int):
+    return filtros_prontidao.construir()
+
+@st.cache_data(max_entries=64)
+@medido("pred.carregar_agregados")
+def carregar_agregados(data_inicial, data_final, nome, area, teste_real, marca_ttl: int):
+    filtros = dict(nome=nome, area=area, status=list(teste_real))
+    return (
+        prontidao_dados.contagens_area_status(data_inicial, data_final, **filtros),
+        prontidao_dados.contagens_dia_status(data_inicial, data_final, **filtros),
     )
 
-# Carregar dados
-@st.cache_data
-def carregar_dados():
-    conn = conectar_sql()
-    query = """
-        SELECT *
-        FROM VFBR.REP_TESTE_PRONTIDAO_BR
-    """
-    return pd.read_sql(query, conn)
+# Cubo de contagens diárias por DES_N1..DES_N5 e status, refeito a cada atualização
+@st.cache_resource(max_entries=1)
+@medido("pred.carregar_cubo")
+def carregar_cubo(marca_ttl: int):
+    return cubo_prontidao.construir()
+
+@st.cache_data(max_entries=16)
+@medido("pred.carregar_detalhe")
+def carregar_detalhe(data_inicial, data_final, nome, area, teste_real, caminho, celula_status, marca_ttl: int):
+    return prontidao_dados.detalhe(
+        data_inicial, data_final, nome=nome, area=area, status=list(teste_real),
+        caminho=dict(caminho), celula_status=celula_status
+    )
 
 st.title("📋 Gestão de Teste de Prontidão – Empregados")
 
-df = carregar_dados()
-
-# Tratamento de colunas
-df["DT_ENTRADA"] = pd.to_datetime(df["DT_ENTRADA"], errors='coerce')
-df["TESTE_REAL"] = df["TESTE_REAL"].str.upper().str.strip()
+st.sidebar.subheader("🔄 Atualização")
+ttl_minutos = st.sidebar.number_input("Atualizar a cada (min)", min_value=1, value=prontidao_dados.TTL_MINUTOS)
+if st.sidebar.button("Atualizar agora"):
+    atualizar_dados.clear()
+    carregar_opcoes.clear()
+    carregar_agregados.clear()
+    carregar_detalhe.clear()
+    carregar_cubo.clear()
+marca_ttl = int(time.time() // (ttl_minutos * 60))
+atualizar_dados(marca_ttl)
+st.sidebar.caption(f"Última atualização: {prontidao_dados.ultima_atualizacao() or '-'}")
 
 # Filtro de período
 st.sidebar.subheader("🗓️ Filtro de Período")
-opcao_periodo = st.sidebar.selectbox(
-    "Selecione o período:",
-    ["Exercício Atual", "Exercício Anterior", "Ano Móvel", "Personalizado"]
-)
+opcao_periodo = st.sidebar.selectbox("Selecione o período:", prontidao_dados.PERIODOS)
 
 hoje = pd.to_datetime(date.today())
-ano = hoje.year
-mes = hoje.month
-
-if opcao_periodo == "Exercício Atual":
-    if mes >= 7:
-        data_inicial = pd.to_datetime(date(ano, 7, 1))
-        data_final = pd.to_datetime(date(ano + 1, 6, 30))
-    else:
-        data_inicial = pd.to_datetime(date(ano - 1, 7, 1))
-        data_final = pd.to_datetime(date(ano, 6, 30))
-elif opcao_periodo == "Exercício Anterior":
-    if mes >= 7:
-        data_inicial = pd.to_datetime(date(ano - 1, 7, 1))
-        data_final = pd.to_datetime(date(ano, 6, 30))
-    else:
-        data_inicial = pd.to_datetime(date(ano - 2, 7, 1))
-        data_final = pd.to_datetime(date(ano - 1, 6, 30))
-elif opcao_periodo == "Ano Móvel":
-    data_final = hoje
-    data_inicial = hoje - pd.DateOffset(months=12)
-else:  # Personalizado
+if opcao_periodo == "Personalizado":
     data_inicial, data_final = st.sidebar.date_input(
         "Selecione o intervalo de datas:",
         value=[hoje - pd.Timedelta(days=7), hoje]
     )
+    data_inicial, data_final = prontidao_dados.janela_periodo(opcao_periodo, hoje, data_inicial, data_final)
+else:
+    data_inicial, data_final = prontidao_dados.janela_periodo(opcao_periodo, hoje)
 
-df_dia = df[
-    (df["DT_ENTRADA"] >= pd.to_datetime(data_inicial)) &
-    (df["DT_ENTRADA"] <= pd.to_datetime(data_final))
-]
+opcoes = carregar_opcoes(marca_ttl)
 
 # Filtros adicionais
 col1, col2, col3 = st.columns(3)
 with col1:
-    nome = st.selectbox("🔍 Filtrar por Nome", ["Todos"] + sorted(df_dia["NOME"].dropna().unique().tolist()))
+    busca_nome = st.text_input("🔍 Buscar Nome", placeholder="Digite o início do nome ou sobrenome")
+    nome = st.selectbox(
+        f"Filtrar por Nome (até {filtros_prontidao.LIMITE_BUSCA})",
+        ["Todos"] + opcoes.buscar_nomes(busca_nome, data_inicial, data_final)
+    )
 with col2:
-    area = st.selectbox("🏭 Filtrar por Área (DES_N3)", ["Todos"] + sorted(df_dia["DES_N3"].dropna().unique().tolist()))
+    area = st.selectbox("🏭 Filtrar por Área (DES_N3)", ["Todos"] + opcoes.distintos("DES_N3", data_inicial, data_final))
 with col3:
+    tipos_periodo = opcoes.distintos("TESTE_REAL", data_inicial, data_final)
     teste_real = st.multiselect(
         "🧪 Filtrar por Teste Real",
-        sorted(df_dia["TESTE_REAL"].dropna().unique().tolist()),
-        default=sorted(df_dia["TESTE_REAL"].dropna().unique().tolist())
+        tipos_periodo,
+        default=tipos_periodo
     )
 
-if nome != "Todos":
-    df_dia = df_dia[df_dia["NOME"] == nome]
-if area != "Todos":
-    df_dia = df_dia[df_dia["DES_N3"] == area]
-if teste_real:
-    df_dia = df_dia[df_dia["TESTE_REAL"].isin(teste_real)]
+area_status, dia_status = carregar_agregados(data_inicial, data_final, nome, area, tuple(teste_real), marca_ttl)
 
 # Segmentação
-fizeram = df_dia[df_dia["TESTE_REAL"] == "TESTE NO HORÁRIO"]
-faltaram = df_dia[df_dia["TESTE_REAL"] == "NÃO REALIZOU"]
-tardio = df_dia[df_dia["TESTE_REAL"] == "TESTE TARDIO"]
+por_status = area_status.groupby("TESTE_REAL")["QTD"].sum().sort_values(ascending=False)
 
 # Métricas
 col1, col2, col3 = st.columns(3)
 with col1:
-    st.metric("✅ Testes Realizados", len(fizeram))
+    st.metric("✅ Testes Realizados", int(por_status.get("TESTE NO HORÁRIO", 0)))
 with col2:
-    st.metric("⚠️ Sem Teste Realizado", len(faltaram))
+    st.metric("⚠️ Sem Teste Realizado", int(por_status.get("NÃO REALIZOU", 0)))
 with col3:
-    st.metric("⚠️ Teste Tardio", len(tardio))
+    st.metric("⚠️ Teste Tardio", int(por_status.get("TESTE TARDIO", 0)))
 
 # Cards por tipo de teste
 st.subheader("📦 Resumo por Tipo de Teste")
-tipos_teste = df_dia["TESTE_REAL"].value_counts().to_dict()
-colunas = st.columns(len(tipos_teste))
+tipos_teste = por_status.to_dict()
+colunas = st.columns(len(tipos_teste)) if tipos_teste else []
 for i, (tipo, qtd) in enumerate(tipos_teste.items()):
     with colunas[i]:
         st.markdown(
@@ -163,131 +166,95 @@ for i, (tipo, qtd) in enumerate(tipos_teste.items()):
 mostrar_heatmap = st.checkbox("Exibir Mapa de Calor", value=True)
 if mostrar_heatmap:
     st.subheader("📊 Mapa de Calor: Área x Tipo de Teste Realizado")
-    heatmap_data = df_dia.pivot_table(
-        index="DES_N3",
-        columns="TESTE_REAL",
-        values="MATRICULA",
-        aggfunc="count",
-        fill_value=0
-    )
+    if nome == "Todos":
+        # Navegação na hierarquia pelo cubo: escolher um valor desce um nível (drill-down), "Todos" sobe (roll-up)
+        cubo = carregar_cubo(marca_ttl)
+        niveis = cubo_prontidao.NIVEIS
+        caminho = []
+        for k, col_nav in enumerate(st.columns(len(niveis))):
+            filhos = cubo.filhos(tuple(caminho))
+            if not filhos:
+                break
+            with col_nav:
+                escolha = st.selectbox(niveis[k], ["Todos"] + filhos, key=f"hierarquia_{niveis[k]}")
+            if escolha == "Todos":
+                break
+            caminho.append(escolha)
+        if len(caminho) == len(niveis):
+            caminho.pop()
+        abaixo = niveis[len(caminho):]
+        nivel_mapa = st.selectbox(
+            "Nível do mapa", abaixo, index=abaixo.index("DES_N3") if "DES_N3" in abaixo else 0
+        )
+        heatmap_data = cubo.mapa_calor(
+            caminho, data_inicial, data_final, nivel=nivel_mapa, status=teste_real, filtro=("DES_N3", area)
+        )
+    else:
+        nivel_mapa = "DES_N3"
+        caminho = []
+        heatmap_data = area_status.dropna(subset=["DES_N3", "TESTE_REAL"]).pivot_table(
+            index="DES_N3",
+            columns="TESTE_REAL",
+            values="QTD",
+            aggfunc="sum",
+            fill_value=0
+        )
     fig_heatmap = px.imshow(
         heatmap_data,
-        labels=dict(x="Tipo de Teste", y="Área (DES_N3)", color="Quantidade"),
+        labels=dict(x="Tipo de Teste", y=f"Área ({nivel_mapa})", color="Quantidade"),
         color_continuous_scale="YlGnBu",
         aspect="auto",
         title="Mapa de Calor: Área x Tipo de Teste Realizado"
     )
     st.plotly_chart(fig_heatmap, use_container_width=True)
 
+    # Detalhe de uma célula do mapa: só aqui as linhas individuais são lidas
+    with st.expander("🔎 Detalhar célula"):
+        col_a, col_s = st.columns(2)
+        with col_a:
+            celula_area = st.selectbox("Área", heatmap_data.index.tolist(), key="detalhe_area")
+        with col_s:
+            celula_status = st.selectbox("Tipo de Teste", heatmap_data.columns.tolist(), key="detalhe_status")
+        if celula_area is not None and celula_status is not None and st.button("Mostrar empregados"):
+            # nó da hierarquia + valor da célula no nível do mapa ("(sem valor)" vira IS NULL)
+            filtro_caminho = tuple(
+                (coluna, None if valor == cubo_prontidao.SEM_VALOR else valor)
+                for coluna, valor in zip(cubo_prontidao.NIVEIS[:len(caminho)] + [nivel_mapa], caminho + [celula_area])
+            )
+            st.dataframe(carregar_detalhe(
+                data_inicial, data_final, nome, area, tuple(teste_real), filtro_caminho, celula_status, marca_ttl
+            ))
+
 # Checkbox para exibir o gráfico evolutivo
 mostrar_evolucao = st.checkbox("Exibir Gráfico Evolutivo", value=True)
 if mostrar_evolucao:
     st.subheader("📈 Evolução Diária dos Testes e Aderência")
-    df_evolucao = df_dia.copy()
-    df_evolucao["Data"] = df_evolucao["DT_ENTRADA"].dt.date
-
-    # Agrupa por data e status
-    evolucao = df_evolucao.groupby(["Data", "TESTE_REAL"])["MATRICULA"].count().reset_index()
-    pivot = evolucao.pivot(index="Data", columns="TESTE_REAL", values="MATRICULA").fillna(0)
-
-    # Calcula aderência (% de TESTE NO HORÁRIO sobre o total do dia)
-    pivot["Total"] = pivot.sum(axis=1)
-    if "TESTE NO HORÁRIO" in pivot.columns:
-        pivot["Aderência (%)"] = (pivot["TESTE NO HORÁRIO"] / pivot["Total"] * 100).round(1)
+    janela = st.radio("Janela da média móvel (dias)", cubo_prontidao.JANELAS, horizontal=True)
+    if nome == "Todos":
+        # fatia do cubo pré-calculado
+        diario = carregar_cubo(marca_ttl).serie(data_inicial, data_final, "DES_N3", area, teste_real)
     else:
-        pivot["Aderência (%)"] = 0
-    # Calcula a média móvel de 7 dias da aderência
-    pivot["Aderência Móvel (%)"] = pivot["Aderência (%)"].rolling(7, min_periods=1).mean().round(1)
-
-    # Paleta Ternium (ajuste conforme necessário)
-    ternium_colors = {
-        "TESTE NO HORÁRIO": "#FF6600",   # Laranja Ternium
-        "NÃO REALIZOU": "#666666",       # Cinza escuro
-        "TESTE TARDIO": "#009640",       # Verde Ternium
-        "OUTROS": "#000000"              # Preto (para outros status)
-    }
-
-    fig = go.Figure()
-
-    # Barras empilhadas para todos os status (exceto Total e Aderência)
-    for status in pivot.columns:
-        if status not in ["Total", "Aderência (%)", "Aderência Móvel (%)"]:
-            if status == "TESTE NO HORÁRIO":
-                color = "#FF6600"  # Laranja Ternium
-            elif status == "NÃO REALIZOU":
-                color = "#666666"  # Cinza Ternium
-            elif status == "TESTE TARDIO":
-                color = "#FFD100"  # Amarelo Ternium
-            else:
-                color = "#BBBBBB"  # Cinza claro para outros
-            fig.add_trace(go.Bar(
-                x=pivot.index,
-                y=pivot[status],
-                name=status,
-                marker_color=color,
-                yaxis="y1"
-            ))
-
-    # Linha de aderência (%)
-    fig.add_trace(go.Scatter(
-        x=pivot.index,
-        y=pivot["Aderência (%)"],
-        mode="lines+markers",
-        name="Aderência (%)",
-        yaxis="y2",
-        line=dict(color="#005288", dash="dash")  # Azul institucional para aderência
-    ))
-
-    # Linha da média móvel da aderência
-    fig.add_trace(go.Scatter(
-        x=pivot.index,
-        y=pivot["Aderência Móvel (%)"],
-        mode="lines",
-        name="Média Móvel (7d) Aderência",
-        yaxis="y2",
-        line=dict(color="#FF6600", width=4, dash="dot")  # Laranja Ternium, linha pontilhada
-    ))
-
-
-    # Barras empilhadas para todos os status (exceto Total e Aderência)
-    for status in pivot.columns:
-        if status not in ["Total", "Aderência (%)", "Aderência Móvel (%)"]:
-            if status == "TESTE NO HORÁRIO":
-                color = "#FF6600"  # Laranja Ternium
-            elif status == "NÃO REALIZOU":
-                color = "#666666"  # Cinza Ternium
-            elif status == "TESTE TARDIO":
-                color = "#FFD100"  # Amarelo Ternium
-            else:
-                color = "#BBBBBB"  # Cinza claro para outros
-            fig.add_trace(go.Bar(
-                x=pivot.index,
-                y=pivot[status],
-                name=status,
-                marker_color=color,
-                yaxis="y1"
-            ))
-
-    # Linha de aderência (%)
-    fig.add_trace(go.Scatter(
-        x=pivot.index,
-        y=pivot["Aderência (%)"],
-        mode="lines+markers",
-        name="Aderência (%)",
-        yaxis="y2",
-        line=dict(color="#005288", dash="dash")  # Azul institucional para aderência
-    ))
-
-    # Layout com barras empilhadas e dois eixos y
-    fig.update_layout(
-        barmode="stack",
-        title="Evolução Diária: Status dos Testes (Barras Empilhadas) e Aderência (%)",
-        xaxis_title="Data",
-        yaxis=dict(title="Quantidade", side="left"),
-        yaxis2=dict(title="Aderência (%)", overlaying="y", side="right", range=[0, 100]),
-        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
-    )
-
+        # o cubo não tem a dimensão nome: usa as contagens por dia e status já agrupadas no banco
+        evolucao = dia_status.dropna(subset=["TESTE_REAL"])
+        diario = evolucao.pivot(index="Data", columns="TESTE_REAL", values="QTD").fillna(0)
+        diario.index = pd.to_datetime(diario.index)
+        diario = diario.reindex(pd.date_range(data_inicial.date(), data_final.date()), fill_value=0)
+
+    # Aderência (% de TESTE NO HORÁRIO sobre o total do dia) e aderência móvel da janela (dias corridos);
+    # períodos longos são agrupados por semana/mês no gráfico
+    pivot = cubo_prontidao.indicadores(diario, [janela])
+    fig = graficos_prontidao.figura_evolucao(pivot, janela)
     st.plotly_chart(fig, use_container_width=True)
 
+# Ranking de aderência por nível da hierarquia, direto do cubo
+mostrar_ranking = st.checkbox("Exibir Ranking de Aderência", value=False)
+if mostrar_ranking:
+    st.subheader("🏆 Ranking de Aderência por Área")
+    nivel_ranking = st.selectbox("Nível", cubo_prontidao.NIVEIS, index=2)
+    st.dataframe(carregar_cubo(marca_ttl).ranking(
+        nivel_ranking, data_inicial, data_final, status=teste_real, filtro=("DES_N3", area)
+    ))
+    if nome != "Todos":
+        st.caption("O ranking considera todos os empregados (o filtro por nome não se aplica).")
 
+instrumentacao.painel_lateral()
@@ -0,0 +1,272 @@
+# prontidao_dados.py
+# Carga da view de prontidão para o pred.py com cache local incremental:
+# a view é espelhada numa tabela SQLite local e cada atualização só busca as linhas com
+# DT_ENTRADA a partir da marca d'água (maior DT_ENTRADA já em cache) menos uma janela de atraso,
+# que é apagada e rebuscada para pegar linhas que chegaram atrasadas na origem.
+#
+# [prontidao]
+# cache = prontidao_cache.db         ; arquivo SQLite local
+# janela_atraso_dias = 3
+# ttl_minutos = 60
+# origem_sqlite =                    ; opcional: arquivo SQLite que substitui o SQL Server (testes locais),
+#                                    ; com a tabela REP_TESTE_PRONTIDAO_BR
+import sqlite3
+from datetime import date, datetime, timedelta
+import pandas as pd
+import config
+import conexao_sql
+
+VIEW = "VFBR.REP_TESTE_PRONTIDAO_BR"
+CAMINHO_CACHE = config.obter("prontidao", "cache", "prontidao_cache.db")
+JANELA_ATRASO_DIAS = config.obter_int("prontidao", "janela_atraso_dias", 3)
+TTL_MINUTOS = config.obter_int("prontidao", "ttl_minutos", 60)
+TAMANHO_LOTE = 5000
+COLUNAS = ["MATRICULA", "NOME", "DES_N1", "DES_N2", "DES_N3", "DES_N4", "DES_N5", "DT_ENTRADA", "TESTE_REAL"]
+PERIODOS = ["Exercício Atual", "Exercício Anterior", "Ano Móvel", "Personalizado"]
+
+# Conexão com SQL Server (pool compartilhado, ver conexao_sql.py)
+def conectar_sql():
+    origem_sqlite = config.obter("prontidao", "origem_sqlite")
+    if origem_sqlite:
+        # substituto local da view: o arquivo é anexado como o schema VFBR
+        conn = sqlite3.connect(":memory:")
+        conn.execute("ATTACH DATABASE ? AS VFBR", (origem_sqlite,))
+        return conn
+    return conexao_sql.obter_fabrica("dwh").conectar()
+
+# ---------- CACHE LOCAL ----------
+def conectar_cache(caminho: str = None):
+    return sqlite3.connect(caminho or CAMINHO_CACHE, check_same_thread=False)
+
+def _texto_data(v):
+    if v is None:
+        return None
+    if isinstance(v, str):
+        return v
+    return pd.Timestamp(v).strftime("%Y-%m-%d %H:%M:%S")
+
+def _criar_tabela_cache(cache, colunas):
+    defs = ", ".join(f'"{c}"' for c in colunas)
+    cache.execute(f"CREATE TABLE IF NOT EXISTS prontidao ({defs})")
+    cache.execute('CREATE INDEX IF NOT EXISTS idx_prontidao_dt ON prontidao("DT_ENTRADA")')
+    cache.execute("CREATE TABLE IF NOT EXISTS controle (chave TEXT PRIMARY KEY, valor TEXT)")
+
+def marca_dagua(cache):
+    existe = cache.execute("SELECT 1 FROM sqlite_master WHERE name = 'prontidao'").fetchone()
+    if not existe:
+        return None
+    valor = cache.execute('SELECT MAX("DT_ENTRADA") FROM prontidao').fetchone()[0]
+    return pd.Timestamp(valor).to_pydatetime() if valor else None
+
+def atualizar_cache(conectar_origem=conectar_sql, caminho_cache: str = None,
+                    janela_dias: int = None, view: str = VIEW) -> dict:
+    """Busca na origem só o que é novo (ou está dentro da janela de atraso) e mescla no cache."""
+    janela_dias = JANELA_ATRASO_DIAS if janela_dias is None else janela_dias
+    cache = conectar_cache(caminho_cache)
+    origem = conectar_origem()
+    try:
+        marca = marca_dagua(cache)
+        cur = origem.cursor()
+        colunas = COLUNAS
+        lista = ", ".join(colunas)
+        if marca is None:
+            corte = None
+            cur.execute(f"SELECT {lista} FROM {view}")
+        else:
+            corte = marca - timedelta(days=janela_dias)
+            cur.execute(f"SELECT {lista} FROM {view} WHERE DT_ENTRADA >= ?", (corte,))
+        i_dt = colunas.index("DT_ENTRADA")
+        i_st = colunas.index("TESTE_REAL")
+
+        with cache:
+            _criar_tabela_cache(cache, colunas)
+            if corte is not None:
+                cache.execute('DELETE FROM prontidao WHERE "DT_ENTRADA" >= ?', (_texto_data(corte),))
+            nomes = ", ".join(f'"{c}"' for c in colunas)
+            marcadores = ", ".join("?" * len(colunas))
+            n = 0
+            while True:
+                linhas = cur.fetchmany(TAMANHO_LOTE)
+                if not linhas:
+                    break
+                lote = []
+                for linha in linhas:
+                    linha = list(linha)
+                    linha[i_dt] = _texto_data(linha[i_dt])
+                    if linha[i_st] is not None:
+                        # normalizado já na carga para os GROUP BY baterem com o filtro da tela
+                        linha[i_st] = linha[i_st].upper().strip()
+                    lote.append(linha)
+                cache.executemany(f"INSERT INTO prontidao ({nomes}) VALUES ({marcadores})", lote)
+                n += len(lote)
+            cache.execute(
+                "INSERT OR REPLACE INTO controle (chave, valor) VALUES ('ultima_atualizacao', ?)",
+                (datetime.now().isoformat(timespec="seconds"),)
+            )
+        cur.close()
+        return {"linhas": n, "desde": corte, "completa": corte is None}
+    finally:
+        origem.close()
+        cache.close()
+
+def ultima_atualizacao(caminho_cache: str = None):
+    cache = conectar_cache(caminho_cache)
+    try:
+        linha = cache.execute("SELECT valor FROM controle WHERE chave = 'ultima_atualizacao'").fetchone()
+        return linha[0] if linha else None
+    except sqlite3.OperationalError:
+        return None
+    finally:
+        cache.close()
+
+def tratar_colunas(df: pd.DataFrame) -> pd.DataFrame:
+    df["DT_ENTRADA"] = pd.to_datetime(df["DT_ENTRADA"], errors='coerce')
+    df["TESTE_REAL"] = df["TESTE_REAL"].str.upper().str.strip()
+    return df
+
+def ler_cache(caminho_cache: str = None) -> pd.DataFrame:
+    cache = conectar_cache(caminho_cache)
+    try:
+        return tratar_colunas(pd.read_sql(f"SELECT {', '.join(COLUNAS)} FROM prontidao", cache))
+    finally:
+        cache.close()
+
+# ---------- PERÍODO ----------
+def janela_periodo(opcao: str, hoje=None, inicio=None, fim=None):
+    """(início, fim) do período: exercício de julho a junho, ano móvel ou intervalo personalizado.
+    O fim inclui o dia inteiro."""
+    hoje = pd.Timestamp(hoje or date.today()).normalize()
+    ano_ex = hoje.year if hoje.month >= 7 else hoje.year - 1   # ano em que o exercício atual começou
+    if opcao == "Exercício Atual":
+        inicio, fim = date(ano_ex, 7, 1), date(ano_ex + 1, 6, 30)
+    elif opcao == "Exercício Anterior":
+        inicio, fim = date(ano_ex - 1, 7, 1), date(ano_ex, 6, 30)
+    elif opcao == "Ano Móvel":
+        inicio, fim = hoje - pd.DateOffset(months=12), hoje
+    inicio = pd.Timestamp(inicio).normalize()
+    fim = pd.Timestamp(fim).normalize() + pd.Timedelta(days=1) - pd.Timedelta(seconds=1)
+    return inicio.to_pydatetime(), fim.to_pydatetime()
+
+def ler_periodo(inicio, fim, caminho_cache: str = None) -> pd.DataFrame:
+    """Só as linhas e colunas do período, filtradas no banco pelo índice de DT_ENTRADA."""
+    cache = conectar_cache(caminho_cache)
+    try:
+        df = pd.read_sql(
+            f'SELECT {", ".join(COLUNAS)} FROM prontidao WHERE "DT_ENTRADA" BETWEEN ? AND ?',
+            cache, params=[_texto_data(inicio), _texto_data(fim)]
+        )
+        return tratar_colunas(df)
+    finally:
+        cache.close()
+
+# ---------- AGREGAÇÕES ----------
+# O mapa de calor e a evolução diária pedem só as contagens (GROUP BY no banco);
+# as linhas de detalhe vêm apenas quando o usuário detalha uma célula.
+def _coluna(nome: str) -> str:
+    if nome not in COLUNAS:
+        raise ValueError(f"Coluna desconhecida: {nome}")
+    return f'"{nome}"'
+
+def _filtros(inicio, fim, nome=None, area=None, status=None):
+    """WHERE dos filtros da tela: período, nome, área (DES_N3) e tipos de teste."""
+    where = '"DT_ENTRADA" BETWEEN ? AND ?'
+    params = [_texto_data(inicio), _texto_data(fim)]
+    if nome and nome != "Todos":
+        where += ' AND "NOME" = ?'
+        params.append(nome)
+    if area and area != "Todos":
+        where += ' AND "DES_N3" = ?'
+        params.append(area)
+    if status:
+        where += f' AND "TESTE_REAL" IN ({", ".join("?" * len(status))})'
+        params.extend(status)
+    return where, params
+
+def _consultar(sql: str, params, caminho_cache: str = None) -> pd.DataFrame:
+    cache = conectar_cache(caminho_cache)
+    try:
+        return pd.read_sql(sql, cache, params=params)
+    finally:
+        cache.close()
+
+def contagens_area_status(inicio, fim, nome=None, area=None, status=None, nivel="DES_N3",
+                          caminho_cache: str = None) -> pd.DataFrame:
+    """Quantidade por valor de `nivel` (DES_N1..DES_N5) e TESTE_REAL."""
+    where, params = _filtros(inicio, fim, nome, area, status)
+    return _consultar(f"""
+        SELECT {_coluna(nivel)}, "TESTE_REAL", COUNT(*) AS QTD
+        FROM prontidao WHERE {where}
+        GROUP BY {_coluna(nivel)}, "TESTE_REAL"
+    """, params, caminho_cache)
+
+def contagens_dia_status(inicio, fim, nome=None, area=None, status=None, caminho_cache: str = None) -> pd.DataFrame:
+    """Quantidade por dia de DT_ENTRADA e TESTE_REAL."""
+    where, params = _filtros(inicio, fim, nome, area, status)
+    df = _consultar(f"""
+        SELECT substr("DT_ENTRADA", 1, 10) AS "Data", "TESTE_REAL", COUNT(*) AS QTD
+        FROM prontidao WHERE {where}
+        GROUP BY substr("DT_ENTRADA", 1, 10), "TESTE_REAL"
+    """, params, caminho_cache)
+    df["Data"] = pd.to_datetime(df["Data"]).dt.date
+    return df
+
+def dias_valores(coluna: str, caminho_cache: str = None) -> pd.DataFrame:
+    """Pares distintos (dia, valor) da coluna em todo o cache (base do filtros_prontidao)."""
+    return _consultar(
+        f'SELECT DISTINCT substr("DT_ENTRADA", 1, 10) AS dia, {_coluna(coluna)} AS valor FROM prontidao '
+        f'WHERE "DT_ENTRADA" IS NOT NULL AND {_coluna(coluna)} IS NOT NULL',
+        [], caminho_cache
+    )
+
+def detalhe(inicio, fim, nome=None, area=None, status=None, nivel="DES_N3",
+            celula_area=None, celula_status=None, dia=None, limite: int = 5000,
+            caminho: dict = None, caminho_cache: str = None) -> pd.DataFrame:
+    """Linhas de uma célula do mapa de calor (área x status) ou de um dia da evolução.
+    caminho: {"DES_N1": valor, ...} do nó da hierarquia (None = sem valor); celula_area é o valor em `nivel`."""
+    where, params = _filtros(inicio, fim, nome, area, status)
+    for coluna, valor in (caminho or {}).items():
+        if valor is None:
+            where += f" AND {_coluna(coluna)} IS NULL"
+        else:
+            where += f" AND {_coluna(coluna)} = ?"
+            params.append(valor)
+    if celula_area is not None:
+        where += f" AND {_coluna(nivel)} = ?"
+        params.append(celula_area)
+    if celula_status is not None:
+        where += ' AND "TESTE_REAL" = ?'
+        params.append(celula_status)
+    if dia is not None:
+        where += ' AND substr("DT_ENTRADA", 1, 10) = ?'
+        params.append(pd.Timestamp(dia).date().isoformat())
+    df = _consultar(
+        f'SELECT {", ".join(COLUNAS)} FROM prontidao WHERE {where} ORDER BY "DT_ENTRADA" LIMIT {int(limite)}',
+        params, caminho_cache
+    )
+    return tratar_colunas(df)
+
+def contagens_hierarquia(caminho_cache: str = None) -> pd.DataFrame:
+    """Quantidade por caminho DES_N1..DES_N5, dia e TESTE_REAL em todo o cache (base do cubo_prontidao)."""
+    niveis = ", ".join(_coluna(f"DES_N{i}") for i in range(1, 6))
+    df = _consultar(f"""
+        SELECT {niveis}, substr("DT_ENTRADA", 1, 10) AS "Data", "TESTE_REAL", COUNT(*) AS QTD
+        FROM prontidao
+        WHERE "DT_ENTRADA" IS NOT NULL AND "TESTE_REAL" IS NOT NULL
+        GROUP BY {niveis}, substr("DT_ENTRADA", 1, 10), "TESTE_REAL"
+    """, [], caminho_cache)
+    df["Data"] = pd.to_datetime(df["Data"])
+    return df
+
+def lotes_periodo(inicio, fim, nome=None, area=None, status=None, tamanho_lote: int = 50000,
+                  caminho_cache: str = None):
+    """Linhas do período com os filtros da tela, em DataFrames de até `tamanho_lote` linhas (memória limitada)."""
+    where, params = _filtros(inicio, fim, nome, area, status)
+    cache = conectar_cache(caminho_cache)
+    try:
+        for lote in pd.read_sql(
+            f'SELECT {", ".join(COLUNAS)} FROM prontidao WHERE {where} ORDER BY "DT_ENTRADA"',
+            cache, params=params, chunksize=tamanho_lote
+        ):
+            yield tratar_colunas(lote)
+    finally:
+        cache.close()
@@ -0,0 +1,335 @@
+# repositorio.py
+# Camada de acesso ao banco. O app conversa com um Repositorio, escolhido pela configuração:
+#
+#   [hospedagem]                     [hospedagem]
+#   backend = sqlite                 backend = sqlserver
+#   caminho = hospedagem.db          odbc = DRIVER={ODBC Driver 17 for SQL Server};SERVER=...;DATABASE=...
+#                                    pool = 5
+#
+# (ou HOSPEDAGEM_BACKEND / HOSPEDAGEM_CAMINHO / HOSPEDAGEM_ODBC no ambiente; idem [financeiro]).
+# Os dois backends usam parâmetros `?` (qmark); o que muda entre eles fica nos métodos de dialeto.
+import queue
+import re
+import sqlite3
+import threading
+import pandas as pd
+import config
+from instrumentacao import medido
+
+
+class Repositorio:
+    dialeto = None
+
+    def conectar(self):
+        raise NotImplementedError
+
+    # ---------- OPERAÇÕES ----------
+    @medido("repositorio.ler")
+    def ler(self, sql: str, params=()) -> pd.DataFrame:
+        conn = self.conectar()
+        try:
+            return pd.read_sql(sql, conn, params=list(params))
+        finally:
+            conn.close()
+
+    def executar(self, sql: str, params=()):
+        conn = self.conectar()
+        try:
+            cur = conn.cursor()
+            cur.execute(sql, tuple(params))
+            conn.commit()
+            return cur.rowcount
+        finally:
+            conn.close()
+
+    def executar_lote(self, sql: str, linhas, tamanho_lote: int = 1000, conn=None) -> int:
+        """executemany em lotes, numa única transação."""
+        proprio = conn is None
+        if proprio:
+            conn = self.conectar()
+        try:
+            cur = self._cursor_lote(conn)
+            total = 0
+            lote = []
+            for linha in linhas:
+                lote.append(tuple(linha))
+                if len(lote) >= tamanho_lote:
+                    cur.executemany(sql, lote)
+                    total += len(lote)
+                    lote = []
+            if lote:
+                cur.executemany(sql, lote)
+                total += len(lote)
+            if proprio:
+                conn.commit()
+            return total
+        except Exception:
+            if proprio:
+                conn.rollback()
+            raise
+        finally:
+            if proprio:
+                conn.close()
+
+    def _cursor_lote(self, conn):
+        return conn.cursor()
+
+    # ---------- DIALETO ----------
+    def criar_tabela(self, conn, nome: str, colunas: str):
+        raise NotImplementedError
+
+    def criar_indice(self, conn, nome: str, tabela: str, colunas: str, unico: bool = False, onde: str = None):
+        """`unico`: índice UNIQUE; `onde`: condição de índice parcial (ex.: "coluna IS NOT NULL")."""
+        raise NotImplementedError
+
+    def travar(self, conn, recurso: str):
+        """Trava de escrita exclusiva para `recurso` até o fim da transação de `conn` (checagem e gravação que
+        precisam enxergar o mesmo estado, como a ingestão em lote)."""
+        raise NotImplementedError
+
+    def adicionar_coluna(self, conn, tabela: str, coluna: str, tipo: str):
+        """ALTER TABLE ... ADD, se a coluna ainda não existir."""
+        raise NotImplementedError
+
+    def agora(self) -> str:
+        """Expressão SQL do instante atual (UTC) como texto ordenável 'AAAA-MM-DD HH:MM:SS.fff'."""
+        raise NotImplementedError
+
+    def ano(self, col: str) -> str:
+        raise NotImplementedError
+
+    def mes(self, col: str) -> str:
+        raise NotImplementedError
+
+    def data(self, col: str) -> str:
+        raise NotImplementedError
+
+    def mais_dias(self, col: str, dias: int) -> str:
+        raise NotImplementedError
+
+    def dias_entre(self, inicio: str, fim: str) -> str:
+        raise NotImplementedError
+
+    def cte_recursiva(self) -> str:
+        raise NotImplementedError
+
+    def sufixo_recursao(self) -> str:
+        return ""
+
+    def limitar(self, sql: str, n: int) -> str:
+        raise NotImplementedError
+
+
+# ---------- SQLITE ----------
+class RepositorioSQLite(Repositorio):
+    dialeto = "sqlite"
+
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+
+    def conectar(self):
+        return sqlite3.connect(self.caminho, check_same_thread=False)
+
+    def criar_tabela(self, conn, nome, colunas):
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {nome} ({colunas})")
+
+    def criar_indice(self, conn, nome, tabela, colunas, unico=False, onde=None):
+        conn.execute(
+            f"CREATE {'UNIQUE ' if unico else ''}INDEX IF NOT EXISTS {nome} ON {tabela}({colunas})"
+            + (f" WHERE {onde}" if onde else "")
+        )
+
+    def travar(self, conn, recurso):
+        # um único gravador por banco: BEGIN IMMEDIATE já pega a trava de escrita de tudo
+        conn.execute("BEGIN IMMEDIATE")
+
+    def adicionar_coluna(self, conn, tabela, coluna, tipo):
+        if coluna not in [c[1] for c in conn.execute(f"PRAGMA table_info({tabela})")]:
+            conn.execute(f"ALTER TABLE {tabela} ADD COLUMN {coluna} {tipo}")
+
+    def agora(self):
+        return "strftime('%Y-%m-%d %H:%M:%f', 'now')"
+
+    def ano(self, col):
+        return f"CAST(strftime('%Y', {col}) AS INTEGER)"
+
+    def mes(self, col):
+        return f"CAST(strftime('%m', {col}) AS INTEGER)"
+
+    def data(self, col):
+        return f"date({col})"
+
+    def mais_dias(self, col, dias):
+        return f"date({col}, '{dias:+d} day')"
+
+    def dias_entre(self, inicio, fim):
+        return f"(julianday({fim}) - julianday({inicio}))"
+
+    def cte_recursiva(self):
+        return "WITH RECURSIVE"
+
+    def limitar(self, sql, n):
+        return f"{sql} LIMIT {int(n)}"
+
+
+# ---------- SERVIDOR (SQL Server via pyodbc) ----------
+class ConexaoDoPool:
+    """Embrulha a conexão do pool: close() devolve ao pool em vez de fechar."""
+
+    def __init__(self, conn, pool):
+        self._conn = conn
+        self._pool = pool
+
+    def __getattr__(self, nome):
+        return getattr(self._conn, nome)
+
+    def close(self):
+        if self._conn is not None:
+            self._pool.devolver(self._conn)
+            self._conn = None
+
+
+class PoolConexoes:
+    def __init__(self, fabrica, tamanho: int = 5, embrulho=ConexaoDoPool, espera: float = 30):
+        self.fabrica = fabrica
+        self.tamanho = tamanho
+        self.embrulho = embrulho
+        self.espera = espera    # segundos aguardando uma conexão livre com o pool cheio
+        self._livres = queue.LifoQueue()
+        self._criadas = 0
+        self._trava = threading.Lock()
+
+    def obter(self):
+        try:
+            conn = self._livres.get_nowait()
+        except queue.Empty:
+            with self._trava:
+                criar = self._criadas < self.tamanho
+                if criar:
+                    self._criadas += 1
+            if criar:
+                try:
+                    conn = self.fabrica()
+                except BaseException:
+                    # conexão não abriu: a vaga volta a ficar disponível
+                    with self._trava:
+                        self._criadas -= 1
+                    raise
+            else:
+                try:
+                    conn = self._livres.get(timeout=self.espera)
+                except queue.Empty:
+                    raise TimeoutError(
+                        f"pool de conexões esgotado: {self.tamanho} em uso após {self.espera}s de espera"
+                    ) from None
+        return self.embrulho(conn, self)
+
+    def devolver(self, conn):
+        try:
+            conn.rollback()
+        except Exception:
+            # conexão quebrada: descarta e libera a vaga para uma nova
+            with self._trava:
+                self._criadas -= 1
+            return
+        self._livres.put(conn)
+
+
+ESPERA_TRAVA = 30      # segundos aguardando a trava de escrita de outra transação
+
+TIPOS_SERVIDOR = [
+    (r"INTEGER PRIMARY KEY AUTOINCREMENT", "INT IDENTITY(1,1) PRIMARY KEY"),
+    (r"\bINTEGER\b", "INT"),
+    (r"\bTEXT\b", "NVARCHAR(400)"),
+    (r"\bREAL\b", "FLOAT"),
+]
+
+class RepositorioServidor(Repositorio):
+    dialeto = "sqlserver"
+
+    def __init__(self, conn_str: str, tamanho_pool: int = 5):
+        import pyodbc
+        self.pool = PoolConexoes(lambda: pyodbc.connect(conn_str, autocommit=False), tamanho_pool)
+
+    def conectar(self):
+        return self.pool.obter()
+
+    def _cursor_lote(self, conn):
+        cur = conn.cursor()
+        cur.fast_executemany = True
+        return cur
+
+    def criar_tabela(self, conn, nome, colunas):
+        for padrao, troca in TIPOS_SERVIDOR:
+            colunas = re.sub(padrao, troca, colunas)
+        conn.execute(f"IF OBJECT_ID(N'{nome}', N'U') IS NULL CREATE TABLE {nome} ({colunas})")
+
+    def criar_indice(self, conn, nome, tabela, colunas, unico=False, onde=None):
+        conn.execute(
+            f"IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = N'{nome}') "
+            f"CREATE {'UNIQUE ' if unico else ''}INDEX {nome} ON {tabela}({colunas})"
+            + (f" WHERE {onde}" if onde else "")
+        )
+
+    def travar(self, conn, recurso):
+        # sp_getapplock com dono = transação: liberada no commit/rollback, serializa quem pede o mesmo recurso
+        cur = conn.cursor()
+        cur.execute(
+            "SET NOCOUNT ON; DECLARE @r INT; "
+            "EXEC @r = sp_getapplock @Resource = ?, @LockMode = 'Exclusive', @LockOwner = 'Transaction', "
+            "@LockTimeout = ?; SELECT @r",
+            (f"hospedaqui.{recurso}", int(ESPERA_TRAVA * 1000))
+        )
+        if cur.fetchone()[0] < 0:
+            raise TimeoutError(f"trava '{recurso}' não obtida em {ESPERA_TRAVA}s")
+
+    def adicionar_coluna(self, conn, tabela, coluna, tipo):
+        for padrao, troca in TIPOS_SERVIDOR:
+            tipo = re.sub(padrao, troca, tipo)
+        conn.execute(f"IF COL_LENGTH(N'{tabela}', N'{coluna}') IS NULL ALTER TABLE {tabela} ADD {coluna} {tipo}")
+
+    def agora(self):
+        return "CONVERT(NVARCHAR(23), SYSUTCDATETIME(), 121)"
+
+    def ano(self, col):
+        return f"YEAR({col})"
+
+    def mes(self, col):
+        return f"MONTH({col})"
+
+    def data(self, col):
+        return f"CAST({col} AS DATE)"
+
+    def mais_dias(self, col, dias):
+        return f"DATEADD(day, {int(dias)}, CAST({col} AS DATE))"
+
+    def dias_entre(self, inicio, fim):
+        return f"DATEDIFF(day, {inicio}, {fim})"
+
+    def cte_recursiva(self):
+        return "WITH"
+
+    def sufixo_recursao(self):
+        return " OPTION (MAXRECURSION 0)"
+
+    def limitar(self, sql, n):
+        return re.sub(r"^\s*SELECT\b", f"SELECT TOP {int(n)}", sql, count=1, flags=re.IGNORECASE)
+
+
+# ---------- SELEÇÃO PELA CONFIGURAÇÃO ----------
+_repositorios = {}
+_trava = threading.Lock()
+
+def criar_repositorio(nome: str) -> Repositorio:
+    backend = config.obter(nome, "backend", "sqlite")
+    if backend == "sqlite":
+        return RepositorioSQLite(config.obter(nome, "caminho", f"{nome}.db"))
+    if backend == "sqlserver":
+        return RepositorioServidor(config.obter(nome, "odbc"), config.obter_int(nome, "pool", 5))
+    raise ValueError(f"Backend desconhecido para [{nome}]: {backend}")
+
+def obter_repositorio(nome: str = "hospedagem") -> Repositorio:
+    with _trava:
+        if nome not in _repositorios:
+            _repositorios[nome] = criar_repositorio(nome)
+        return _repositorios[nome]
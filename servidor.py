@@ -0,0 +1,132 @@
+# servidor.py
+# Modo de produção da API (app Flask do main.py): servidor Tornado assíncrono na frente do WSGI. As conexões
+# ficam no loop de eventos; as requisições rodam num pool limitado de threads (é ali que o SQLite é acessado),
+# com uma fila de espera também limitada. Com trabalhadores + fila ocupados, a resposta é 503 com Retry-After na
+# hora, em vez de acumular conexões e latência. Respostas em streaming (NDJSON da api.py) são repassadas pedaço a
+# pedaço, esperando o cliente consumir (controle de fluxo do socket).
+#
+#   python servidor.py                                   # seção [api] da configuração
+#   python servidor.py --porta 8080 --trabalhadores 16 --fila 128
+import argparse
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from tornado import httputil
+from tornado.httpserver import HTTPServer
+from tornado.ioloop import IOLoop
+from tornado.wsgi import WSGIContainer
+import config
+
+PORTA = config.obter_int("api", "porta", 8000)
+TRABALHADORES = config.obter_int("api", "trabalhadores", 8)
+FILA = config.obter_int("api", "fila", 64)
+
+OCUPADO = b'{"erro":"servidor ocupado, tente novamente"}'
+
+
+class ContainerLimitado(WSGIContainer):
+    """WSGIContainer com pool de `trabalhadores` threads e no máximo `fila` requisições esperando."""
+
+    def __init__(self, app, trabalhadores: int = TRABALHADORES, fila: int = FILA):
+        super().__init__(app, executor=ThreadPoolExecutor(trabalhadores, thread_name_prefix="api"))
+        self.capacidade = trabalhadores + fila
+        self.em_andamento = 0     # só mexido no loop de eventos: sem trava
+        self.recusadas = 0
+
+    async def handle_request(self, request):
+        if self.em_andamento >= self.capacidade:
+            self.recusadas += 1
+            self._recusar(request)
+            return
+        self.em_andamento += 1
+        try:
+            await self._atender(request)
+        finally:
+            self.em_andamento -= 1
+
+    def _recusar(self, request):
+        cabecalhos = httputil.HTTPHeaders({
+            "Content-Type": "application/json", "Content-Length": str(len(OCUPADO)), "Retry-After": "1",
+        })
+        request.connection.write_headers(
+            httputil.ResponseStartLine("HTTP/1.1", 503, "Service Unavailable"), cabecalhos, chunk=OCUPADO
+        )
+        request.connection.finish()
+        self._log(503, request)
+
+    async def _atender(self, request):
+        dados = {}
+
+        def start_response(status, headers, exc_info=None):
+            dados["status"] = status
+            dados["headers"] = headers
+            return lambda corpo: None   # write() legado do WSGI: o Flask não usa
+
+        def chamar():
+            """Roda o app no trabalhador; resposta com Content-Length já sai inteira daqui (uma ida ao pool)."""
+            resposta = self.wsgi_application(self.environ(request), start_response)
+            if any(chave.lower() == "content-length" for chave, _ in dados["headers"]):
+                try:
+                    return b"".join(resposta), None
+                finally:
+                    if hasattr(resposta, "close"):
+                        resposta.close()
+            return None, resposta
+
+        loop = IOLoop.current()
+        corpo, resposta = await loop.run_in_executor(self.executor, chamar)
+        codigo, motivo = dados["status"].split(" ", 1)
+        cabecalhos = httputil.HTTPHeaders()
+        for chave, valor in dados["headers"]:
+            cabecalhos.add(chave, valor)
+        inicio = httputil.ResponseStartLine("HTTP/1.1", int(codigo), motivo)
+        if resposta is None:
+            request.connection.write_headers(inicio, cabecalhos, chunk=corpo)
+        else:
+            # streaming: sem Content-Length o Tornado usa Transfer-Encoding: chunked
+            pedacos = iter(resposta)
+
+            def proximo():
+                try:
+                    return next(pedacos)
+                except StopIteration:
+                    return None
+
+            try:
+                request.connection.write_headers(inicio, cabecalhos)
+                while True:
+                    pedaco = await loop.run_in_executor(self.executor, proximo)
+                    if pedaco is None:
+                        break
+                    if pedaco:
+                        await request.connection.write(pedaco)
+            finally:
+                if hasattr(resposta, "close"):
+                    resposta.close()
+        request.connection.finish()
+        self._log(int(codigo), request)
+
+
+def criar_servidor(app=None, trabalhadores: int = TRABALHADORES, fila: int = FILA):
+    """(HTTPServer, container) prontos para `listen`."""
+    if app is None:
+        from main import app
+    container = ContainerLimitado(app, trabalhadores, fila)
+    return HTTPServer(container, xheaders=True), container
+
+
+async def servir(porta: int = PORTA, trabalhadores: int = TRABALHADORES, fila: int = FILA):
+    servidor, _ = criar_servidor(trabalhadores=trabalhadores, fila=fila)
+    servidor.listen(porta)
+    logging.info("API em http://0.0.0.0:%d (%d trabalhadores, fila %d)", porta, trabalhadores, fila)
+    await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Serve a API (main.py) com Tornado, pool limitado e backpressure.")
+    ap.add_argument("--porta", type=int, default=PORTA)
+    ap.add_argument("--trabalhadores", type=int, default=TRABALHADORES)
+    ap.add_argument("--fila", type=int, default=FILA)
+    args = ap.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    asyncio.run(servir(args.porta, args.trabalhadores, args.fila))
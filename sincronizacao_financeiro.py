@@ -0,0 +1,206 @@
+# sincronizacao_financeiro.py
+# Projeta as locações (receitas) e despesas do hospedagem.db nas transações do Financlex, de forma incremental:
+# lê só as linhas com `versao` depois da última marca e as exclusões novas (ver hospedagem_db.py), e grava em
+# lotes com upsert por (origem, origem_id). Cada lote atualiza transações, razão e marca na mesma
+# transação do financeiro, então repetir ou retomar uma sincronização interrompida não duplica lançamentos.
+#
+#   python sincronizacao_financeiro.py              # só o que mudou
+#   python sincronizacao_financeiro.py --completa   # reprojeta tudo e remove órfãos
+import argparse
+import pandas as pd
+import hospedagem_db
+import financeiro_db
+
+TAMANHO_LOTE = 500   # ids por IN (...): abaixo do limite de parâmetros do SQLite antigo e do SQL Server
+
+# Consulta de cada origem no hospedagem.db e como a linha vira transação
+ORIGENS = {
+    "locacoes": """
+        SELECT t.id, t.checkin AS data, t.valor, t.plataforma, t.hospede, u.nome AS unidade, t.versao
+        FROM locacoes t LEFT JOIN unidades u ON u.id = t.unidade_id
+    """,
+    "despesas": """
+        SELECT t.id, t.data, t.valor, t.tipo, t.descricao, u.nome AS unidade, t.versao
+        FROM despesas t LEFT JOIN unidades u ON u.id = t.unidade_id
+    """,
+}
+
+def _texto(*partes) -> str:
+    return " - ".join(str(p) for p in partes if p is not None and not pd.isna(p) and str(p).strip())
+
+def projetar(tabela: str, linha) -> tuple:
+    """(data, tipo, categoria, valor, descricao) da transação correspondente a uma linha de origem."""
+    valor = float(linha.valor) if pd.notna(linha.valor) else 0.0
+    if tabela == "locacoes":
+        return (financeiro_db.data_sql(linha.data), "Receita", "Hospedagem", valor,
+                _texto(f"Locação {linha.id}", linha.unidade, linha.hospede, linha.plataforma))
+    return (financeiro_db.data_sql(linha.data), "Despesa", linha.tipo or "Outros", valor,
+            _texto(f"Despesa {linha.id}", linha.unidade, linha.descricao))
+
+# ---------- MARCAS ----------
+def ler_marca(chave: str, conn=None):
+    sql, params = "SELECT valor FROM sincronizacao WHERE chave = ?", [chave]
+    df = financeiro_db.repo().ler(sql, params) if conn is None else pd.read_sql(sql, conn, params=params)
+    return None if df.empty else df["valor"].iloc[0]
+
+def _gravar_marca(cur, chave: str, valor):
+    cur.execute("UPDATE sincronizacao SET valor = ? WHERE chave = ?", (str(valor), chave))
+    if cur.rowcount == 0:
+        cur.execute("INSERT INTO sincronizacao (chave, valor) VALUES (?, ?)", (chave, str(valor)))
+
+# ---------- GRAVAÇÃO ----------
+def _existentes(conn, origem: str, ids) -> pd.DataFrame:
+    ids = [int(i) for i in ids]
+    return pd.read_sql(
+        f"SELECT id, origem_id, data, tipo, categoria, valor FROM transacoes "
+        f"WHERE origem = ? AND origem_id IN ({', '.join('?' * len(ids))})",
+        conn, params=[origem] + ids
+    )
+
+def _retirar(conn, origem: str, ids) -> int:
+    """Apaga as transações dessas origens, retirando-as da razão. Retorna quantas existiam."""
+    antigas = _existentes(conn, origem, ids)
+    if antigas.empty:
+        return 0
+    financeiro_db.aplicar_razao(conn, antigas[["data", "tipo", "categoria", "valor"]].itertuples(index=False), -1)
+    financeiro_db.repo().executar_lote(
+        "DELETE FROM transacoes WHERE id = ?", ((int(i),) for i in antigas["id"]), conn=conn
+    )
+    return len(antigas)
+
+def _upsert(conn, origem: str, lote: pd.DataFrame) -> dict:
+    r = financeiro_db.repo()
+    antigas = _existentes(conn, origem, lote["id"])
+    por_origem = dict(zip(antigas["origem_id"].astype(int), antigas["id"].astype(int)))
+    novas, alteradas, inclusoes = [], [], []
+    for linha in lote.itertuples(index=False):
+        projetada = projetar(origem, linha)
+        novas.append(projetada[:4])
+        if int(linha.id) in por_origem:
+            alteradas.append(projetada + (por_origem[int(linha.id)],))
+        else:
+            inclusoes.append(projetada + (origem, int(linha.id)))
+    financeiro_db.aplicar_razao(conn, antigas[["data", "tipo", "categoria", "valor"]].itertuples(index=False), -1)
+    r.executar_lote(
+        "UPDATE transacoes SET data = ?, tipo = ?, categoria = ?, valor = ?, descricao = ? WHERE id = ?",
+        alteradas, conn=conn
+    )
+    r.executar_lote(
+        "INSERT INTO transacoes (data, tipo, categoria, valor, descricao, origem, origem_id) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        inclusoes, conn=conn
+    )
+    financeiro_db.aplicar_razao(conn, novas, 1)
+    return {"incluidas": len(inclusoes), "alteradas": len(alteradas)}
+
+# ---------- SINCRONIZAÇÃO ----------
+def _marca_versao(marca):
+    """(versao, id) de uma marca "versao|id"; None sem marca ou com a marca antiga "atualizado_em|id" (a primeira
+    sincronização depois da troca reprojeta tudo, o que o upsert torna seguro)."""
+    if marca is None:
+        return None
+    versao, ultimo_id = marca.rsplit("|", 1)
+    return (int(versao), int(ultimo_id)) if versao.isdigit() else None
+
+def sincronizar_tabela(tabela: str, tamanho_lote: int = TAMANHO_LOTE) -> dict:
+    """Upsert das linhas alteradas depois da marca (versao, id), em lotes nessa ordem.
+    A `versao` vem do contador da tabela em `versoes`, que os gatilhos incrementam dentro da transação de quem
+    grava: a linha do contador fica travada até o commit (no SQL Server também), então as versões são confirmadas
+    em ordem e nenhuma linha confirmada depois da leitura fica abaixo da marca. Um carimbo de horário não garante
+    isso: no SQL Server uma transação longa confirma depois de outra com carimbo anterior ao dela."""
+    hosp = hospedagem_db.repo()
+    apos = _marca_versao(ler_marca(tabela))
+    totais = {"incluidas": 0, "alteradas": 0}
+    while True:
+        if apos is None:
+            filtro, params = "", []
+        else:
+            filtro = " WHERE (t.versao > ? OR (t.versao = ? AND t.id > ?))"
+            params = [apos[0], apos[0], apos[1]]
+        sql = ORIGENS[tabela] + filtro + " ORDER BY t.versao, t.id"
+        lote = hosp.ler(hosp.limitar(sql, tamanho_lote), params)
+        if lote.empty:
+            break
+        conn = financeiro_db.conectar()
+        try:
+            for k, v in _upsert(conn, tabela, lote).items():
+                totais[k] += v
+            ultima = lote.iloc[-1]
+            _gravar_marca(conn.cursor(), tabela, f"{int(ultima['versao'])}|{int(ultima['id'])}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+        apos = (int(ultima["versao"]), int(ultima["id"]))
+        if len(lote) < tamanho_lote:
+            break
+    return totais
+
+def sincronizar_exclusoes(tamanho_lote: int = TAMANHO_LOTE) -> int:
+    """Remove as transações cujas origens foram excluídas (tabela `exclusoes`, após a marca de cada origem).
+    A marca é por tabela: o gatilho de exclusão incrementa o contador da tabela antes de inserir em `exclusoes`,
+    então o `seq` só sai em ordem de commit entre exclusões da mesma tabela."""
+    return sum(_sincronizar_exclusoes(t, tamanho_lote) for t in ORIGENS)
+
+def _sincronizar_exclusoes(tabela: str, tamanho_lote: int) -> int:
+    hosp = hospedagem_db.repo()
+    chave = f"exclusoes:{tabela}"
+    seq = int(ler_marca(chave) or ler_marca("exclusoes") or 0)    # "exclusoes": marca única de versões anteriores
+    removidas = 0
+    while True:
+        lote = hosp.ler(hosp.limitar(
+            "SELECT seq, registro_id FROM exclusoes WHERE tabela = ? AND seq > ? ORDER BY seq", tamanho_lote
+        ), [tabela, seq])
+        if lote.empty:
+            break
+        conn = financeiro_db.conectar()
+        try:
+            removidas += _retirar(conn, tabela, lote["registro_id"].unique())
+            seq = int(lote["seq"].iloc[-1])
+            _gravar_marca(conn.cursor(), chave, seq)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+        if len(lote) < tamanho_lote:
+            break
+    return removidas
+
+def remover_orfas(tabela: str, tamanho_lote: int = TAMANHO_LOTE) -> int:
+    """Transações de origem que não existe mais no hospedagem.db (ex.: exclusões anteriores ao rastreio)."""
+    ids_origem = set(hospedagem_db.repo().ler(f"SELECT id FROM {tabela}")["id"].astype(int))
+    projetadas = financeiro_db.repo().ler("SELECT origem_id FROM transacoes WHERE origem = ?", [tabela])
+    orfas = sorted(set(projetadas["origem_id"].astype(int)) - ids_origem)
+    removidas = 0
+    for i in range(0, len(orfas), tamanho_lote):
+        conn = financeiro_db.conectar()
+        try:
+            removidas += _retirar(conn, tabela, orfas[i:i + tamanho_lote])
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+    return removidas
+
+def sincronizar(completa: bool = False, tamanho_lote: int = TAMANHO_LOTE) -> dict:
+    hospedagem_db.inicializar_db()
+    financeiro_db.inicializar_db()
+    if completa:
+        financeiro_db.repo().executar("DELETE FROM sincronizacao")
+    resultado = {t: sincronizar_tabela(t, tamanho_lote) for t in ORIGENS}
+    resultado["removidas"] = sincronizar_exclusoes(tamanho_lote)
+    if completa:
+        resultado["removidas"] += sum(remover_orfas(t, tamanho_lote) for t in ORIGENS)
+    return resultado
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Sincroniza locações e despesas do hospedagem.db com o Financlex.")
+    ap.add_argument("--completa", action="store_true", help="ignora as marcas e reprojeta tudo")
+    args = ap.parse_args()
+    print(sincronizar(args.completa))
@@ -0,0 +1,23 @@
+# tests/conftest.py
+# Os módulos do app ficam na raiz do repositório; os testes não leem o config.ini local.
+import os
+import sys
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+os.environ["HOSPEDAQUI_CONFIG"] = os.path.join(RAIZ, "tests", "sem_config.ini")
+
+
+@pytest.fixture
+def banco_hospedagem(tmp_path, monkeypatch):
+    """hospedagem.db vazio (com as tabelas) num diretório temporário; devolve o repositório."""
+    import hospedagem_db
+    import repositorio
+    monkeypatch.setenv("HOSPEDAGEM_BACKEND", "sqlite")
+    monkeypatch.setenv("HOSPEDAGEM_CAMINHO", str(tmp_path / "hospedagem.db"))
+    monkeypatch.chdir(tmp_path)
+    repositorio._repositorios.pop("hospedagem", None)
+    hospedagem_db.inicializar_db()
+    yield hospedagem_db.repo()
+    repositorio._repositorios.pop("hospedagem", None)
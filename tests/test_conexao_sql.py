@@ -0,0 +1,116 @@
+# tests/test_conexao_sql.py
+# Fábrica e pool de conexões do conexao_sql.py com um driver DB-API falso (sem SQL Server).
+import threading
+import pytest
+from tenacity import wait_none
+import conexao_sql
+
+
+class ErroDriver(Exception):
+    pass
+
+class ErroOperacional(ErroDriver):
+    pass
+
+
+class CursorFalso:
+    def __init__(self):
+        self.arraysize = 1
+        self.fast_executemany = False   # como no pyodbc
+        self.fechado = False
+
+    def close(self):
+        self.fechado = True
+
+
+class ConexaoFalsa:
+    def __init__(self):
+        self.rollbacks = 0
+
+    def cursor(self):
+        return CursorFalso()
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+class DriverFalso:
+    """connect() falha nas `falhas` primeiras chamadas (OperationalError) e depois devolve conexões."""
+    Error = ErroDriver
+    OperationalError = ErroOperacional
+
+    def __init__(self, falhas: int = 0):
+        self.falhas = falhas
+        self.chamadas = 0
+
+    def connect(self, conn_str, autocommit=False):
+        self.chamadas += 1
+        if self.falhas:
+            self.falhas -= 1
+            raise ErroOperacional("servidor indisponível")
+        return ConexaoFalsa()
+
+
+@pytest.fixture(autouse=True)
+def sem_espera(monkeypatch):
+    monkeypatch.setattr(conexao_sql, "wait_exponential", lambda **_: wait_none())
+
+def fabrica(driver, **opcoes):
+    return conexao_sql.FabricaConexoes("DSN=falso", driver=driver, **opcoes)
+
+
+def test_retentativa_ate_conectar():
+    driver = DriverFalso(falhas=2)
+    conn = fabrica(driver, tentativas=3).conectar()
+    assert driver.chamadas == 3
+    assert isinstance(conn, conexao_sql.ConexaoDWH)
+
+def test_falha_depois_das_retentativas_propaga_o_erro():
+    driver = DriverFalso(falhas=10)
+    with pytest.raises(ErroOperacional):
+        fabrica(driver, tentativas=3).conectar()
+    assert driver.chamadas == 3
+
+def test_falha_ao_conectar_nao_ocupa_vaga_do_pool():
+    driver = DriverFalso(falhas=5)
+    f = fabrica(driver, tamanho_pool=2, tentativas=1, espera_pool=0.1)
+    for _ in range(5):          # mais falhas que vagas: nenhuma fica presa
+        with pytest.raises(ErroOperacional):
+            f.conectar()
+    assert f.pool._criadas == 0
+    a, b = f.conectar(), f.conectar()   # banco de volta: as duas vagas abrem
+    assert f.pool._criadas == 2
+    a.close(); b.close()
+
+def test_pool_esgotado_falha_por_tempo_em_vez_de_travar():
+    f = fabrica(DriverFalso(), tamanho_pool=1, espera_pool=0.1)
+    conn = f.conectar()
+    with pytest.raises(TimeoutError):
+        f.conectar()
+    conn.close()
+    assert f.conectar()._conn is not None
+
+def test_conexao_devolvida_e_reaproveitada():
+    driver = DriverFalso()
+    f = fabrica(driver, tamanho_pool=1, espera_pool=1)
+    conn = f.conectar()
+    bruta = conn._conn
+    conn.close()
+    conn.close()                # segundo close não devolve duas vezes
+    assert bruta.rollbacks == 1
+    assert f.conectar()._conn is bruta
+    assert driver.chamadas == 1
+
+def test_espera_conexao_liberada_por_outra_thread():
+    f = fabrica(DriverFalso(), tamanho_pool=1, espera_pool=5)
+    conn = f.conectar()
+    threading.Timer(0.05, conn.close).start()
+    assert f.conectar()._conn is not None
+
+def test_cursor_configurado_e_fechado():
+    f = fabrica(DriverFalso(), arraysize=777)
+    with f.cursor() as cur:
+        assert cur.arraysize == 777
+        assert cur.fast_executemany is True
+    assert cur.fechado
+    assert f.pool._livres.qsize() == 1
@@ -0,0 +1,52 @@
+# tests/test_graficos_prontidao.py
+# O gráfico de evolução do pred.py: um trace por status (não um por dia) e agrupamento por semana ou mês em
+# períodos longos, o que mantém o JSON enviado ao navegador pequeno mesmo com anos de dados diários.
+import numpy as np
+import pandas as pd
+import pytest
+import cubo_prontidao
+import graficos_prontidao
+
+STATUS = ["NÃO REALIZOU", "TESTE NO HORÁRIO", "TESTE TARDIO"]
+JANELA = 30
+LIMITE_JSON = 40_000     # três anos dia a dia passam de 100 mil caracteres
+
+
+@pytest.fixture(scope="module")
+def tres_anos():
+    dias = pd.date_range("2022-01-01", "2024-12-31", freq="D")
+    rng = np.random.default_rng(0)
+    diario = pd.DataFrame(rng.integers(0, 50, (len(dias), len(STATUS))), index=dias, columns=STATUS)
+    diario.iloc[100:110] = 0      # dias sem testes no meio do período
+    return diario
+
+def _figura(diario, dias):
+    pivot = cubo_prontidao.indicadores(diario.iloc[-dias:], [JANELA])
+    return pivot, graficos_prontidao.figura_evolucao(pivot, JANELA)
+
+@pytest.mark.parametrize("dias, frequencia, pontos", [(1096, "MS", 36), (365, "W-MON", 53), (90, "D", 90)])
+def test_um_trace_por_status_e_agrupamento(tres_anos, dias, frequencia, pontos):
+    assert graficos_prontidao.escolher_frequencia(dias) == frequencia
+    _, fig = _figura(tres_anos, dias)
+    barras = [t for t in fig.data if t.type == "bar"]
+    assert [t.name for t in barras] == STATUS
+    assert len(fig.data) == len(STATUS) + 2        # + aderência e aderência móvel
+    assert all(len(t.x) == pontos for t in fig.data)
+    assert len(fig.to_json()) < LIMITE_JSON
+
+def test_agrupamento_mensal_soma_os_dias(tres_anos):
+    pivot, fig = _figura(tres_anos, 1096)
+    mensal = pivot[STATUS].resample("MS").sum()
+    for trace in fig.data[:len(STATUS)]:
+        assert list(trace.y) == mensal[trace.name].tolist()
+    aderencia = (mensal["TESTE NO HORÁRIO"] / mensal.sum(axis=1) * 100).round(1)
+    np.testing.assert_allclose(fig.data[len(STATUS)].y, aderencia.to_numpy())
+    assert fig.data[0].x[0] == pd.Timestamp("2022-01-01").date()
+
+def test_diario_em_tres_anos_estoura_o_limite(tres_anos):
+    """Referência do ganho: a mesma figura sem agrupar."""
+    pivot = cubo_prontidao.indicadores(tres_anos, [JANELA])
+    fig = graficos_prontidao.figura_evolucao(pivot, JANELA, frequencia="D")
+    assert len(fig.data) == len(STATUS) + 2
+    assert len(fig.data[0].x) == len(tres_anos) - 10          # os dias sem testes saem
+    assert len(fig.to_json()) > LIMITE_JSON
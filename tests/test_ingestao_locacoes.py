@@ -0,0 +1,81 @@
+# tests/test_ingestao_locacoes.py
+# POST /api/locacoes/lote (ingestao_locacoes.py): datas com e sem fuso no mesmo lote, id_externo que não é texto
+# nem número e o índice único (unidade_id, id_externo).
+import sqlite3
+import pytest
+from flask import Flask
+import api
+
+
+@pytest.fixture
+def banco(banco_hospedagem):
+    r = banco_hospedagem
+    r.executar_lote("INSERT INTO unidades (nome) VALUES (?)", [("Apto Sol",), ("Casa Mar",)])
+    r.executar(
+        "INSERT INTO locacoes (unidade_id, checkin, checkout, hospede, valor, plataforma, status_pagamento) "
+        "VALUES (1, '2030-03-10', '2030-03-15', 'Gravada', 500, 'Direto', 'Pago')"
+    )
+    return r
+
+@pytest.fixture
+def cliente(banco):
+    app = Flask(__name__)
+    app.register_blueprint(api.bp, url_prefix="/api")
+    return app.test_client()
+
+def _item(id_externo, checkin, checkout, unidade_id=1, **extra):
+    return {"id_externo": id_externo, "unidade_id": unidade_id, "checkin": checkin, "checkout": checkout,
+            "valor": 100, **extra}
+
+def _erros(resposta):
+    return {i["id_externo"] or i["indice"]: i.get("erros", []) for i in resposta.get_json()["itens"]}
+
+
+def test_lote_com_e_sem_fuso(cliente, banco):
+    itens = [
+        _item("a", "2030-01-01T10:00:00Z", "2030-01-03"),                 # fuso no checkin, checkout sem
+        _item("b", "2030-01-05", "2030-01-07T11:00:00+02:00"),
+        _item("c", "2030-01-08T23:30:00-03:00", "2030-01-09 10:00:00"),   # data como o canal escreveu
+        _item("d", "2030-01-10T12:00:00.000z", "2030-01-12T12:00:00.000Z", unidade_id=2),
+    ]
+    r = cliente.post("/api/locacoes/lote", json=itens)
+    assert r.status_code == 200
+    assert r.get_json()["resumo"]["incluidas"] == 4
+    gravadas = banco.ler("SELECT id_externo, checkin, checkout FROM locacoes WHERE id_externo IS NOT NULL "
+                         "ORDER BY id_externo")
+    assert gravadas.values.tolist() == [
+        ["a", "2030-01-01", "2030-01-03"], ["b", "2030-01-05", "2030-01-07"],
+        ["c", "2030-01-08", "2030-01-09"], ["d", "2030-01-10", "2030-01-12"],
+    ]
+
+def test_fuso_nao_escapa_da_sobreposicao(cliente):
+    itens = [
+        _item("x", "2030-03-12T15:00:00Z", "2030-03-14T11:00:00Z"),          # dentro da estadia gravada
+        _item("y", "2030-03-15T15:00:00+01:00", "2030-03-16"),               # começa no checkout: pode
+        _item("z", "2030-03-16T00:00:00Z", "2030-03-18T00:00:00Z"),          # sobrepõe y no lote? não
+        _item("w", "2030-03-17", "2030-03-19T10:00:00-03:00"),               # sobrepõe z
+    ]
+    r = cliente.post("/api/locacoes/lote", json=itens)
+    assert r.status_code == 200
+    erros = _erros(r)
+    assert erros["x"] == ["sobrepõe estadia existente da unidade"]
+    assert erros["y"] == []
+    assert erros["z"] == erros["w"] == ["sobrepõe outro item do lote na mesma unidade"]
+
+@pytest.mark.parametrize("id_externo", [["x"], {"a": 1}, True])
+def test_id_externo_nao_escalar_e_rejeitado(cliente, banco, id_externo):
+    r = cliente.post("/api/locacoes/lote", json=[_item(id_externo, "2030-05-01", "2030-05-03"),
+                                                  _item(7, "2030-05-04", "2030-05-05")])
+    assert r.status_code == 200
+    itens = r.get_json()["itens"]
+    assert itens[0]["status"] == "rejeitada"
+    assert itens[0]["erros"] == ["id_externo inválido (deve ser texto ou número)"]
+    assert itens[1]["status"] == "incluida" and itens[1]["id_externo"] == "7"
+    assert banco.ler("SELECT id_externo FROM locacoes WHERE id_externo IS NOT NULL")["id_externo"].tolist() == ["7"]
+
+def test_indice_unico_por_unidade(cliente, banco):
+    assert cliente.post("/api/locacoes/lote", json=[_item("k", "2030-06-01", "2030-06-03")]).status_code == 200
+    with pytest.raises(sqlite3.IntegrityError):
+        banco.executar("INSERT INTO locacoes (unidade_id, id_externo) VALUES (1, 'k')")
+    banco.executar("INSERT INTO locacoes (unidade_id, id_externo) VALUES (2, 'k')")     # outra unidade
+    banco.executar_lote("INSERT INTO locacoes (unidade_id) VALUES (?)", [(1,), (1,)])     # sem id_externo
@@ -0,0 +1,99 @@
+# tests/test_prontidao_dados.py
+# Cache incremental da prontidão (prontidao_dados.atualizar_cache) contra o substituto SQLite da view
+# ([prontidao] origem_sqlite): marca d'água, janela de atraso e recarga sem duplicar nem perder linhas.
+import sqlite3
+from datetime import datetime, timedelta
+import pandas as pd
+import pytest
+import prontidao_dados
+
+COLUNAS = prontidao_dados.COLUNAS
+INICIO = datetime(2024, 1, 1, 8)
+STATUS = ["teste no horário ", "Teste Tardio", "NÃO REALIZOU"]
+
+
+def _linha(i: int, quando: datetime):
+    return (f"M{i:05d}", f"Pessoa {i % 40}", "BR", f"Usina {i % 3}", f"Área {i % 5}", None, f"Turno {i % 2}",
+            quando.strftime("%Y-%m-%d %H:%M:%S"), STATUS[i % 3])
+
+
+@pytest.fixture
+def origem(tmp_path, monkeypatch):
+    """Arquivo com a tabela REP_TESTE_PRONTIDAO_BR (60 dias, 4 linhas por dia); conectar_sql passa a usá-lo."""
+    caminho = tmp_path / "origem.db"
+    conn = sqlite3.connect(caminho)
+    conn.execute(f"CREATE TABLE REP_TESTE_PRONTIDAO_BR ({', '.join(COLUNAS)})")
+    conn.commit()
+    monkeypatch.setenv("PRONTIDAO_ORIGEM_SQLITE", str(caminho))
+    proximo = [0]
+
+    def inserir(datas):
+        linhas = []
+        for quando in datas:
+            linhas.append(_linha(proximo[0], quando))
+            proximo[0] += 1
+        conn.executemany(f"INSERT INTO REP_TESTE_PRONTIDAO_BR VALUES ({', '.join('?' * len(COLUNAS))})", linhas)
+        conn.commit()
+
+    inserir([INICIO + timedelta(days=d, hours=h) for d in range(60) for h in (0, 2, 5, 9)])
+    yield inserir, conn
+    conn.close()
+
+def _origem(conn) -> pd.DataFrame:
+    df = pd.read_sql(f"SELECT {', '.join(COLUNAS)} FROM REP_TESTE_PRONTIDAO_BR", conn)
+    return _ordenado(prontidao_dados.tratar_colunas(df))
+
+def _ordenado(df: pd.DataFrame) -> pd.DataFrame:
+    return df.sort_values(["DT_ENTRADA", "MATRICULA"], ignore_index=True)
+
+def _cache(caminho) -> pd.DataFrame:
+    return _ordenado(prontidao_dados.ler_cache(str(caminho)))
+
+
+def test_recargas_incrementais_sem_duplicar_nem_perder(origem, tmp_path):
+    inserir, conn = origem
+    cache = tmp_path / "cache.db"
+    ultima = INICIO + timedelta(days=59, hours=9)
+
+    r = prontidao_dados.atualizar_cache(caminho_cache=str(cache), janela_dias=3)
+    assert r == {"linhas": 240, "desde": None, "completa": True}
+    pd.testing.assert_frame_equal(_cache(cache), _origem(conn))
+    assert prontidao_dados.marca_dagua(sqlite3.connect(cache)) == ultima
+
+    # atrasadas dentro da janela (incluindo exatamente no corte), novas depois da marca e uma atrasada
+    # demais, anterior ao corte, que só uma carga completa traz
+    corte = ultima - timedelta(days=3)
+    inserir([corte, corte + timedelta(hours=1), ultima - timedelta(days=1), ultima])
+    inserir([ultima + timedelta(days=1), ultima + timedelta(days=2, hours=3)])
+    inserir([corte - timedelta(seconds=1)])
+
+    r = prontidao_dados.atualizar_cache(caminho_cache=str(cache), janela_dias=3)
+    assert r["desde"] == corte and not r["completa"]
+    # da janela: 13 linhas já em cache (a do corte e 3 dias inteiros) e 4 atrasadas; mais 2 novas
+    assert r["linhas"] == 13 + 4 + 2
+    obtido, esperado = _cache(cache), _origem(conn)
+    assert not obtido.duplicated().any()
+    esperado = esperado[esperado["MATRICULA"] != "M00246"].reset_index(drop=True)
+    pd.testing.assert_frame_equal(obtido, esperado)
+
+    # sem nada novo, a recarga só refaz a janela e o cache não muda
+    r = prontidao_dados.atualizar_cache(caminho_cache=str(cache), janela_dias=3)
+    assert r["desde"] == ultima + timedelta(days=2, hours=3) - timedelta(days=3)
+    pd.testing.assert_frame_equal(_cache(cache), obtido)
+
+def test_janela_refaz_linhas_alteradas_na_origem(origem, tmp_path):
+    _, conn = origem
+    cache = tmp_path / "cache.db"
+    prontidao_dados.atualizar_cache(caminho_cache=str(cache), janela_dias=2)
+    conn.execute("UPDATE REP_TESTE_PRONTIDAO_BR SET TESTE_REAL = 'teste tardio' "
+                 "WHERE DT_ENTRADA >= '2024-02-28'")
+    conn.commit()
+    prontidao_dados.atualizar_cache(caminho_cache=str(cache), janela_dias=2)
+    pd.testing.assert_frame_equal(_cache(cache), _origem(conn))
+    assert (_cache(cache).set_index("DT_ENTRADA").loc["2024-02-28":, "TESTE_REAL"] == "TESTE TARDIO").all()
+
+def test_status_normalizado_na_carga(origem, tmp_path):
+    cache = tmp_path / "cache.db"
+    prontidao_dados.atualizar_cache(caminho_cache=str(cache))
+    status = sqlite3.connect(cache).execute('SELECT DISTINCT "TESTE_REAL" FROM prontidao ORDER BY 1').fetchall()
+    assert [s for (s,) in status] == ["NÃO REALIZOU", "TESTE NO HORÁRIO", "TESTE TARDIO"]
@@ -0,0 +1,176 @@
+# tests/test_repositorio.py
+# Operações do Repositorio (ler, executar_lote, transações) e a paginação por chave do hospedagem_db nos dois
+# backends: SQLite e o RepositorioServidor, com um pyodbc falso que fala SQLite (TOP vira LIMIT, MONTH/YEAR
+# viram funções) passando pelo pool de conexões de verdade.
+import re
+import sqlite3
+import sys
+import types
+import warnings
+import pytest
+import hospedagem_db
+import repositorio
+
+TOP = re.compile(r"\bSELECT TOP (\d+) ", re.IGNORECASE)
+
+def _traduzir(sql: str) -> str:
+    """SELECT TOP n ... -> SELECT ... LIMIT n, no fim do parêntese que contém o SELECT (ou da consulta)."""
+    while (m := TOP.search(sql)):
+        nivel, fim = 0, len(sql)
+        for i in range(m.end(), len(sql)):
+            nivel += {"(": 1, ")": -1}.get(sql[i], 0)
+            if nivel < 0:
+                fim = i
+                break
+        sql = f"{sql[:m.start()]}SELECT {sql[m.end():fim]} LIMIT {m.group(1)}{sql[fim:]}"
+    return sql
+
+
+class CursorServidor:
+    def __init__(self, cur):
+        self._cur = cur
+        self.fast_executemany = False
+
+    def __getattr__(self, nome):
+        return getattr(self._cur, nome)
+
+    def execute(self, sql, params=()):
+        self._cur.execute(_traduzir(sql), tuple(params))
+        return self
+
+    def executemany(self, sql, linhas):
+        assert self.fast_executemany, "executar_lote deveria ligar fast_executemany"
+        self._cur.executemany(_traduzir(sql), linhas)
+        return self
+
+
+class ConexaoServidor:
+    def __init__(self, caminho):
+        self._conn = sqlite3.connect(caminho, check_same_thread=False)
+        self._conn.create_function("MONTH", 1, lambda d: int(d[5:7]) if d else None)
+        self._conn.create_function("YEAR", 1, lambda d: int(d[:4]) if d else None)
+
+    def __getattr__(self, nome):
+        return getattr(self._conn, nome)
+
+    def cursor(self):
+        return CursorServidor(self._conn.cursor())
+
+    def execute(self, sql, params=()):
+        return self.cursor().execute(sql, params)
+
+
+@pytest.fixture
+def pyodbc_falso(monkeypatch):
+    conexoes = []
+    def connect(conn_str, autocommit=True):
+        assert autocommit is False
+        conexoes.append(ConexaoServidor(conn_str))
+        return conexoes[-1]
+    monkeypatch.setitem(sys.modules, "pyodbc", types.SimpleNamespace(connect=connect))
+    return conexoes
+
+
+@pytest.fixture(params=["sqlite", "sqlserver"])
+def repo(request, banco_hospedagem, tmp_path):
+    """Banco com 2 unidades e 23 locações (datas repetidas e nulas); o repositório do backend pedido fica no
+    lugar do usado pelo hospedagem_db."""
+    r = banco_hospedagem
+    r.executar_lote("INSERT INTO unidades (nome) VALUES (?)", [("Apto Sol",), ("Casa Mar",)])
+    r.executar_lote(
+        "INSERT INTO locacoes (unidade_id, checkin, checkout, hospede, valor) VALUES (?, ?, ?, ?, ?)",
+        [(1 + i % 2, None if i % 7 == 0 else f"2030-{1 + i % 3:02d}-{1 + i % 4:02d}", None, f"Hóspede {i:02d}", i * 10.0)
+         for i in range(23)],
+    )
+    if request.param == "sqlserver":
+        request.getfixturevalue("pyodbc_falso")
+        r = repositorio.RepositorioServidor(str(tmp_path / "hospedagem.db"), tamanho_pool=2)
+        repositorio._repositorios["hospedagem"] = r
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", "pandas only supports SQLAlchemy", UserWarning)
+        yield r
+
+def _ids(r):
+    return r.ler("SELECT id FROM locacoes ORDER BY id")["id"].tolist()
+
+
+def test_ler_com_parametros(repo):
+    df = repo.ler("SELECT id, hospede FROM locacoes WHERE unidade_id = ? AND valor >= ? ORDER BY id", (2, 100))
+    assert df["id"].tolist() == [12, 14, 16, 18, 20, 22]
+    assert df["hospede"].iloc[0] == "Hóspede 11"
+    assert repo.ler(repo.limitar("SELECT id FROM locacoes ORDER BY id", 3))["id"].tolist() == [1, 2, 3]
+
+def test_executar_lote_em_lotes(repo):
+    linhas = [(1, f"Lote {i}") for i in range(25)]
+    n = repo.executar_lote("INSERT INTO locacoes (unidade_id, hospede) VALUES (?, ?)", iter(linhas), tamanho_lote=10)
+    assert n == 25
+    df = repo.ler("SELECT hospede FROM locacoes WHERE hospede LIKE 'Lote %' ORDER BY id")
+    assert df["hospede"].tolist() == [h for _, h in linhas]
+
+def test_executar_lote_desfaz_tudo_se_um_lote_falha(repo):
+    antes = _ids(repo)
+    linhas = [(1, "ok")] * 15 + [(1,)]      # último lote com parâmetros a menos
+    with pytest.raises(Exception):
+        repo.executar_lote("INSERT INTO locacoes (unidade_id, hospede) VALUES (?, ?)", linhas, tamanho_lote=10)
+    assert _ids(repo) == antes
+
+def test_transacao_do_chamador(repo):
+    antes = _ids(repo)
+    conn = repo.conectar()
+    repo.executar_lote("DELETE FROM locacoes WHERE id = ?", [(i,) for i in antes[:5]], conn=conn)
+    assert _ids(repo) == antes          # outra conexão não vê a transação aberta
+    conn.rollback()
+    conn.close()
+    assert _ids(repo) == antes
+
+    conn = repo.conectar()
+    repo.executar_lote("DELETE FROM locacoes WHERE id = ?", [(i,) for i in antes[:5]], conn=conn)
+    conn.commit()
+    conn.close()
+    assert _ids(repo) == antes[5:]
+
+def test_conexao_devolvida_sem_commit_e_desfeita(repo):
+    if repo.dialeto != "sqlserver":
+        pytest.skip("só o pool devolve a conexão em vez de fechar")
+    conn = repo.conectar()
+    conn.execute("DELETE FROM locacoes")
+    conn.close()
+    assert len(_ids(repo)) == 23
+    assert repo.pool._criadas <= repo.pool.tamanho
+
+@pytest.mark.parametrize("ordem", ["id", "data"])
+@pytest.mark.parametrize("filtros", [{}, {"unidade_id": 1}, {"mes": 2}, {"busca": "hóspede 1"}])
+def test_paginas_por_chave_cobrem_tudo_sem_repetir(repo, ordem, filtros):
+    completo, _ = hospedagem_db.pagina("locacoes", ordem=ordem, tamanho=1000, **filtros)
+    assert not completo.empty
+    vistos, apos, paginas = [], None, 0
+    while True:
+        df, apos = hospedagem_db.pagina("locacoes", ordem=ordem, apos=apos, tamanho=4, **filtros)
+        assert len(df) <= 4
+        vistos += df["id"].tolist()
+        paginas += 1
+        if apos is None:
+            break
+    assert vistos == completo["id"].tolist()
+    assert len(set(vistos)) == len(vistos)
+    assert paginas == -(-len(vistos) // 4)
+    if ordem == "data":
+        datas = completo["checkin"]
+        assert datas.isna().iloc[:datas.isna().sum()].all()      # nulos primeiro, depois em ordem
+        assert datas.dropna().is_monotonic_increasing
+
+def test_contagem_estimada(repo, monkeypatch):
+    assert hospedagem_db.contar_estimado("locacoes") == (23, True)
+    assert hospedagem_db.contar_estimado("locacoes", unidade_id=2) == (11, True)
+    monkeypatch.setattr(hospedagem_db, "LIMITE_CONTAGEM", 10)
+    assert hospedagem_db.contar_estimado("locacoes") == (10, False)
+
+@pytest.mark.parametrize("busca, esperados", [
+    ("50%", ["50% off"]), ("a_b", ["a_b"]), ("[x", ["[x]"]), ("c\\", ["c\\d"]), ("A", ["a_b", "axb", "Ab_"]),
+])
+def test_busca_trata_curingas_como_texto(repo, busca, esperados):
+    nomes = ["50% off", "50x off", "a_b", "axb", "[x]", "x", "c\\d", "cxd", "Ab_"]
+    repo.executar_lote("INSERT INTO locacoes (unidade_id, hospede) VALUES (?, ?)", [(1, n) for n in nomes])
+    df, _ = hospedagem_db.pagina("locacoes", busca=busca)
+    assert df["hospede"].tolist() == esperados
+    assert hospedagem_db.contar_estimado("locacoes", busca=busca) == (len(esperados), True)
@@ -0,0 +1,61 @@
+# tests/test_sincronizacao_financeiro.py
+# Sincronização incremental hospedagem → Financlex: marca pela `versao` (não pelo carimbo `atualizado_em`) e
+# exclusões com marca por tabela.
+import pytest
+import financeiro_db
+import hospedagem_db
+import repositorio
+import sincronizacao_financeiro as sinc
+
+
+@pytest.fixture
+def bancos(banco_hospedagem, tmp_path, monkeypatch):
+    monkeypatch.setenv("FINANCEIRO_BACKEND", "sqlite")
+    monkeypatch.setenv("FINANCEIRO_CAMINHO", str(tmp_path / "financeiro.db"))
+    repositorio._repositorios.pop("financeiro", None)
+    r = banco_hospedagem
+    r.executar_lote("INSERT INTO unidades (nome) VALUES (?)", [("Apto Sol",)])
+    r.executar_lote(
+        "INSERT INTO locacoes (unidade_id, checkin, checkout, hospede, valor) VALUES (1, ?, ?, ?, ?)",
+        [(f"2030-01-{1 + i:02d}", f"2030-01-{2 + i:02d}", f"Hóspede {i}", 100.0 + i) for i in range(12)],
+    )
+    r.executar_lote("INSERT INTO despesas (unidade_id, data, tipo, valor) VALUES (1, ?, 'Luz', ?)",
+                    [(f"2030-01-{1 + i:02d}", 10.0 * i) for i in range(5)])
+    yield r
+    repositorio._repositorios.pop("financeiro", None)
+
+def _projetadas():
+    df = financeiro_db.repo().ler("SELECT origem, origem_id, valor FROM transacoes ORDER BY origem, origem_id")
+    return [(o, int(i), v) for o, i, v in df.itertuples(index=False)]
+
+def _esperadas(r):
+    df = r.ler("SELECT 'despesas' AS origem, id, valor FROM despesas UNION ALL "
+               "SELECT 'locacoes', id, valor FROM locacoes ORDER BY 1, 2")
+    return [(o, int(i), v) for o, i, v in df.itertuples(index=False)]
+
+
+def test_alteracao_com_carimbo_anterior_a_marca(bancos):
+    sinc.sincronizar(tamanho_lote=5)
+    assert _projetadas() == _esperadas(bancos)
+    # o que uma transação longa confirmada depois da sincronização deixa no SQL Server: versão nova com carimbo
+    # anterior à marca (sem o gatilho de alteração, que carimbaria o horário atual)
+    bancos.executar("UPDATE locacoes SET valor = 999 WHERE id = 3")
+    bancos.executar("DROP TRIGGER trg_locacoes_alteracao")
+    bancos.executar("UPDATE locacoes SET atualizado_em = '2000-01-01 00:00:00.000' WHERE id = 3")
+    hospedagem_db.inicializar_db()
+    assert sinc.sincronizar(tamanho_lote=5)["locacoes"] == {"incluidas": 0, "alteradas": 1}
+    assert _projetadas() == _esperadas(bancos)
+    assert sinc.sincronizar(tamanho_lote=5)["locacoes"] == {"incluidas": 0, "alteradas": 0}
+
+def test_exclusoes_por_tabela_e_marca_antiga(bancos):
+    sinc.sincronizar()
+    bancos.executar("DELETE FROM locacoes WHERE id IN (2, 4)")
+    bancos.executar("DELETE FROM despesas WHERE id = 1")
+    assert sinc.sincronizar()["removidas"] == 3
+    assert _projetadas() == _esperadas(bancos)
+
+    # marca no formato antigo (atualizado_em|id): reprojeta tudo uma vez, sem duplicar
+    financeiro_db.repo().executar("UPDATE sincronizacao SET valor = '2030-01-01 00:00:00.000|5' WHERE chave = 'locacoes'")
+    assert sinc.sincronizar()["locacoes"] == {"incluidas": 0, "alteradas": 10}
+    assert _projetadas() == _esperadas(bancos)
+    assert financeiro_db.verificar_razao().empty
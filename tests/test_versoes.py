@@ -0,0 +1,77 @@
+# tests/test_versoes.py
+# Versão dos dados (contadores em `versoes`/`versoes_unidade`, mantidos pelos gatilhos) e os ETags da API.
+import pytest
+from flask import Flask
+import api
+import calendario_ics
+import hospedagem_db
+
+
+@pytest.fixture
+def banco(banco_hospedagem):
+    r = banco_hospedagem
+    r.executar_lote("INSERT INTO unidades (nome) VALUES (?)", [("Apto Sol",), ("Casa Mar",)])
+    r.executar_lote(
+        "INSERT INTO locacoes (unidade_id, checkin, checkout, hospede, valor) VALUES (?, ?, ?, ?, ?)",
+        [(1 + i % 2, f"2030-01-{1 + i:02d}", f"2030-01-{2 + i:02d}", f"Hóspede {i}", 100.0) for i in range(6)],
+    )
+    calendario_ics._cache.clear()
+    return r
+
+@pytest.fixture
+def cliente(banco):
+    app = Flask(__name__)
+    app.register_blueprint(api.bp, url_prefix="/api")
+    return app.test_client()
+
+
+def test_versao_muda_em_gravacoes_no_mesmo_milissegundo(banco):
+    # carimbo fixo em atualizado_em: o mesmo que duas gravações no mesmo milissegundo
+    carimbo = "2099-01-01 00:00:00.000"
+    versoes = [hospedagem_db.versao_dados("locacoes")]
+    for i in (1, 3):
+        banco.executar("UPDATE locacoes SET valor = 1, atualizado_em = ? WHERE id = ?", (carimbo, i))
+        versoes.append(hospedagem_db.versao_dados("locacoes"))
+    banco.executar("DELETE FROM locacoes WHERE id = 2")
+    versoes.append(hospedagem_db.versao_dados("locacoes"))
+    assert len(set(versoes)) == len(versoes)
+    assert hospedagem_db.versao_dados("unidades") == hospedagem_db.versao_dados("unidades")
+
+def test_contador_so_cresce_e_sobrevive_a_reinicializacao(banco):
+    contador = lambda: int(banco.ler("SELECT versao FROM versoes WHERE tabela = 'locacoes'")["versao"].iloc[0])
+    antes = contador()
+    assert antes > 0
+    hospedagem_db.inicializar_db()
+    assert contador() == antes
+    banco.executar("DELETE FROM locacoes")
+    assert contador() > antes
+
+def test_versao_da_unidade(banco):
+    v1, v2 = hospedagem_db.versao_unidade(1), hospedagem_db.versao_unidade(2)
+    banco.executar("UPDATE locacoes SET hospede = 'Outro' WHERE id = 1")       # unidade 1
+    assert hospedagem_db.versao_unidade(1) != v1
+    assert hospedagem_db.versao_unidade(2) == v2
+    v1 = hospedagem_db.versao_unidade(1)
+    banco.executar("UPDATE locacoes SET unidade_id = 2 WHERE id = 3")         # sai da 1, entra na 2
+    assert hospedagem_db.versao_unidade(1) != v1 and hospedagem_db.versao_unidade(2) != v2
+    banco.executar("INSERT INTO unidades (nome) VALUES ('Vazia')")
+    assert hospedagem_db.versao_unidade(3).startswith("Vazia|")
+    assert hospedagem_db.versao_unidade(99) == ""
+
+@pytest.mark.parametrize("url", ["/api/locacoes", "/api/unidades/1/calendario.ics"])
+def test_etag_por_codificacao(cliente, banco, url):
+    com_gzip = cliente.get(url, headers={"Accept-Encoding": "gzip"})
+    sem_gzip = cliente.get(url)
+    assert com_gzip.status_code == sem_gzip.status_code == 200
+    assert com_gzip.headers["ETag"] != sem_gzip.headers["ETag"]
+    assert "Accept-Encoding" in sem_gzip.headers["Vary"]
+
+    # o ETag de uma codificação não vale para a outra
+    r = cliente.get(url, headers={"If-None-Match": com_gzip.headers["ETag"]})
+    assert r.status_code == 200
+    r = cliente.get(url, headers={"If-None-Match": com_gzip.headers["ETag"], "Accept-Encoding": "gzip"})
+    assert r.status_code == 304
+
+    banco.executar("UPDATE locacoes SET valor = valor + 1 WHERE unidade_id = 1")
+    r = cliente.get(url, headers={"If-None-Match": com_gzip.headers["ETag"], "Accept-Encoding": "gzip"})
+    assert r.status_code == 200